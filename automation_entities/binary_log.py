@@ -0,0 +1,352 @@
+"""
+The :mod:`automation_entities.binary_log` module contains a compact binary
+format for :class:`sinks.LogRecord` objects. Entity names, request prefixes
+and the like are repeated many thousands of times over in a long routine, so
+every short string is written only once to a string table and referred to
+by its index from then on, until the table is full. Every integer is written
+as a varint. Logs are read back a chunk at a time, so even logs many
+gigabytes in size can be read without loading them into memory.
+
+Logs are written with a :class:`BinaryLogSink` and turned back into records
+with :func:`read_binary_log` or into the familiar indented text with
+:func:`format_binary_log`. The latter can also be run from the command
+line::
+
+    python -m automation_entities.binary_log routine.aelog
+"""
+
+import sys
+import threading
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from .sinks import LogKind, LogRecord, LogSink
+
+#: bytes that every binary log starts with
+MAGIC: bytes = b"AELOG\x02"
+
+#: kinds of records, in the order of their encoded indices
+KINDS: Tuple[LogKind, ...] = ("interaction", "request", "result", "log")
+
+TAG_STRING = 0
+TAG_RECORD = 1
+TAG_RECORD_INLINE = 2
+
+# A record's entity is 0 for none, 1 for a name written inline or 1 more
+# than the index of its name in the string table.
+ENTITY_NONE = 0
+ENTITY_INLINE = 1
+
+#: number of bytes read at a time by :func:`read_binary_log`
+CHUNK_SIZE: int = 1 << 20
+
+KIND_INDICES: Dict[str, int] = {k: i for i, k in enumerate(KINDS)}
+
+
+class BinaryLogError(Exception):
+    pass
+
+
+class TruncatedLogError(BinaryLogError):
+    """
+    raised when the data being decoded ends partway through an item
+    """
+
+
+def encode_varint(value: int, buf: bytearray) -> None:
+    """
+    Append the given non-negative *value* to *buf* as a varint.
+    """
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def encode_string(s: str, buf: bytearray) -> None:
+    """
+    Append the given string *s* to *buf*, preceded by its length.
+    """
+    encoded = s.encode()
+    encode_varint(len(encoded), buf)
+    buf += encoded
+
+
+def decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Decode the varint in *data* starting at *pos* and return it along with
+    the position just past it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        try:
+            byte = data[pos]
+
+        except IndexError:
+            raise TruncatedLogError("truncated varint") from None
+
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value: int) -> int:
+    """
+    Map the given signed *value* onto a non-negative integer.
+    """
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value: int) -> int:
+    """
+    Reverse :func:`zigzag`.
+    """
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+class BinaryLogSink(LogSink):
+    """
+    Sink that writes records to the file at the given *filepath* in the
+    binary log format. Messages and entity names up to *max_intern_length*
+    characters long are interned until *max_strings* of them have been seen;
+    anything else is written inline. Records may be emitted from any number
+    of threads at once.
+
+    :param str filepath: path of the file to write to
+    :param int max_intern_length: length of the longest string to intern
+    :param int max_strings: maximum number of strings to intern
+
+    .. autoattribute:: filepath
+    """
+
+    #: path of the file being written to
+    filepath: str
+
+    max_intern_length: int
+    max_strings: int
+    strings: Dict[str, int]
+    last_timestamp: int
+    fobj: BinaryIO
+    lock: threading.Lock
+
+    def __init__(
+        self,
+        filepath: str,
+        max_intern_length: int = 200,
+        max_strings: int = 65536,
+    ) -> None:
+        self.filepath = filepath
+        self.max_intern_length = max_intern_length
+        self.max_strings = max_strings
+        self.strings = {}
+        self.last_timestamp = 0
+        self.lock = threading.Lock()
+        self.fobj = open(filepath, "wb")
+        self.fobj.write(MAGIC)
+
+    def intern(self, s: str, buf: bytearray) -> Optional[int]:
+        """
+        Return the index of the given string *s* in the string table, adding
+        it to the table in *buf* if necessary, or ``None`` if it shouldn't be
+        interned.
+        """
+        index = self.strings.get(s)
+        if index is not None:
+            return index
+
+        if len(s) > self.max_intern_length or len(self.strings) >= self.max_strings:
+            return None
+
+        index = len(self.strings) + 1
+        self.strings[s] = index
+        buf.append(TAG_STRING)
+        encode_string(s, buf)
+        return index
+
+    def encode(self, record: LogRecord, buf: bytearray) -> None:
+        """
+        Append the given *record* to *buf*. This must be called with the
+        :attr:`lock` held.
+        """
+        # Every element found is an entity of its own, so entity names are
+        # subject to the same limits as messages.
+        entity = ENTITY_NONE
+        if record.entity is not None:
+            index = self.intern(record.entity, buf)
+            entity = ENTITY_INLINE if index is None else index + 1
+        message = self.intern(record.message, buf)
+
+        timestamp = int(record.timestamp * 1000000)
+        delta = timestamp - self.last_timestamp
+        self.last_timestamp = timestamp
+
+        buf.append(TAG_RECORD if message is not None else TAG_RECORD_INLINE)
+        encode_varint(record.depth, buf)
+        encode_varint(record.indent, buf)
+        encode_varint(zigzag(delta), buf)
+        encode_varint(KIND_INDICES[record.kind], buf)
+        encode_varint(entity, buf)
+        if entity == ENTITY_INLINE:
+            encode_string(record.entity or "", buf)
+
+        if message is not None:
+            encode_varint(message, buf)
+
+        else:
+            encode_string(record.message, buf)
+
+    def emit(self, record: LogRecord) -> None:
+        # The string table and timestamps are shared by every record, so
+        # records have to be encoded and written in the same order.
+        with self.lock:
+            buf = bytearray()
+            self.encode(record, buf)
+            self.fobj.write(buf)
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        with self.lock:
+            buf = bytearray()
+            for record in records:
+                self.encode(record, buf)
+            self.fobj.write(buf)
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.fobj.closed:
+                self.fobj.flush()
+
+    def close(self) -> None:
+        self.flush()
+        with self.lock:
+            self.fobj.close()
+
+
+def decode_string(data: bytes, pos: int) -> Tuple[str, int]:
+    """
+    Decode the string in *data* starting at *pos*, preceded by its length,
+    and return it along with the position just past it.
+    """
+    length, pos = decode_varint(data, pos)
+    end = pos + length
+    if end > len(data):
+        raise TruncatedLogError("truncated string")
+    return data[pos:end].decode(), end
+
+
+def decode_item(
+    data: bytes, pos: int, strings: List[str], timestamp: int
+) -> Tuple[Union[str, LogRecord], int, int]:
+    """
+    Decode the string table entry or record in *data* starting at *pos*,
+    given the *strings* and *timestamp* decoded so far, and return it along
+    with the timestamp as of the item and the position just past it.
+
+    :raises TruncatedLogError: if *data* ends partway through the item
+    """
+    tag = data[pos]
+    pos += 1
+    if tag == TAG_STRING:
+        s, pos = decode_string(data, pos)
+        return s, timestamp, pos
+
+    if tag not in (TAG_RECORD, TAG_RECORD_INLINE):
+        raise BinaryLogError(f"unknown tag {tag}")
+
+    depth, pos = decode_varint(data, pos)
+    indent, pos = decode_varint(data, pos)
+    delta, pos = decode_varint(data, pos)
+    kind, pos = decode_varint(data, pos)
+    entity_index, pos = decode_varint(data, pos)
+
+    entity: Optional[str] = None
+    if entity_index == ENTITY_INLINE:
+        entity, pos = decode_string(data, pos)
+    elif entity_index != ENTITY_NONE:
+        entity = strings[entity_index - 1]
+
+    if tag == TAG_RECORD:
+        message_index, pos = decode_varint(data, pos)
+        message = strings[message_index]
+
+    else:
+        message, pos = decode_string(data, pos)
+
+    timestamp += unzigzag(delta)
+    record = LogRecord(
+        depth=depth,
+        indent=indent,
+        timestamp=timestamp / 1000000,
+        kind=KINDS[kind],
+        message=message,
+        entity=entity,
+    )
+    return record, timestamp, pos
+
+
+def read_binary_log(
+    fobj: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[LogRecord]:
+    """
+    Read and yield every :class:`sinks.LogRecord` in the binary log in the
+    given *fobj*, reading *chunk_size* bytes at a time.
+    """
+    magic = fobj.read(len(MAGIC))
+    if magic != MAGIC:
+        if magic.startswith(MAGIC[:-1]):
+            raise BinaryLogError("unsupported binary log version")
+        raise BinaryLogError("not a binary log")
+
+    strings: List[str] = [""]
+    timestamp = 0
+    data = b""
+    pos = 0
+    while True:
+        if pos == len(data):
+            data = fobj.read(chunk_size)
+            pos = 0
+            if not data:
+                return
+
+        try:
+            item, timestamp, pos = decode_item(data, pos, strings, timestamp)
+
+        except TruncatedLogError:
+            chunk = fobj.read(chunk_size)
+            if not chunk:
+                raise
+            data = data[pos:] + chunk
+            pos = 0
+            continue
+
+        if isinstance(item, str):
+            strings.append(item)
+
+        else:
+            yield item
+
+
+def format_binary_log(fobj: BinaryIO) -> Iterator[str]:
+    """
+    Read the binary log in the given *fobj* and yield each of its records
+    as an indented line of text.
+    """
+    for record in read_binary_log(fobj):
+        yield record.text
+
+
+def main(argv: List[str]) -> int:
+    """
+    Print the binary logs at the given filepaths as text.
+    """
+    for filepath in argv:
+        with open(filepath, "rb") as fobj:
+            for line in format_binary_log(fobj):
+                print(line)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,320 @@
+"""
+The :mod:`automation_entities.config_codecs` module contains the codecs
+that a :class:`context.Config` can be stored with. Unless told otherwise, a
+config picks its codec by the extension of its file, falling back to the
+``"json"`` codec, which writes the same indented JSON as always::
+
+    >>> ctx.set_config_file("state.json", codec="fast-json")
+    >>> ctx.set_config_file("state.aecfg", codec="binary")
+
+The ``"fast-json"`` codec uses :mod:`orjson` if it's installed and the
+standard library otherwise, writing compact JSON either way, and is the one
+to pick when load time matters. The ``"binary"`` codec is a compact,
+type-tagged format that uses the same varints as :mod:`binary_log`. It's
+written in pure Python, so it's several times slower to load than JSON and
+is only worth using when the size of the file matters more; it's never
+picked by extension. Other codecs can be added with :func:`register_codec`.
+"""
+
+import json
+import os
+import struct
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .binary_log import BinaryLogError, decode_varint, encode_varint, unzigzag, zigzag
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+
+class CodecError(ValueError):
+    pass
+
+
+class ConfigCodec:
+    """
+    Base class for codecs that turn a config's data into bytes and back.
+    Subclasses implement :meth:`dumps` and :meth:`loads`.
+
+    .. autoattribute:: name
+    .. autoattribute:: extensions
+
+    .. automethod:: dumps
+    .. automethod:: loads
+    """
+
+    #: name the codec is registered under
+    name: str = ""
+
+    #: file extensions, including the dot, that select the codec
+    extensions: Tuple[str, ...] = ()
+
+    def dumps(self, data: dict) -> bytes:
+        """
+        Encode the given *data*.
+        """
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> dict:
+        """
+        Decode the given *data*, raising a :class:`ValueError` if it can't
+        be decoded.
+        """
+        raise NotImplementedError
+
+
+class JSONCodec(ConfigCodec):
+    """
+    codec that writes indented JSON with sorted keys using the standard
+    library
+    """
+
+    name = "json"
+    extensions = (".json",)
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps(data, sort_keys=True, indent=4).encode()
+
+    def loads(self, data: bytes) -> dict:
+        return json.loads(data)
+
+
+class FastJSONCodec(ConfigCodec):
+    """
+    codec that writes compact JSON with :mod:`orjson` if it's installed and
+    can handle the data, and with the standard library otherwise
+    """
+
+    name = "fast-json"
+
+    def dumps(self, data: dict) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+
+            except orjson.JSONEncodeError:
+                # orjson only handles 64-bit integers, among other things,
+                # so leave anything it can't handle to the standard library.
+                pass
+
+        return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> dict:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_LIST = 6
+TAG_DICT = 7
+
+FLOAT = struct.Struct("<d")
+
+
+class BinaryCodec(ConfigCodec):
+    """
+    codec that writes a compact, type-tagged binary format; it handles the
+    same types as JSON, however deeply they're nested, but it's decoded in
+    pure Python and so is slower to load than JSON
+    """
+
+    name = "binary"
+
+    #: bytes that every binary config starts with
+    MAGIC: bytes = b"AECFG\x01"
+
+    def dumps(self, data: dict) -> bytes:
+        buf = bytearray(self.MAGIC)
+        stack: List[Any] = [data]
+        while stack:
+            value = stack.pop()
+            if value is None:
+                buf.append(TAG_NONE)
+
+            elif value is False:
+                buf.append(TAG_FALSE)
+
+            elif value is True:
+                buf.append(TAG_TRUE)
+
+            elif isinstance(value, int):
+                buf.append(TAG_INT)
+                encode_varint(zigzag(value), buf)
+
+            elif isinstance(value, float):
+                buf.append(TAG_FLOAT)
+                buf += FLOAT.pack(value)
+
+            elif isinstance(value, str):
+                encoded = value.encode()
+                buf.append(TAG_STR)
+                encode_varint(len(encoded), buf)
+                buf += encoded
+
+            elif isinstance(value, (list, tuple)):
+                buf.append(TAG_LIST)
+                encode_varint(len(value), buf)
+                stack.extend(reversed(value))
+
+            elif isinstance(value, dict):
+                buf.append(TAG_DICT)
+                encode_varint(len(value), buf)
+                for k, v in reversed(list(value.items())):
+                    if not isinstance(k, str):
+                        raise TypeError(f"keys must be str, not {type(k).__name__}")
+                    stack.append(v)
+                    stack.append(k)
+
+            else:
+                raise TypeError(
+                    f"Object of type {type(value).__name__} is not serializable"
+                )
+
+        return bytes(buf)
+
+    def loads(self, data: bytes) -> dict:
+        if not data.startswith(self.MAGIC):
+            raise CodecError("not a binary config")
+
+        try:
+            root, pos = self.decode(data, len(self.MAGIC))
+
+        except (IndexError, BinaryLogError, struct.error, UnicodeDecodeError) as e:
+            raise CodecError(f"truncated or corrupt binary config: {e}") from None
+
+        if pos != len(data):
+            raise CodecError("trailing data in binary config")
+
+        if not isinstance(root, dict):
+            raise CodecError("binary config doesn't hold a dict")
+        return root
+
+    def decode(self, data: bytes, pos: int) -> Tuple[Any, int]:
+        """
+        Decode the value in *data* starting at *pos* and return it along
+        with the position just past it.
+        """
+        root: Any = None
+
+        # Each frame is a container being filled, the number of values it
+        # still needs and, for a dict, the key of the next value or None.
+        frames: List[List[Any]] = []
+        while True:
+            tag = data[pos]
+            pos += 1
+            count = 0
+            value: Any
+            if tag == TAG_NONE:
+                value = None
+
+            elif tag == TAG_FALSE:
+                value = False
+
+            elif tag == TAG_TRUE:
+                value = True
+
+            elif tag == TAG_INT:
+                encoded, pos = decode_varint(data, pos)
+                value = unzigzag(encoded)
+
+            elif tag == TAG_FLOAT:
+                (value,) = FLOAT.unpack_from(data, pos)
+                pos += FLOAT.size
+
+            elif tag == TAG_STR:
+                length, pos = decode_varint(data, pos)
+                if pos + length > len(data):
+                    raise IndexError("string runs past the end")
+                value = data[pos : pos + length].decode()
+                pos += length
+
+            elif tag == TAG_LIST:
+                count, pos = decode_varint(data, pos)
+                value = []
+
+            elif tag == TAG_DICT:
+                count, pos = decode_varint(data, pos)
+                value = {}
+
+            else:
+                raise CodecError(f"unknown tag {tag}")
+
+            if not frames:
+                root = value
+
+            else:
+                frame = frames[-1]
+                container = frame[0]
+                if isinstance(container, list):
+                    container.append(value)
+                    frame[1] -= 1
+
+                elif frame[2] is None:
+                    if not isinstance(value, str):
+                        raise CodecError("dict key isn't a str")
+                    frame[2] = value
+
+                else:
+                    container[frame[2]] = value
+                    frame[2] = None
+                    frame[1] -= 1
+
+            if count:
+                frames.append([value, count, None])
+
+            while frames and frames[-1][1] == 0:
+                frames.pop()
+
+            if not frames:
+                return root, pos
+
+
+#: every registered codec by name
+CODECS: Dict[str, ConfigCodec] = {}
+
+
+def register_codec(codec: ConfigCodec) -> None:
+    """
+    Register the given *codec* under its name and extensions.
+    """
+    CODECS[codec.name] = codec
+
+
+def get_codec(
+    codec: Union[str, ConfigCodec, None], filepath: Optional[str] = None
+) -> ConfigCodec:
+    """
+    Return the given *codec*, looking it up by name if it's a string. If
+    it's ``None``, the codec registered for the extension of *filepath* is
+    returned, or the ``"json"`` codec if there isn't one.
+    """
+    if isinstance(codec, ConfigCodec):
+        return codec
+
+    if codec is not None:
+        try:
+            return CODECS[codec]
+
+        except KeyError:
+            raise ValueError(f"unknown config codec {codec!r}") from None
+
+    if filepath is not None:
+        ext = os.path.splitext(filepath)[1].lower()
+        for registered in CODECS.values():
+            if ext in registered.extensions:
+                return registered
+
+    return CODECS["json"]
+
+
+register_codec(JSONCodec())
+register_codec(FastJSONCodec())
+register_codec(BinaryCodec())
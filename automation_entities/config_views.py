@@ -0,0 +1,409 @@
+"""
+The :mod:`automation_entities.config_views` module contains the logic for
+reading a subtree of a :class:`context.Config` through a typed, read-only
+view described by a dataclass or a ``TypedDict``::
+
+    >>> @dataclasses.dataclass
+    ... class Timeouts:
+    ...     page: float
+    ...     script: float = 30.0
+    >>> timeouts = bind_view(ctx.config, Timeouts, "browsers.chrome.timeouts")
+    >>> timeouts.page
+    10.0
+
+The subtree is validated once when the view is bound, and the view's
+attributes are plain slots, so reading them costs no more than reading any
+other attribute. Whenever the config changes, only the fields below the
+changed keys are validated again. The change has already been made to the
+config by then, so one that doesn't match the schema isn't undone; the view
+keeps its previous values instead and the :class:`ConfigValidationError` is
+passed to the ``on_error`` function given to :func:`bind_view`, or issued as
+a warning if there isn't one::
+
+    >>> timeouts = bind_view(
+    ...     ctx.config, Timeouts, "browsers.chrome.timeouts", on_error=print
+    ... )
+    >>> ctx.config.set_path("browsers.chrome.timeouts.page", "slow")
+    browsers.chrome.timeouts.page: expected float, got str 'slow'
+    >>> timeouts.page
+    10.0
+"""
+
+import collections.abc
+import dataclasses
+import typing
+import warnings
+import weakref
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Tuple, Type
+
+from .context import MISSING, Config
+
+Path = Tuple[Any, ...]
+
+
+class ConfigValidationError(ValueError):
+    pass
+
+
+#: function called with the error when a change to the config doesn't match
+#: the schema of a view
+ErrorHandler = typing.Callable[[ConfigValidationError], None]
+
+
+class SchemaField(NamedTuple):
+    """
+    a single field of a schema
+    """
+
+    #: name of the field, which is also its key in the config
+    name: str
+
+    #: type the field's value must have
+    type: Any
+
+    #: whether the field's key must be in the config
+    required: bool
+
+    #: function returning the value of a missing field
+    default: typing.Callable[[], Any]
+
+
+def is_schema(tp: Any) -> bool:
+    """
+    Return whether the given type is a dataclass or a ``TypedDict``.
+    """
+    if not isinstance(tp, type):
+        return False
+    return dataclasses.is_dataclass(tp) or (
+        issubclass(tp, dict) and hasattr(tp, "__total__")
+    )
+
+
+def schema_fields(schema: type) -> Dict[str, SchemaField]:
+    """
+    Return the fields of the given dataclass or ``TypedDict`` *schema* by
+    name. A missing dataclass field gets its default, and a missing
+    ``TypedDict`` key that isn't required reads as ``None``.
+    """
+    hints = typing.get_type_hints(schema)
+    ret: Dict[str, SchemaField] = {}
+    if dataclasses.is_dataclass(schema):
+        for f in dataclasses.fields(schema):
+            if f.default is not dataclasses.MISSING:
+                default = lambda value=f.default: value
+                required = False
+            elif f.default_factory is not dataclasses.MISSING:  # type: ignore
+                default = f.default_factory  # type: ignore
+                required = False
+            else:
+                default = lambda: None
+                required = True
+            ret[f.name] = SchemaField(f.name, hints[f.name], required, default)
+        return ret
+
+    if not is_schema(schema):
+        raise TypeError(f"{schema!r} is not a dataclass or TypedDict")
+
+    required_keys = getattr(
+        schema, "__required_keys__", hints.keys() if schema.__total__ else ()
+    )
+    for name, tp in hints.items():
+        ret[name] = SchemaField(name, tp, name in required_keys, lambda: None)
+    return ret
+
+
+def validate_value(value: Any, tp: Any, path: str) -> Any:
+    """
+    Check that the given *value* at the dotted *path* has the type *tp* and
+    return it as it should be read from a view. Integers are turned into
+    floats for ``float`` fields and sub-dicts described by a schema are
+    turned into unbound views.
+
+    :raises ConfigValidationError: if *value* doesn't have the type *tp*
+    """
+    if tp is Any:
+        return value
+
+    if is_schema(tp):
+        if not isinstance(value, collections.abc.Mapping):
+            raise _error(path, tp, value)
+        cls = view_class(tp)
+        view = cls.__new__(cls)
+        object.__setattr__(view, "_config", None)
+        object.__setattr__(view, "_path", path)
+        for name, v in view._values(value).items():
+            object.__setattr__(view, name, v)
+        return view
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if origin is typing.Union:
+        for arg in args:
+            try:
+                return validate_value(value, arg, path)
+            except ConfigValidationError:
+                pass
+        raise _error(path, tp, value)
+
+    if origin is Literal:
+        if value not in args:
+            raise ConfigValidationError(
+                f"{path or 'config'}: expected one of {list(args)!r}, got {value!r}"
+            )
+        return value
+
+    if origin in (list, collections.abc.Sequence):
+        if not isinstance(value, list):
+            raise _error(path, tp, value)
+        if not args:
+            return value
+        return [validate_value(v, args[0], f"{path}[{i}]") for i, v in enumerate(value)]
+
+    if origin in (dict, collections.abc.Mapping):
+        if not isinstance(value, dict):
+            raise _error(path, tp, value)
+        if not args:
+            return value
+        ret = {}
+        for k, v in value.items():
+            validate_value(k, args[0], f"{path}[{k!r}]")
+            ret[k] = validate_value(v, args[1], _join(path, k))
+        return ret
+
+    if tp is bool:
+        if not isinstance(value, bool):
+            raise _error(path, tp, value)
+        return value
+
+    if tp is int:
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise _error(path, tp, value)
+        return value
+
+    if tp is float:
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise _error(path, tp, value)
+        return float(value)
+
+    if tp is None or tp is type(None):
+        if value is not None:
+            raise _error(path, tp, value)
+        return value
+
+    if not isinstance(value, origin or tp):
+        raise _error(path, tp, value)
+    return value
+
+
+class ConfigView:
+    """
+    Base class of the read-only views returned by :func:`bind_view`. Each
+    schema gets its own subclass, made by :func:`view_class`, with a slot
+    for each field.
+
+    .. autoattribute:: schema
+    """
+
+    __slots__ = ("_config", "_path", "__weakref__")
+
+    #: dataclass or ``TypedDict`` describing the view
+    schema: type
+
+    _fields: Dict[str, SchemaField]
+    _config: Optional[Config]
+    _path: str
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+    def _values(self, subtree: typing.Mapping) -> Dict[str, Any]:
+        return {name: self._value(subtree, name) for name in self._fields}
+
+    def _value(self, subtree: typing.Mapping, name: str) -> Any:
+        field = self._fields[name]
+        raw = subtree.get(name, MISSING)
+        if raw is MISSING:
+            if field.required:
+                raise ConfigValidationError(
+                    f"{_join(self._path, name)}: missing required key"
+                )
+            return field.default()
+        return validate_value(raw, field.type, _join(self._path, name))
+
+    def _collect(
+        self,
+        subtree: Any,
+        paths: List[Path],
+        pending: List[Tuple["ConfigView", str, Any]],
+    ) -> None:
+        # Only work out the new values here so that nothing is changed
+        # unless every value is valid.
+        if not isinstance(subtree, collections.abc.Mapping):
+            raise _error(self._path, self.schema, subtree)
+
+        if any(not p for p in paths):
+            pending.extend((self, n, v) for n, v in self._values(subtree).items())
+            return
+
+        by_name: Dict[str, List[Path]] = {}
+        for p in paths:
+            if p[0] in self._fields:
+                by_name.setdefault(p[0], []).append(p[1:])
+
+        for name, subpaths in by_name.items():
+            current = getattr(self, name)
+            raw = subtree.get(name, MISSING)
+            if (
+                isinstance(current, ConfigView)
+                and type(current).schema is self._fields[name].type
+                and all(subpaths)
+                and isinstance(raw, collections.abc.Mapping)
+            ):
+                current._collect(raw, subpaths, pending)
+            else:
+                pending.append((self, name, self._value(subtree, name)))
+
+
+VIEW_CLASSES: Dict[type, Type[ConfigView]] = {}
+
+
+def view_class(schema: type) -> Type[ConfigView]:
+    """
+    Return the :class:`ConfigView` subclass for the given *schema*, making
+    it the first time.
+    """
+    try:
+        return VIEW_CLASSES[schema]
+
+    except KeyError:
+        pass
+
+    fields = schema_fields(schema)
+    for name in fields:
+        if name.startswith("_"):
+            raise TypeError(f"field names can't start with an underscore: {name}")
+
+    cls = type(
+        f"{schema.__name__}View",
+        (ConfigView,),
+        {"__slots__": tuple(fields), "schema": schema, "_fields": fields},
+    )
+    VIEW_CLASSES[schema] = cls
+    return cls
+
+
+def bind_view(
+    config: Config,
+    schema: type,
+    path: str = "",
+    on_error: Optional[ErrorHandler] = None,
+) -> Any:
+    """
+    Return a view of the subtree of *config* at the dotted *path*, or of
+    the whole config if it's empty, with an attribute for each field of the
+    dataclass or ``TypedDict`` *schema*. Fields described by another schema
+    are views themselves and are kept up to date along with their parent.
+
+    The view is kept up to date until it's garbage collected or passed to
+    :func:`unbind_view`. If a change to the config doesn't match *schema*,
+    the view keeps its previous values and the error is passed to
+    *on_error*, or issued as a warning if it's ``None``.
+
+    :raises ConfigValidationError: if the subtree doesn't match *schema*
+        when the view is bound
+    """
+    cls = view_class(schema)
+    view = cls.__new__(cls)
+    object.__setattr__(view, "_config", config)
+    object.__setattr__(view, "_path", path)
+    keys = tuple(path.split(".")) if path else ()
+
+    with config.lock:
+        pending: List[Tuple[ConfigView, str, Any]] = []
+        view._collect(_subtree(config, path), [()], pending)
+        _apply(pending)
+
+        ref = weakref.ref(view)
+
+        def listener(paths: List[Path]) -> None:
+            target = ref()
+            if target is None:
+                config.remove_listener(listener)
+                return
+
+            relative = []
+            for p in paths:
+                if keys[: len(p)] == p:
+                    relative = [()]
+                    break
+                if p[: len(keys)] == keys:
+                    relative.append(p[len(keys) :])
+            if not relative:
+                return
+
+            pending: List[Tuple[ConfigView, str, Any]] = []
+            try:
+                target._collect(_subtree(config, path), relative, pending)
+
+            except ConfigValidationError as e:
+                # Raising would leave the change made but the rest of the
+                # listeners uncalled, so the error is reported instead.
+                if on_error is not None:
+                    on_error(e)
+                else:
+                    warnings.warn(f"config view not updated: {e}", stacklevel=2)
+                return
+
+            _apply(pending)
+
+        config.add_listener(listener)
+        VIEW_LISTENERS[view] = listener
+
+    return view
+
+
+VIEW_LISTENERS: "weakref.WeakKeyDictionary[ConfigView, Any]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def unbind_view(view: ConfigView) -> None:
+    """
+    Stop keeping the given *view* up to date with its config.
+    """
+    listener = VIEW_LISTENERS.pop(view, None)
+    if listener is not None and view._config is not None:
+        view._config.remove_listener(listener)
+
+
+def _subtree(config: Config, path: str) -> Any:
+    if not path:
+        return config
+    try:
+        return config.get_path(path)
+
+    except KeyError:
+        raise ConfigValidationError(f"{path}: missing required key") from None
+
+
+def _apply(pending: List[Tuple[ConfigView, str, Any]]) -> None:
+    for view, name, value in pending:
+        object.__setattr__(view, name, value)
+
+
+def _join(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
+def _error(path: str, tp: Any, value: Any) -> ConfigValidationError:
+    name = getattr(tp, "__name__", None) or repr(tp)
+    return ConfigValidationError(
+        f"{path or 'config'}: expected {name}, got {type(value).__name__} {value!r}"
+    )
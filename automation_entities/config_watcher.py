@@ -0,0 +1,279 @@
+"""
+The :mod:`automation_entities.config_watcher` module contains the logic for
+noticing when the file behind a :class:`context.Config` changes and applying
+the change without restarting anything::
+
+    >>> watcher = ConfigWatcher(ctx.config)
+    >>> watcher.add_callback(lambda changes: print(changes))
+    >>> watcher.start()
+
+On Linux, the directory holding the file is watched with inotify so that
+changes are noticed almost immediately. Everywhere else, and as a fallback
+in case an event is missed, the file's modification time is polled.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import warnings
+from typing import Any, Callable, List, Optional, Tuple
+
+from .context import Config, ConfigChange
+
+#: function called with the changes applied by each reload
+ChangeCallback = Callable[[List[ConfigChange]], None]
+
+#: function called with the exception when reloading the config or calling a
+#: callback fails
+ErrorHandler = Callable[[Exception], None]
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+
+def inotify_watch(dirpath: str) -> Optional[int]:
+    """
+    Return a non-blocking inotify file descriptor watching the given
+    *dirpath* for files being written or moved into it, or ``None`` if
+    inotify isn't available.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+
+        wd = libc.inotify_add_watch(
+            fd,
+            os.fsencode(dirpath),
+            IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE,
+        )
+
+    except (OSError, AttributeError):
+        return None
+
+    if wd < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class ConfigWatcher:
+    """
+    Watches the file behind the given *config* and calls
+    :meth:`context.Config.reload` whenever it changes, which applies only
+    the keys that changed. Each registered callback is then called with
+    the list of :class:`context.ConfigChange` objects that were applied.
+    The file is checked at least every *interval* seconds. Callbacks are
+    called from the watcher's thread.
+
+    A file that can't be decoded, such as one that's only partly written,
+    is skipped until it changes again. Any other error raised while
+    reloading the config or by a callback is passed to *on_error*, or
+    issued as a warning if it's ``None``, and the watcher carries on with
+    the next callback and the next change.
+
+    :param Config config: config to keep up to date with its file
+    :param float interval: number of seconds between checks of the file
+    :param bool use_inotify: whether to use inotify if it's available
+    :param on_error: function called with each error that's caught
+
+    .. autoattribute:: config
+    .. autoattribute:: interval
+    .. autoattribute:: callbacks
+    .. autoattribute:: on_error
+
+    .. automethod:: add_callback
+    .. automethod:: start
+    .. automethod:: stop
+    .. automethod:: check
+    """
+
+    #: config to keep up to date with its file
+    config: Config
+
+    #: number of seconds between checks of the file
+    interval: float
+
+    #: functions called with the changes applied by each reload
+    callbacks: List[ChangeCallback]
+
+    #: function called with each error that's caught, if any
+    on_error: Optional[ErrorHandler]
+
+    use_inotify: bool
+    inotify_fd: Optional[int]
+    wakeup_fds: Optional[Tuple[int, int]]
+    thread: Optional[threading.Thread]
+    stopped: threading.Event
+    last_stat: Optional[Tuple[int, int, int]]
+
+    def __init__(
+        self,
+        config: Config,
+        interval: float = 1.0,
+        use_inotify: bool = True,
+        on_error: Optional[ErrorHandler] = None,
+    ) -> None:
+        assert config.filepath is not None, "config must have a filepath to watch"
+
+        self.config = config
+        self.interval = interval
+        self.callbacks = []
+        self.on_error = on_error
+        self.use_inotify = use_inotify
+        self.inotify_fd = None
+        self.wakeup_fds = None
+        self.thread = None
+        self.stopped = threading.Event()
+        self.last_stat = self.stat()
+
+    def add_callback(self, callback: ChangeCallback) -> None:
+        """
+        Call the given *callback* with the changes applied by each reload.
+        """
+        self.callbacks.append(callback)
+
+    def stat(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Return what's compared to tell whether the file has changed, or
+        ``None`` if it's missing.
+        """
+        assert self.config.filepath is not None
+        try:
+            st = os.stat(self.config.filepath)
+
+        except FileNotFoundError:
+            return None
+
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def check(self) -> List[ConfigChange]:
+        """
+        Reload the config if its file has changed since it was last checked
+        and call the callbacks with the changes.
+
+        :rtype: list
+        :returns: the :class:`context.ConfigChange` objects that were
+            applied
+        """
+        stat = self.stat()
+        if stat is None or stat == self.last_stat:
+            return []
+
+        try:
+            changes = self.config.reload()
+
+        except ValueError:
+            return []
+
+        except Exception as e:
+            self.report(e)
+            return []
+
+        finally:
+            self.last_stat = stat
+
+        if changes:
+            for callback in self.callbacks:
+                try:
+                    callback(changes)
+
+                except Exception as e:
+                    self.report(e)
+        return changes
+
+    def report(self, error: Exception) -> None:
+        """
+        Pass the given *error* to :attr:`on_error`, or issue it as a warning
+        if there isn't one.
+        """
+        # Raising would end the watcher's thread, so that no later change
+        # would be applied.
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            warnings.warn(f"config watcher: {error!r}", stacklevel=2)
+
+    def start(self) -> None:
+        """
+        Start watching the file from a background thread.
+        """
+        assert self.thread is None, "watcher already started"
+        assert self.config.filepath is not None
+
+        if self.use_inotify:
+            dirpath = os.path.dirname(os.path.abspath(self.config.filepath))
+            self.inotify_fd = inotify_watch(dirpath)
+            if self.inotify_fd is not None:
+                self.wakeup_fds = os.pipe()
+
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop watching the file and wait for the background thread to exit.
+        """
+        self.stopped.set()
+        if self.wakeup_fds is not None:
+            os.write(self.wakeup_fds[1], b"\0")
+
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+
+        if self.wakeup_fds is not None:
+            for fd in self.wakeup_fds:
+                os.close(fd)
+            self.wakeup_fds = None
+
+    def run(self) -> None:
+        """
+        Check the file until :meth:`stop` is called.
+        """
+        while not self.stopped.is_set():
+            self.wait()
+            if not self.stopped.is_set():
+                self.check()
+
+    def wait(self) -> None:
+        """
+        Wait until the file's directory has changed, if inotify is being
+        used, or until *interval* seconds have passed.
+        """
+        fd = self.inotify_fd
+        if fd is None or self.wakeup_fds is None:
+            self.stopped.wait(self.interval)
+            return
+
+        # The events themselves don't matter since check() compares the
+        # file's stat, so they're just drained.
+        readable, _, _ = select.select([fd, self.wakeup_fds[0]], [], [], self.interval)
+        if fd in readable:
+            try:
+                while os.read(fd, 65536):
+                    pass
+
+            except BlockingIOError:
+                pass
+
+    def __enter__(self) -> "ConfigWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
@@ -4,20 +4,72 @@ The :mod:`automation_entities.context` module is primarily concerned with the
 that will be expanded upon in the higher up :class:`entities.Entity` class.
 """
 
+import atexit
 import collections.abc
+import contextlib
+import contextvars
+import enum
+import fnmatch
 import json
 import os
+import threading
+import time
+import types
 import typing
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+from .config_codecs import ConfigCodec, get_codec
+from .scheduler import Scheduler
+from .sinks import LogKind, LogRecord, LogSink, Message, StdoutSink
+from .timing import CallStatsRecorder, Span, SpanRecorder
+
+
+class Verbosity(enum.IntEnum):
+    """
+    How much a :class:`Context` logs. Each level includes every level below
+    it.
+    """
+
+    #: log nothing at all
+    SILENT = 0
+
+    #: log only that an entity is being interacted with
+    INTERACTION = 1
+
+    #: also log the requests made of entities
+    REQUEST = 2
+
+    #: also log that entities have returned results
+    RESULT = 3
+
+    #: log everything, including the details of results
+    DETAIL = 4
+
+
+#: the verbosity at which each kind of log record is logged
+KIND_VERBOSITY: typing.Dict[LogKind, Verbosity] = {
+    "interaction": Verbosity.INTERACTION,
+    "request": Verbosity.REQUEST,
+    "result": Verbosity.RESULT,
+    "log": Verbosity.DETAIL,
+}
+
 
 class Subcontext:
     """
     object denoting a position lower down the context stack; this object
     shouldn't be created directly but should be used by calling
-    :meth:`Context.subcontext`
+    :meth:`Context.subcontext`. It can be used with ``async with`` as well,
+    in which case its position is tracked separately for each
+    :mod:`asyncio` task like any other.
 
     .. autoattribute:: context
     .. autoattribute:: log_position
+    .. autoattribute:: name
     """
 
     #: the parent context
@@ -26,21 +78,34 @@ class Subcontext:
     #: the log position to save for the parent context
     log_position: typing.Optional[int]
 
+    #: the name under which to record the time this subcontext takes
+    name: str
+
     already_entered: bool
+    span_id: typing.Optional[int]
+    parent_span: typing.Optional[int]
+    parent_span_name: typing.Optional[str]
+    start: float
 
-    def __init__(self, context: "Context"):
+    def __init__(self, context: "Context", name: str = "log"):
         self.context = context
         self.log_position = None
+        self.name = name
         self.already_entered = False
+        self.span_id = None
+        self.parent_span = None
+        self.parent_span_name = None
+        self.start = 0.0
 
-    def log(self, msg: str) -> None:
+    def log(self, msg: Message, *args: typing.Any, **kwds: typing.Any) -> None:
         """
         Log given *msg* as a result of an interaction with this subcontext.
+        Arguments and keywords are passed through to :meth:`Context.log`.
         """
         assert (
             self.log_position is not None
         ), "log must only be called in conjunction with __enter__"
-        self.context.log(msg)
+        self.context.log(msg, *args, **kwds)
 
     def __enter__(self) -> "Subcontext":
         assert not self.already_entered, "a subcontext may only be entered once"
@@ -48,6 +113,16 @@ class Subcontext:
         self.log_position = self.context.log_position
         self.already_entered = True
         self.context.log_position += 1
+
+        timing = self.context.timing
+        if timing is not None:
+            self.span_id = timing.next_id()
+            self.parent_span = self.context.current_span
+            self.parent_span_name = self.context.current_span_name
+            self.context.current_span = self.span_id
+            self.context.current_span_name = self.name
+            self.start = time.monotonic()
+
         return self
 
     def __exit__(self, *args, **kwds) -> None:
@@ -55,9 +130,84 @@ class Subcontext:
             self.log_position is not None
         ), "__exit__ must only be called in conjunction with __enter__"
 
-        self.context.log_position = self.log_position
+        timing = self.context.timing
+        if timing is not None and self.span_id is not None:
+            timing.record(
+                Span(
+                    id=self.span_id,
+                    parent=self.parent_span,
+                    name=self.name,
+                    depth=self.log_position,
+                    start=self.start,
+                    duration=time.monotonic() - self.start,
+                )
+            )
+            self.context.current_span = self.parent_span
+            self.context.current_span_name = self.parent_span_name
+
+        position = self.log_position
+        self.context.log_position = position
         self.log_position = None
 
+        if position == 0:
+            # Exceptions caught within the routine, such as those raised to
+            # retry, aren't failures, so the log is only dumped for one that
+            # escapes the outermost subcontext.
+            if args and args[0] is not None:
+                self.context.dump_log()
+            self.context.flush()
+
+    async def __aenter__(self) -> "Subcontext":
+        return self.__enter__()
+
+    async def __aexit__(self, *args, **kwds) -> None:
+        self.__exit__(*args, **kwds)
+
+
+class QuietSubcontext:
+    """
+    Stand-in for a :class:`Subcontext` used when nothing at all would be
+    logged, timed or counted for it, as described by
+    :meth:`Context.is_quiet`. It doesn't log or record a span, but like a
+    subcontext it moves the log position so that anything logged within it
+    is indented as usual and, when it exits at the top level, dumps the log
+    if an exception escapes it and flushes the context. Each
+    context has one, which can be entered any number of times, even
+    concurrently.
+    """
+
+    __slots__ = ("context",)
+
+    #: the parent context
+    context: "Context"
+
+    def __init__(self, context: "Context") -> None:
+        self.context = context
+
+    def log(self, msg: Message, *args: typing.Any, **kwds: typing.Any) -> None:
+        pass
+
+    def __enter__(self) -> "QuietSubcontext":
+        log_position = self.context._log_position
+        log_position.set(log_position.get() + 1)
+        return self
+
+    def __exit__(self, *args, **kwds) -> None:
+        log_position = self.context._log_position
+        position = log_position.get() - 1
+        log_position.set(position)
+
+        if position == 0:
+            if args and args[0] is not None:
+                self.context.dump_log()
+            self.context.flush()
+
+    async def __aenter__(self) -> "QuietSubcontext":
+        return self.__enter__()
+
+    async def __aexit__(self, *args, **kwds) -> None:
+        self.__exit__(*args, **kwds)
+
 
 class Context:
     """
@@ -66,50 +216,231 @@ class Context:
 
     :param dict config_defaults: default configuration values to give to
         the :attr:`config` object
+    :param LogSink sink: sink to write log lines to; defaults to a
+        :class:`sinks.StdoutSink`
+    :param Verbosity verbosity: how much to log
+    :param config_class: (optional) class of the :attr:`config` object,
+        such as :class:`LayeredConfig`; defaults to :class:`Config`
 
     .. autoattribute:: CONTEXT_DEPTH
 
     .. autoattribute:: log_position
     .. autoattribute:: config
+    .. autoattribute:: sink
+    .. autoattribute:: verbosity
+    .. autoattribute:: entity_verbosity
+    .. autoattribute:: timing
+    .. autoattribute:: call_stats
+    .. autoattribute:: log_generation
+    .. autoattribute:: quiet_subcontext
+    .. autoattribute:: scheduler
 
     .. automethod:: log
     .. automethod:: subcontext
     .. automethod:: set_config_file
+    .. automethod:: set_sink
+    .. automethod:: set_verbosity
+    .. automethod:: is_enabled
+    .. automethod:: is_quiet
+    .. automethod:: flush
+    .. automethod:: dump_log
+    .. automethod:: enable_timing
+    .. automethod:: latency_report
+    .. automethod:: enable_call_stats
+    .. automethod:: call_stats_report
+    .. automethod:: sleep
+    .. automethod:: async_sleep
     """
 
     #: the number of spaces to use when logging from this context
     CONTEXT_DEPTH: int = 4
 
-    #: the current log position
-    log_position: int
-
     subcontext_class: typing.Type["Subcontext"]
 
     #: the configuration represented by this context
     config: "Config"
 
+    #: the sink that log lines are written to; replace it with
+    #: :meth:`set_sink`
+    sink: LogSink
+
+    #: recorder of the time taken by each subcontext; ``None`` unless
+    #: :meth:`enable_timing` has been called
+    timing: typing.Optional[SpanRecorder] = None
+
+    #: recorder of the calls made to methods wrapped by
+    #: :func:`entities.describe`; ``None`` unless :meth:`enable_call_stats`
+    #: has been called
+    call_stats: typing.Optional[CallStatsRecorder] = None
+
+    #: incremented whenever anything that decides what's logged, timed or
+    #: counted is changed through the context, so that :meth:`is_quiet` can
+    #: be cached until it changes again
+    log_generation: int = 0
+
+    #: what entities use in place of a subcontext while :meth:`is_quiet`
+    quiet_subcontext: QuietSubcontext
+
+    #: scheduler that entities sleep through so that their sleeps can be
+    #: cancelled
+    scheduler: Scheduler
+
+    #: maximum number of :meth:`is_enabled` results to cache
+    ENABLED_CACHE_SIZE: int = 4096
+
+    _verbosity: Verbosity
+    _entity_verbosity: typing.Dict[str, Verbosity]
+    _enabled: typing.Dict[typing.Tuple[LogKind, typing.Optional[str]], bool]
+    _log_position: "contextvars.ContextVar[int]"
+    _current_span: "contextvars.ContextVar[typing.Optional[int]]"
+    _current_span_name: "contextvars.ContextVar[typing.Optional[str]]"
+
     def __init__(
         self,
         config_defaults: typing.Optional[dict] = None,
         subcontext_class: typing.Optional[typing.Type["Subcontext"]] = None,
+        sink: typing.Optional[LogSink] = None,
+        verbosity: Verbosity = Verbosity.DETAIL,
+        config_class: typing.Optional[typing.Type["Config"]] = None,
     ) -> None:
-        self.log_position = 0
+        self._log_position = contextvars.ContextVar(
+            f"log_position_{id(self)}", default=0
+        )
+        self._current_span = contextvars.ContextVar(
+            f"current_span_{id(self)}", default=None
+        )
+        self._current_span_name = contextvars.ContextVar(
+            f"current_span_name_{id(self)}", default=None
+        )
         self.subcontext_class = subcontext_class or Subcontext
-        self.config = Config(defaults=config_defaults)
+        self.config = (config_class or Config)(defaults=config_defaults)
+        self.sink = sink or StdoutSink()
+        self._verbosity = verbosity
+        self._entity_verbosity = {}
+        self._enabled = {}
+        self.timing = None
+        self.call_stats = None
+        self.log_generation = 0
+        self.quiet_subcontext = QuietSubcontext(self)
+        self.scheduler = Scheduler()
+
+    @property
+    def log_position(self) -> int:
+        """
+        The current log position. This is tracked separately for each thread
+        and :mod:`asyncio` task so that a single context can be shared by
+        entities running concurrently; a new thread starts at position 0
+        and a new task starts at the position of the task that created it.
+        """
+        return self._log_position.get()
+
+    @log_position.setter
+    def log_position(self, log_position: int) -> None:
+        self._log_position.set(log_position)
+
+    @property
+    def verbosity(self) -> Verbosity:
+        """
+        how much to log for entities not matched by :attr:`entity_verbosity`;
+        setting it is the same as calling :meth:`set_verbosity`
+        """
+        return self._verbosity
+
+    @verbosity.setter
+    def verbosity(self, verbosity: Verbosity) -> None:
+        self.set_verbosity(verbosity)
+
+    @property
+    def entity_verbosity(self) -> typing.Mapping[str, Verbosity]:
+        """
+        read-only mapping of how much to log for entities whose names match
+        each glob pattern, where the last matching pattern wins; add to it
+        with :meth:`set_verbosity` or replace it by setting it
+        """
+        return types.MappingProxyType(self._entity_verbosity)
 
-    def log(self, message: str) -> None:
+    @entity_verbosity.setter
+    def entity_verbosity(
+        self, entity_verbosity: typing.Mapping[str, Verbosity]
+    ) -> None:
+        self._entity_verbosity = dict(entity_verbosity)
+        self._invalidate_enabled()
+
+    @property
+    def current_span(self) -> typing.Optional[int]:
+        """
+        identifier of the span of the innermost timed subcontext; this is
+        tracked in the same way as :attr:`log_position`
+        """
+        return self._current_span.get()
+
+    @current_span.setter
+    def current_span(self, current_span: typing.Optional[int]) -> None:
+        self._current_span.set(current_span)
+
+    @property
+    def current_span_name(self) -> typing.Optional[str]:
         """
-        log given *message* to the context
+        name of the span of the innermost timed subcontext; this is tracked
+        in the same way as :attr:`log_position`
         """
-        spaces = " " * (self.log_position * self.CONTEXT_DEPTH)
-        print(f"{spaces}{message}")
+        return self._current_span_name.get()
+
+    @current_span_name.setter
+    def current_span_name(self, current_span_name: typing.Optional[str]) -> None:
+        self._current_span_name.set(current_span_name)
+
+    def log(
+        self,
+        message: Message,
+        *args: typing.Any,
+        kind: LogKind = "log",
+        entity: typing.Optional[str] = None,
+    ) -> None:
+        """
+        Log given *message* to the context as a :class:`sinks.LogRecord` of
+        the given *kind*, optionally on behalf of the *entity* with the given
+        name. The *message* may be deferred by passing a function returning
+        the message or a %-format string along with its *args*; either way,
+        it's only rendered if the :attr:`sink` actually uses it::
+
+            >>> ctx.log("found %s", element)
+            >>> ctx.log(lambda: f"found {element}")
 
-    def subcontext(self, message: str) -> Subcontext:
+        Nothing is logged at all if the record is filtered out as described
+        by :meth:`is_enabled`.
         """
-        Log the given *message* to create a new subcontext. This method
-        returns a context manager that will increment the
-        :attr:`log_position` on *__enter__* and decrement it back on
-        *__exit__*::
+        if not self.is_enabled(kind, entity):
+            return
+
+        log_position = self._log_position.get()
+        self.sink.emit(
+            LogRecord(
+                depth=log_position,
+                indent=log_position * self.CONTEXT_DEPTH,
+                timestamp=time.monotonic(),
+                kind=kind,
+                message=message,
+                entity=entity,
+                args=args,
+            )
+        )
+
+    def subcontext(
+        self,
+        message: Message,
+        *args: typing.Any,
+        kind: LogKind = "log",
+        entity: typing.Optional[str] = None,
+        name: typing.Optional[str] = None,
+    ) -> Subcontext:
+        """
+        Log the given *message* to create a new subcontext. The *args*,
+        *kind* and *entity* are passed through to :meth:`log`. If timing is
+        enabled, the time the subcontext takes is recorded under the given
+        *name* or, failing that, its *kind*. This method returns a context
+        manager that will increment the :attr:`log_position` on *__enter__*
+        and decrement it back on *__exit__*::
 
             >>> with ctx.subcontext("sub context"):
             ...     ctx.log("subcontext message")
@@ -120,28 +451,642 @@ class Context:
         :rtype: Subcontext
         :returns: subcontext object
         """
-        self.log(message)
-        return self.subcontext_class(self)
+        self.log(message, *args, kind=kind, entity=entity)
+        return self.subcontext_class(self, name=name or kind)
+
+    def set_config_file(
+        self,
+        filepath: str,
+        codec: typing.Union[str, ConfigCodec, None] = None,
+    ) -> None:
+        """
+        set config file to the given *filepath*, stored with the given
+        *codec*; see :meth:`Config.set_filepath`
+        """
+        self.config.set_filepath(filepath, codec=codec)
+
+    def set_verbosity(
+        self, verbosity: Verbosity, entity: typing.Optional[str] = None
+    ) -> None:
+        """
+        Set how much to log. If *entity* is given, it's a glob pattern and
+        the *verbosity* only applies to entities whose names match it::
+
+            >>> ctx.set_verbosity(Verbosity.REQUEST)
+            >>> ctx.set_verbosity(Verbosity.INTERACTION, entity="<*")
+        """
+        if entity is None:
+            self._verbosity = verbosity
+
+        else:
+            self._entity_verbosity.pop(entity, None)
+            self._entity_verbosity[entity] = verbosity
+
+        self._invalidate_enabled()
+
+    def _invalidate_enabled(self) -> None:
+        self._enabled.clear()
+        self.log_generation += 1
+
+    def is_enabled(self, kind: LogKind, entity: typing.Optional[str] = None) -> bool:
+        """
+        Return whether records of the given *kind* logged on behalf of the
+        *entity* with the given name are logged at the current verbosity.
+        Nothing is logged to a sink that isn't :attr:`sinks.LogSink.enabled`.
+        """
+        key = (kind, entity)
+        enabled = self._enabled.get(key)
+        if enabled is None:
+            verbosity = self._verbosity
+            if entity is not None:
+                for pattern, v in reversed(self._entity_verbosity.items()):
+                    if fnmatch.fnmatchcase(entity, pattern):
+                        verbosity = v
+                        break
+
+            if len(self._enabled) >= self.ENABLED_CACHE_SIZE:
+                self._enabled.clear()
+            enabled = self._enabled[key] = (
+                bool(self.sink.enabled) and KIND_VERBOSITY[kind] <= verbosity
+            )
+
+        return enabled
+
+    def is_quiet(self, entity: typing.Optional[str] = None) -> bool:
+        """
+        Return whether nothing at all is logged on behalf of the *entity*
+        with the given name and neither timing nor call statistics are
+        enabled. While that's the case, :func:`entities.describe` and the
+        :class:`entities.Entity` helpers skip straight to the work they
+        surround. The answer only changes when :attr:`log_generation` does.
+        """
+        return (
+            self.timing is None
+            and self.call_stats is None
+            and not self.is_enabled("interaction", entity)
+        )
+
+    def set_sink(self, sink: LogSink) -> None:
+        """
+        Flush the current :attr:`sink` and replace it with the given *sink*.
+        """
+        self.sink.flush()
+        self.sink = sink
+        self._invalidate_enabled()
+
+    def flush(self) -> None:
+        """
+        flush any log records held by the :attr:`sink` along with any
+        changes to the :attr:`config` waiting to be persisted automatically
+        """
+        self.sink.flush()
+        self.config.flush()
+
+    def enable_timing(
+        self, max_spans: typing.Optional[int] = 100000, max_samples: int = 10000
+    ) -> SpanRecorder:
+        """
+        Start recording the time taken by every subcontext and return the
+        :class:`timing.SpanRecorder` that they're recorded to. Only the most
+        recent *max_spans* spans are kept, and percentiles are taken from at
+        most *max_samples* durations for each name.
+        """
+        if self.timing is None:
+            self.timing = SpanRecorder(max_spans=max_spans, max_samples=max_samples)
+            self.log_generation += 1
+        return self.timing
+
+    def latency_report(self) -> str:
+        """
+        Return a table of the latency of each kind of interaction timed so
+        far; see :meth:`timing.SpanRecorder.format_report`.
+        """
+        assert self.timing is not None, "timing must be enabled for a latency report"
+        return self.timing.format_report()
+
+    def enable_call_stats(
+        self, dump_path: typing.Optional[str] = None
+    ) -> CallStatsRecorder:
+        """
+        Start recording statistics of the calls made to methods wrapped by
+        :func:`entities.describe` and return the
+        :class:`timing.CallStatsRecorder` that they're recorded to. If
+        *dump_path* is given, the statistics are written to it as JSON when
+        the interpreter exits.
+        """
+        if self.call_stats is None:
+            self.call_stats = CallStatsRecorder()
+            self.log_generation += 1
+            if dump_path is not None:
+                atexit.register(self.call_stats.dump, dump_path)
+        return self.call_stats
+
+    def call_stats_report(self) -> str:
+        """
+        Return a table of the statistics of each method called so far; see
+        :meth:`timing.CallStatsRecorder.format_report`.
+        """
+        assert (
+            self.call_stats is not None
+        ), "call stats must be enabled for a call stats report"
+        return self.call_stats.format_report()
 
-    def set_config_file(self, filepath: str) -> None:
+    def sleep(self, seconds: float) -> None:
         """
-        set config file to the given *filepath*
+        Block for the given number of *seconds* through the
+        :attr:`scheduler`; see :meth:`scheduler.Scheduler.sleep`.
         """
-        self.config.set_filepath(filepath)
+        self.scheduler.sleep(seconds)
+
+    async def async_sleep(self, seconds: float) -> None:
+        """
+        Sleep for the given number of *seconds* through the
+        :attr:`scheduler` without blocking the event loop; see
+        :meth:`scheduler.Scheduler.async_sleep`.
+        """
+        await self.scheduler.async_sleep(seconds)
+
+    def dump_log(self) -> None:
+        """
+        Dump any log records that the :attr:`sink` is holding on to in case
+        of failure, such as those held by a :class:`sinks.FlightRecorderSink`.
+        """
+        self.sink.dump()
+
+
+#: what :func:`merge_into` does with the ``dict`` and ``list`` values that it
+#: takes from a patch:
+#:
+#:     * ``"copy"``: copy them so that the patch and the original never share
+#:       anything that can be changed
+#:     * ``"take"``: use them as they are; the caller gives up the patch and
+#:       mustn't change it afterward, which is the cheapest option for a
+#:       freshly decoded file
+#:     * ``"share"``: use them as they are, leaving the patch and the
+#:       original sharing them
+Ownership = typing.Literal["copy", "take", "share"]
+
+#: hook that decides the value to set when a patch replaces an existing
+#: value with one that can't be merged into it; it's given the path of keys
+#: to the value, the existing value and the new value
+ConflictHook = typing.Callable[
+    [typing.Tuple[typing.Any, ...], typing.Any, typing.Any], typing.Any
+]
+
+#: function called with the paths of keys whose values have changed in a
+#: :class:`Config`
+ChangeListener = typing.Callable[[typing.List[typing.Tuple[typing.Any, ...]]], None]
+
+#: hook that's called just before a value is set; it's given the path of
+#: keys to the value, the ``dict`` the value is about to be set in and the
+#: value itself
+SetHook = typing.Callable[[typing.Tuple[typing.Any, ...], dict, typing.Any], None]
+
+
+def copy_tree(value: typing.Any) -> typing.Any:
+    """
+    Copy every ``dict`` and ``list`` in the given *value*, however deeply
+    nested, sharing everything else.
+    """
+    if not isinstance(value, (dict, list)):
+        return value
+
+    root = type(value)(value)
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        items = (
+            container.items() if isinstance(container, dict) else enumerate(container)
+        )
+        for k, v in list(items):
+            if isinstance(v, (dict, list)):
+                v = container[k] = type(v)(v)
+                stack.append(v)
+    return root
+
+
+def extend_lists(
+    path: typing.Tuple[typing.Any, ...], old: typing.Any, new: typing.Any
+) -> typing.Any:
+    """
+    A :data:`ConflictHook` that appends new lists to the lists they replace
+    rather than replacing them.
+    """
+    if isinstance(old, list) and isinstance(new, list):
+        return old + new
+    return new
+
+
+def merge_into(
+    original: dict,
+    patch: dict,
+    ownership: Ownership = "copy",
+    on_conflict: typing.Optional[ConflictHook] = None,
+    on_set: typing.Optional[SetHook] = None,
+    path: typing.Tuple[typing.Any, ...] = (),
+) -> bool:
+    """
+    Merge the given *patch* into the *original* dict. Sub-dicts in the patch
+    are merged into the sub-dicts of the original that have the same key
+    rather than replacing them; any other value replaces the value with the
+    same key, unless an *on_conflict* hook decides otherwise. Values taken
+    from the patch are handled as described by *ownership*.
+
+    The merge is done iteratively, so patches may be nested arbitrarily
+    deeply. If *on_set* is given, it's called just before each value is set,
+    and its path of keys is prefixed by *path*.
+
+    :rtype: bool
+    :returns: whether *original* was changed
+    """
+    changed = False
+    stack = [(path, original, patch)]
+    while stack:
+        prefix, target, source = stack.pop()
+        for k, v in source.items():
+            key_path = prefix + (k,)
+            if k in target:
+                old = target[k]
+                if isinstance(v, dict) and isinstance(old, dict):
+                    stack.append((key_path, old, v))
+                    continue
+
+                if on_conflict is not None:
+                    v = on_conflict(key_path, old, v)
+                if old is v or old == v:
+                    continue
+
+            if ownership == "copy":
+                v = copy_tree(v)
+
+            changed = True
+            if on_set is not None:
+                on_set(key_path, target, v)
+            target[k] = v
+
+    return changed
 
 
-def patch_dict(original: dict, patch: dict) -> None:
+def patch_dict(
+    original: dict,
+    patch: dict,
+    on_set: typing.Optional[SetHook] = None,
+    path: typing.Tuple[typing.Any, ...] = (),
+) -> bool:
     """
     Patch given *original* dict with the new *patch*. This function
-    recursively iterates over all keys in the patch and applies them to
-    existing keys in the original. It does not replace a sub-dict. Rather,
-    it recursively replaces its keys.
+    iterates over all keys in the patch and applies them to existing keys in
+    the original. It does not replace a sub-dict. Rather, it replaces its
+    keys. Values taken from the patch are copied so that changing the
+    original never changes the patch or vice versa; see :func:`merge_into`
+    for more control.
+
+    If *on_set* is given, it's called just before each value is set with
+    the path of keys to the value, prefixed by *path*, the ``dict`` the
+    value is about to be set in and the value itself.
+
+    :rtype: bool
+    :returns: whether *original* was changed
+    """
+    return merge_into(original, patch, on_set=on_set, path=path)
+
+
+def merge_dicts(layers: typing.List[dict]) -> dict:
+    """
+    Merge the given *layers* of ``dict`` objects, each taking precedence
+    over the ones before it, in the same way that :func:`patch_dict` would
+    patch them on top of each other. Unlike :func:`patch_dict`, none of the
+    layers are changed: sub-dicts that only one layer has are shared with
+    that layer rather than copied, as is the whole layer if it's the only
+    one that isn't empty.
+    """
+    layers = [layer for layer in layers if layer]
+    if not layers:
+        return {}
+
+    if len(layers) == 1:
+        return layers[0]
+
+    root: dict = {}
+    stack = [(root, layers)]
+    while stack:
+        merged, subdicts = stack.pop()
+        for layer in subdicts:
+            for k in layer:
+                if k in merged:
+                    continue
+
+                values = [layer[k] for layer in subdicts if k in layer]
+                if not isinstance(values[-1], dict):
+                    merged[k] = values[-1]
+                    continue
+
+                # Only the sub-dicts above the topmost non-dict value are
+                # merged, and empty ones needn't be.
+                to_merge: typing.List[dict] = []
+                for v in reversed(values):
+                    if not isinstance(v, dict):
+                        break
+                    if v:
+                        to_merge.insert(0, v)
+
+                if len(to_merge) == 1:
+                    merged[k] = to_merge[0]
+
+                else:
+                    merged[k] = {}
+                    stack.append((merged[k], to_merge))
+
+    return root
+
+
+#: placeholder for a value that isn't there, such as the new value of a
+#: key removed by a :class:`ConfigChange`
+MISSING: typing.Any = object()
+
+
+class FrozenMap(collections.abc.Mapping):
+    """
+    An immutable ``dict`` returned as part of a :meth:`Config.snapshot`.
+    Its values are frozen too: sub-dicts are :class:`FrozenMap` objects and
+    lists are tuples, so a snapshot can be read from any thread without a
+    lock. :meth:`thaw` returns a mutable copy.
+
+    .. automethod:: thaw
+    """
+
+    __slots__ = ("_data", "_hash")
+
+    _data: dict
+    _hash: typing.Optional[int]
+
+    def __init__(self, data: typing.Optional[typing.Mapping] = None) -> None:
+        frozen = freeze(dict(data or {}))
+        self._data = frozen._data
+        self._hash = None
+
+    @classmethod
+    def _wrap(cls, data: dict) -> "FrozenMap":
+        # data must already be frozen and owned by the new map.
+        ret = cls.__new__(cls)
+        ret._data = data
+        ret._hash = None
+        return ret
+
+    def thaw(self) -> dict:
+        """
+        Return a mutable copy of the map, with dicts and lists in place of
+        every nested :class:`FrozenMap` and tuple.
+        """
+        return thaw(self)
+
+    def __getitem__(self, key: typing.Any) -> typing.Any:
+        return self._data[key]
+
+    def __iter__(self) -> typing.Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: typing.Any) -> bool:
+        return key in self._data
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if isinstance(other, FrozenMap):
+            return self._data == other._data
+        if isinstance(other, dict):
+            return self._data == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._data.items()))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"FrozenMap({self._data!r})"
+
+
+def freeze(value: typing.Any) -> typing.Any:
     """
-    for k, v in patch.items():
-        if k not in original or not isinstance(v, dict):
-            original[k] = v
-        elif isinstance(v, dict):
-            patch_dict(original[k], v)
+    Return a frozen copy of the given *value*, turning dicts into
+    :class:`FrozenMap` objects and lists into tuples, however deeply
+    they're nested. Values that are already frozen are shared.
+    """
+    if not isinstance(value, (dict, list)):
+        return value
+
+    # Containers are frozen once all of their children have been, so each
+    # entry is visited twice: once to queue its children and once to build
+    # it from them.
+    frozen: typing.Dict[int, typing.Any] = {}
+    stack: typing.List[typing.Tuple[typing.Any, bool]] = [(value, False)]
+    while stack:
+        node, built = stack.pop()
+        if not built:
+            stack.append((node, True))
+            for v in node.values() if isinstance(node, dict) else node:
+                if isinstance(v, (dict, list)) and id(v) not in frozen:
+                    stack.append((v, False))
+            continue
+
+        if isinstance(node, dict):
+            frozen[id(node)] = FrozenMap._wrap(
+                {k: frozen.get(id(v), v) for k, v in node.items()}
+            )
+        else:
+            frozen[id(node)] = tuple(frozen.get(id(v), v) for v in node)
+
+    return frozen[id(value)]
+
+
+def thaw(value: typing.Any) -> typing.Any:
+    """
+    Return a mutable copy of the given frozen *value*, turning
+    :class:`FrozenMap` objects into dicts and tuples into lists.
+    """
+    if not isinstance(value, (FrozenMap, tuple)):
+        return value
+
+    root: typing.Any = {} if isinstance(value, FrozenMap) else []
+    stack = [(root, value)]
+    while stack:
+        target, source = stack.pop()
+        items = source.items() if isinstance(source, FrozenMap) else enumerate(source)
+        for k, v in items:
+            if isinstance(v, (FrozenMap, tuple)):
+                child: typing.Any = {} if isinstance(v, FrozenMap) else []
+                stack.append((child, v))
+                v = child
+            if isinstance(target, dict):
+                target[k] = v
+            else:
+                target.append(v)
+
+    return root
+
+
+def _refreeze(old: typing.Any, value: typing.Any, stale: typing.Any) -> typing.Any:
+    # Return a frozen copy of value that shares every part of old outside
+    # of the stale tree, where True means that a whole subtree is stale.
+    if stale is True or not isinstance(old, FrozenMap) or not isinstance(value, dict):
+        return freeze(value)
+
+    data = dict(old._data)
+    for k, sub in stale.items():
+        if k in value:
+            data[k] = _refreeze(data.get(k), value[k], sub)
+        else:
+            data.pop(k, None)
+    return FrozenMap._wrap(data)
+
+
+class ConfigChange(typing.NamedTuple):
+    """
+    a single key that differs between two versions of a configuration
+    """
+
+    #: path of keys to the value that changed
+    path: typing.Tuple[typing.Any, ...]
+
+    #: the value before the change, or :data:`MISSING` if it was added
+    old: typing.Any
+
+    #: the value after the change, or :data:`MISSING` if it was removed
+    new: typing.Any
+
+
+def diff_config(old: dict, new: dict) -> typing.List[ConfigChange]:
+    """
+    Return every key that differs between the *old* and *new* versions of a
+    configuration. Sub-dicts that are in both are compared key by key; any
+    other value that differs is a single change.
+    """
+    changes = []
+    stack: typing.List[typing.Tuple[typing.Tuple[typing.Any, ...], dict, dict]] = [
+        ((), old, new)
+    ]
+    while stack:
+        prefix, old_dict, new_dict = stack.pop()
+        for k, v in new_dict.items():
+            if k not in old_dict:
+                changes.append(ConfigChange(prefix + (k,), MISSING, v))
+
+            elif isinstance(v, dict) and isinstance(old_dict[k], dict):
+                stack.append((prefix + (k,), old_dict[k], v))
+
+            elif old_dict[k] != v:
+                changes.append(ConfigChange(prefix + (k,), old_dict[k], v))
+
+        for k, v in old_dict.items():
+            if k not in new_dict:
+                changes.append(ConfigChange(prefix + (k,), v, MISSING))
+
+    return changes
+
+
+def apply_change(
+    data: dict, change: ConfigChange, on_set: typing.Optional[SetHook] = None
+) -> None:
+    """
+    Apply the given *change* to *data*, creating any missing sub-dicts
+    along its path. A new ``dict`` is merged into a ``dict`` that's already
+    there as :func:`merge_into` would; any other new value is copied as
+    described by :func:`copy_tree`. If *on_set* is given, it's called just
+    before each value is set or, with :data:`MISSING` as the value,
+    removed.
+    """
+    parent = data
+    for i, k in enumerate(change.path[:-1]):
+        child = parent.get(k)
+        if not isinstance(child, dict):
+            if change.new is MISSING:
+                return
+            child = {}
+            if on_set is not None:
+                on_set(change.path[: i + 1], parent, child)
+            parent[k] = child
+        parent = child
+
+    k = change.path[-1]
+    if change.new is MISSING:
+        if k in parent:
+            if on_set is not None:
+                on_set(change.path, parent, MISSING)
+            del parent[k]
+
+    elif isinstance(change.new, dict) and isinstance(parent.get(k), dict):
+        merge_into(parent[k], change.new, on_set=on_set, path=change.path)
+
+    else:
+        val = copy_tree(change.new)
+        if on_set is not None:
+            on_set(change.path, parent, val)
+        parent[k] = val
+
+
+@contextlib.contextmanager
+def lock_directory(dirpath: str) -> typing.Iterator[None]:
+    """
+    Hold an exclusive advisory lock on the given *dirpath* for as long as
+    the context lasts. The directory is locked rather than a file in it
+    since files are replaced rather than rewritten. Nothing is locked on
+    platforms without :mod:`fcntl`.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+
+    fd = os.open(dirpath, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+
+    finally:
+        os.close(fd)
+
+
+def _path_str(path: typing.Tuple[typing.Any, ...]) -> typing.Optional[str]:
+    # Return the dotted form of path, or None if it can't be expressed as one.
+    for k in path:
+        if not isinstance(k, str) or "." in k:
+            return None
+    return ".".join(path)
+
+
+def _index_value(
+    index: typing.Dict[str, typing.Any],
+    path: typing.Tuple[typing.Any, ...],
+    val: typing.Any,
+) -> None:
+    stack = [(path, val)]
+    while stack:
+        path, val = stack.pop()
+        path_str = _path_str(path)
+        if path_str is None:
+            continue
+
+        index[path_str] = val
+        if isinstance(val, dict):
+            stack.extend((path + (k,), v) for k, v in val.items())
+
+
+def _unindex_value(
+    index: typing.Dict[str, typing.Any],
+    path: typing.Tuple[typing.Any, ...],
+    val: typing.Any,
+) -> None:
+    stack = [(path, val)]
+    while stack:
+        path, val = stack.pop()
+        path_str = _path_str(path)
+        if path_str is None:
+            continue
+
+        index.pop(path_str, None)
+        if isinstance(val, dict):
+            stack.extend((path + (k,), v) for k, v in val.items())
 
 
 class Config(collections.abc.MutableMapping):
@@ -152,75 +1097,467 @@ class Config(collections.abc.MutableMapping):
     and :meth:`persist` methods can be used to load configuration data from
     the filepath and persist it to the filepath, respectively.
 
+    Changes made through the config itself, including nested changes made
+    with :meth:`patch`, mark it as :attr:`dirty`, and :meth:`persist` does
+    nothing while the config is clean. Changes made directly to a nested
+    ``dict`` can't be seen by the config, so call :meth:`mark_dirty` after
+    making them.
+
+    Nested values can be looked up by their dotted path with
+    :meth:`get_path`, which is backed by an index of every path in the
+    config that's built on first use and kept up to date as the config
+    changes::
+
+        >>> ctx.config.set_path("browsers.chrome.timeouts.page", 30)
+        >>> ctx.config.get_path("browsers.chrome.timeouts.page")
+        30
+
+    Only string keys without dots in them can be looked up by path.
+
+    Threads that only read the config can take a :meth:`snapshot` of it,
+    which never changes and needs no lock to read. Snapshots share every
+    part of the config that hasn't changed since the last one, so taking one
+    after a small change is cheap::
+
+        >>> snapshot = ctx.config.snapshot()
+        >>> snapshot["browsers"]["chrome"]["timeouts"]["page"]
+        30
+
+    Functions registered with :meth:`add_listener` are called with the
+    paths of keys whose values have changed after every change made through
+    the config, including reloads. A path of ``()`` means that anything may
+    have changed.
+
+    Rather than calling :meth:`persist` after every change, the config can
+    be told to persist itself with :meth:`enable_auto_persist`. Changes are
+    then coalesced and written together at most *delay* seconds after the
+    first of them, whenever :meth:`flush` is called, when the config is used
+    as a context manager and exits, when the outermost subcontext of a
+    :class:`Context` using the config exits and when the interpreter exits::
+
+        >>> ctx.config.enable_auto_persist(delay=0.5)
+        >>> ctx.config["token"] = token
+        >>> ctx.config["cookies"] = cookies
+        >>> ctx.config.flush()
+
     .. attribute:: filepath
 
         ``str`` filepath containing the configuration
 
+    .. autoattribute:: dirty
+    .. autoattribute:: auto_persist_delay
+    .. autoattribute:: file_data
+    .. autoattribute:: codec
+
     .. automethod:: patch
     .. automethod:: set_filepath
+    .. automethod:: get_codec
     .. automethod:: persist
     .. automethod:: load
+    .. automethod:: reload
+    .. automethod:: mark_dirty
+    .. automethod:: get_path
+    .. automethod:: set_path
+    .. automethod:: snapshot
+    .. automethod:: add_listener
+    .. automethod:: remove_listener
+    .. automethod:: enable_auto_persist
+    .. automethod:: flush
     """
 
     filepath: typing.Optional[str]
     defaults: typing.Optional[dict]
+
+    #: whether the config has changed since it was last loaded or persisted
+    dirty: bool
+
+    #: number of seconds after a change that the config persists itself
+    #: within, or ``None`` if it doesn't persist itself
+    auto_persist_delay: typing.Optional[float]
+
+    #: contents of the file as of when it was last loaded, reloaded or
+    #: persisted, or ``None`` if it hasn't been yet
+    file_data: typing.Optional[dict]
+
+    #: codec that the file is stored with, or the name of one; ``None`` to
+    #: pick one by the file's extension
+    codec: typing.Union[str, ConfigCodec, None]
+
+    #: functions called with the paths of keys whose values have changed
+    listeners: typing.List[ChangeListener]
+
     _data: dict
+    _index: typing.Optional[typing.Dict[str, typing.Any]]
+    _snapshot: typing.Optional[FrozenMap]
+    _stale: typing.Any
+    lock: threading.RLock
+    timer: typing.Optional[threading.Timer]
 
     def __init__(self, defaults: typing.Optional[dict] = None):
         self.filepath = None
         self.defaults = defaults
         self._data = {}
+        self._index = None
+        self._snapshot = None
+        self._stale = None
+        self.file_data = None
+        self.codec = None
+        self.dirty = False
+        self.auto_persist_delay = None
+        self.lock = threading.RLock()
+        self.timer = None
+        self.listeners = []
 
         if self.defaults is not None:
             self.patch(self.defaults)
 
-    def patch(self, new_vals: dict) -> None:
+    def patch(self, new_vals: dict, ownership: Ownership = "copy") -> None:
+        """
+        patch given original ``dict`` with new values, taking ownership of
+        them as described by :data:`Ownership`
+        """
+        with self.lock:
+            paths: typing.List[typing.Tuple[typing.Any, ...]] = []
+
+            def on_set(
+                path: typing.Tuple[typing.Any, ...], parent: dict, val: typing.Any
+            ) -> None:
+                self._reindex(path, parent, val)
+                paths.append(path)
+
+            tracked = (
+                self._index is not None or self._snapshot is not None or self.listeners
+            )
+            if merge_into(
+                self._data, new_vals, ownership, on_set=on_set if tracked else None
+            ):
+                self._mark_dirty()
+            self._notify(paths)
+
+    def mark_dirty(self) -> None:
+        """
+        mark the config as :attr:`dirty`, scheduling it to be persisted if
+        auto-persist is enabled
+        """
+        with self.lock:
+            self._index = None
+            self._mark_dirty()
+            self._notify([()])
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """
+        Call the given *listener* with the paths of keys whose values have
+        changed after every change.
+        """
+        with self.lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener) -> None:
+        """
+        Stop calling the given *listener*.
+        """
+        with self.lock:
+            self.listeners.remove(listener)
+
+    def snapshot(self) -> FrozenMap:
+        """
+        Return an immutable copy of the config that can be read from any
+        thread without a lock, sharing whatever hasn't changed since the
+        last snapshot was taken.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and self._stale is None:
+            return snapshot
+
+        with self.lock:
+            if self._snapshot is None or self._stale is not None:
+                self._snapshot = _refreeze(
+                    self._snapshot, self._index_root(), self._stale or True
+                )
+                self._stale = None
+            return self._snapshot
+
+    def _notify(self, paths: typing.List[typing.Tuple[typing.Any, ...]]) -> None:
+        if not paths:
+            return
+
+        if self._snapshot is not None:
+            for path in paths:
+                self._mark_stale(path)
+
+        for listener in list(self.listeners):
+            listener(paths)
+
+    def _mark_stale(self, path: typing.Tuple[typing.Any, ...]) -> None:
+        if not path:
+            self._stale = True
+            return
+
+        if self._stale is True:
+            return
+
+        if self._stale is None:
+            self._stale = {}
+        node = self._stale
+        for k in path[:-1]:
+            node = node.setdefault(k, {})
+            if node is True:
+                return
+        node[path[-1]] = True
+
+    def _mark_dirty(self) -> None:
+        with self.lock:
+            self.dirty = True
+            if (
+                self.auto_persist_delay is not None
+                and self.filepath is not None
+                and self.timer is None
+            ):
+                self.timer = threading.Timer(self.auto_persist_delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def enable_auto_persist(self, delay: float = 1.0) -> None:
+        """
+        Persist the config automatically at most *delay* seconds after it
+        changes, coalescing every change made in the meantime into a single
+        write.
+        """
+        with self.lock:
+            if self.auto_persist_delay is None:
+                atexit.register(self.flush)
+            self.auto_persist_delay = delay
+            if self.dirty:
+                self._mark_dirty()
+
+    def flush(self) -> None:
         """
-        patch given original ``dict`` with new values
+        Persist any changes waiting to be persisted automatically and return
+        once they've been written. This does nothing unless auto-persist is
+        enabled.
         """
-        patch_dict(self._data, new_vals)
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+            if self.auto_persist_delay is not None and self.filepath is not None:
+                self.persist()
+
+    def __enter__(self) -> "Config":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.flush()
 
-    def set_filepath(self, filepath: str) -> None:
+    def set_filepath(
+        self,
+        filepath: str,
+        codec: typing.Union[str, ConfigCodec, None] = None,
+    ) -> None:
         """
-        set persistence filepath to *filepath*
+        set persistence filepath to *filepath*, stored with the given
+        *codec*, which may be a :class:`config_codecs.ConfigCodec` or the
+        name of one; by default, the codec is picked by the extension of
+        *filepath*
         """
         self.filepath = filepath
+        self.codec = codec
         self.load()
 
-    def persist(self) -> None:
+    def get_codec(self) -> ConfigCodec:
+        """
+        Return the codec that the file is stored with.
+        """
+        return get_codec(self.codec, self.filepath)
+
+    def _read(self) -> dict:
+        assert self.filepath is not None
+        with open(self.filepath, "rb") as fobj:
+            return self.get_codec().loads(fobj.read())
+
+    def persist(self, force: bool = False) -> None:
         """
-        persist new config to the file
+        persist new config to the file if it's :attr:`dirty` or *force* is
+        set
+
+        Other processes may be sharing the file, so only the keys that have
+        changed since the file was last loaded, reloaded or persisted are
+        written: while holding a lock on the file's directory, the latest
+        version of the file is read, the changed keys are applied to it and
+        the result is written to a temporary file that then replaces the
+        original so that readers never see a partially written file. Keys
+        changed by other processes are applied to the config as well.
         """
         assert self.filepath is not None, "filepath must be set before calling persist"
 
-        with open(self.filepath, "w") as fobj:
-            json.dump(
-                self._data,
-                fobj,
-                sort_keys=True,
-                indent=4,
-            )
+        with self.lock:
+            if not self.dirty and not force:
+                return
+
+            dirpath = os.path.dirname(os.path.abspath(self.filepath))
+            with lock_directory(dirpath):
+                local_changes = diff_config(self.file_data or {}, self._data)
+                if not os.path.isfile(self.filepath):
+                    merged = copy_tree(self._data)
+
+                else:
+                    merged = self._read()
+                    for change in local_changes:
+                        apply_change(merged, change)
+
+                self._write(merged)
+
+            remote_changes = diff_config(self._data, merged)
+            for change in remote_changes:
+                self._apply_change(change)
+            if remote_changes:
+                self._data_changed()
+
+            self.dirty = False
+            self.file_data = merged
+            self._notify([c.path for c in remote_changes])
+
+    def _write(self, data: dict) -> None:
+        assert self.filepath is not None
+        tmp_filepath = f"{self.filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            encoded = self.get_codec().dumps(data)
+            with open(tmp_filepath, "wb") as fobj:
+                fobj.write(encoded)
+            os.replace(tmp_filepath, self.filepath)
+
+        except BaseException:
+            if os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
+            raise
 
     def load(self) -> None:
         """
-        load config from file
+        load config from file, persisting it again only if the file is
+        missing or lacks some of the current values
         """
         assert self.filepath is not None, "filepath must be set before calling load"
 
-        if os.path.isfile(self.filepath):
-            with open(self.filepath) as fobj:
-                self.patch(json.load(fobj))
+        with self.lock:
+            loaded = None
+            if os.path.isfile(self.filepath):
+                loaded = self._read()
+                self.patch(loaded)
+                self.file_data = loaded
+
+            self.dirty = self._data != loaded
+            self.persist()
 
-        self.persist()
+    def reload(self) -> typing.List[ConfigChange]:
+        """
+        Load the file again and apply only the keys that have changed in it
+        since it was last loaded, reloaded or persisted. Keys that have only
+        changed in the config are left alone, and the config stays
+        :attr:`dirty` if it was. Nothing happens if the file is missing.
+
+        :rtype: list
+        :returns: the :class:`ConfigChange` objects that were applied
+        """
+        assert self.filepath is not None, "filepath must be set before calling reload"
+
+        with self.lock:
+            if not os.path.isfile(self.filepath):
+                return []
+
+            loaded = self._read()
+
+            changes = diff_config(self.file_data or {}, loaded)
+            for change in changes:
+                self._apply_change(change)
+            self.file_data = loaded
+
+            if changes:
+                self._data_changed()
+            self._notify([c.path for c in changes])
+            return changes
+
+    def _apply_change(self, change: ConfigChange) -> None:
+        apply_change(self._data, change, self._reindex)
+
+    def _data_changed(self) -> None:
+        # Called when the data has changed without the config becoming dirty.
+        pass
+
+    def get_path(self, path: str, default: typing.Any = MISSING) -> typing.Any:
+        """
+        Return the value at the given dotted *path*, such as
+        ``"browsers.chrome.timeouts.page"`` for
+        ``config["browsers"]["chrome"]["timeouts"]["page"]``. If there's
+        nothing at *path*, *default* is returned if it's given and
+        :class:`KeyError` is raised otherwise.
+        """
+        index = self._index
+        if index is None:
+            index = self._build_index()
+
+        try:
+            return index[path]
+
+        except KeyError:
+            if default is MISSING:
+                raise
+            return default
+
+    def set_path(self, path: str, val: typing.Any) -> None:
+        """
+        Set the value at the given dotted *path* to *val*, creating any
+        missing sub-dicts along the way. This is the same as calling
+        :meth:`patch` with a nested ``dict`` holding only *val*.
+        """
+        keys = path.split(".")
+        new_vals = {keys[-1]: val}
+        for k in reversed(keys[:-1]):
+            new_vals = {k: new_vals}
+        self.patch(new_vals, ownership="take")
+
+    def _index_root(self) -> dict:
+        return self._data
+
+    def _build_index(self) -> typing.Dict[str, typing.Any]:
+        with self.lock:
+            if self._index is None:
+                index: typing.Dict[str, typing.Any] = {}
+                for k, v in self._index_root().items():
+                    _index_value(index, (k,), v)
+                self._index = index
+            return self._index
+
+    def _reindex(
+        self, path: typing.Tuple[typing.Any, ...], parent: dict, val: typing.Any
+    ) -> None:
+        # Called just before parent[path[-1]] is replaced with val.
+        index = self._index
+        if index is None:
+            return
+
+        if path[-1] in parent:
+            _unindex_value(index, path, parent[path[-1]])
+        if val is not MISSING:
+            _index_value(index, path, val)
 
     def __getitem__(self, key: typing.Any) -> typing.Any:
         return self._data.__getitem__(key)
 
     def __setitem__(self, key: typing.Any, val: typing.Any) -> None:
-        self._data.__setitem__(key, val)
+        with self.lock:
+            self._reindex((key,), self._data, val)
+            self._data.__setitem__(key, val)
+            self._mark_dirty()
+            self._notify([(key,)])
 
     def __delitem__(self, key: typing.Any) -> None:
-        self._data.__delitem__(key)
+        with self.lock:
+            if key in self._data:
+                self._reindex((key,), self._data, MISSING)
+            self._data.__delitem__(key)
+            self._mark_dirty()
+            self._notify([(key,)])
 
     def __iter__(self) -> typing.Iterator:
         return self._data.__iter__()
@@ -229,4 +1566,169 @@ class Config(collections.abc.MutableMapping):
         return self._data.__len__()
 
 
+class LayeredConfig(Config):
+    """
+    A :class:`Config` that keeps each source of configuration in its own
+    layer rather than patching them all into one ``dict``. From lowest to
+    highest precedence, the layers are:
+
+        * :attr:`defaults`, which are shared rather than copied
+        * the file layer, which is what's changed by setting and deleting
+          keys and by :meth:`patch`, and is the only layer that's loaded
+          and persisted
+        * :attr:`environ`, which is read from environment variables whose
+          names start with *env_prefix*; see :meth:`load_environ`
+        * :attr:`overrides`, which are changed by :meth:`override` and
+          never persisted
+
+    Lookups go through a merged view of the layers that's only recomputed
+    after one of them changes. Values in the merged view may be shared with
+    the layers, so change them through the config rather than in place.
+    Deleting a key only deletes it from the file layer, so a key that's in
+    another layer as well remains in the merged view.
+
+    :param dict defaults: (optional) default configuration values
+    :param str env_prefix: (optional) prefix of the environment variables
+        to read the :attr:`environ` layer from
+
+    .. autoattribute:: env_prefix
+    .. autoattribute:: environ
+    .. autoattribute:: overrides
+    .. autoattribute:: merged
+
+    .. automethod:: load_environ
+    .. automethod:: override
+    .. automethod:: clear_overrides
+    .. automethod:: layers
+    """
+
+    #: prefix of the environment variables to read the :attr:`environ`
+    #: layer from, if any
+    env_prefix: typing.Optional[str]
+
+    #: configuration read from environment variables
+    environ: dict
+
+    #: configuration overridden at runtime
+    overrides: dict
+
+    _merged: typing.Optional[dict]
+
+    def __init__(
+        self,
+        defaults: typing.Optional[dict] = None,
+        env_prefix: typing.Optional[str] = None,
+    ) -> None:
+        super().__init__()
+        self.defaults = defaults
+        self.env_prefix = env_prefix
+        self.environ = {}
+        self.overrides = {}
+        self._merged = None
+
+        if self.env_prefix is not None:
+            self.load_environ()
+
+    def load_environ(
+        self, environ: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> None:
+        """
+        Replace the :attr:`environ` layer with the variables in *environ*,
+        which defaults to :data:`os.environ`, whose names start with
+        :attr:`env_prefix`. The rest of each name is lowercased and split on
+        ``__`` to get the path of nested keys to set, so that, with a prefix
+        of ``AE_``, ``AE_BROWSER__HEADLESS=true`` sets
+        ``{"browser": {"headless": True}}``. Values are decoded as JSON if
+        they can be and used as strings otherwise.
+        """
+        assert (
+            self.env_prefix is not None
+        ), "env_prefix must be set before calling load_environ"
+
+        if environ is None:
+            environ = os.environ
+
+        layer: dict = {}
+        for name, value in environ.items():
+            if not name.startswith(self.env_prefix):
+                continue
+
+            decoded: typing.Any = value
+            try:
+                decoded = json.loads(value)
+
+            except ValueError:
+                pass
+
+            path = name[len(self.env_prefix) :].lower().split("__")
+            d = layer
+            for k in path[:-1]:
+                if not isinstance(d.get(k), dict):
+                    d[k] = {}
+                d = d[k]
+            d[path[-1]] = decoded
+
+        with self.lock:
+            self.environ = layer
+            self._data_changed()
+            self._notify([()])
+
+    def override(self, new_vals: dict) -> None:
+        """
+        patch the :attr:`overrides` layer with new values
+        """
+        with self.lock:
+            patch_dict(self.overrides, new_vals)
+            self._data_changed()
+            self._notify([()])
+
+    def clear_overrides(self) -> None:
+        """
+        remove every value from the :attr:`overrides` layer
+        """
+        with self.lock:
+            self.overrides = {}
+            self._data_changed()
+            self._notify([()])
+
+    def layers(self) -> typing.List[dict]:
+        """
+        Return each layer, lowest precedence first.
+        """
+        return [self.defaults or {}, self._data, self.environ, self.overrides]
+
+    def _mark_dirty(self) -> None:
+        with self.lock:
+            self._data_changed()
+            super()._mark_dirty()
+
+    def _data_changed(self) -> None:
+        with self.lock:
+            self._merged = None
+            self._index = None
+
+    def _index_root(self) -> dict:
+        return self.merged
+
+    @property
+    def merged(self) -> dict:
+        """
+        the merged view of every layer
+        """
+        merged = self._merged
+        if merged is None:
+            with self.lock:
+                merged = self._merged = merge_dicts(self.layers())
+        return merged
+
+    def __getitem__(self, key: typing.Any) -> typing.Any:
+        return self.merged.__getitem__(key)
+
+    def __iter__(self) -> typing.Iterator:
+        return self.merged.__iter__()
+
+    def __len__(self) -> int:
+        return self.merged.__len__()
+
+
 background = Context()
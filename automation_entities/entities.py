@@ -4,10 +4,13 @@ used as a way to log interactions with remote components.
 """
 
 import functools
-import time
-from typing import Any, Callable, Optional, TypeVar
+import inspect
+import sys
+from typing import Any, Callable, Optional, Tuple, TypeVar, Union
 
-from .context import Context, Subcontext
+from .context import Context, QuietSubcontext, Subcontext
+from .rendering import render, render_call
+from .sinks import LogKind, Message, render_message
 
 D = TypeVar("D", bound=Callable)
 
@@ -16,33 +19,97 @@ def describe(fcn: D) -> D:
     """
     Decorator for :class:`Entity` instance methods that will describe the
     method call to the entity's context on entrance and print its return
-    value on exit.
+    value on exit. Arguments and return values are rendered within a
+    budget of characters by :func:`rendering.render`, so large or
+    expensive values cost no more to log than the part that's shown. If
+    call statistics are enabled on the context with
+    :meth:`context.Context.enable_call_stats`, the call is recorded under
+    the method's qualified name.
+
+    While the context :meth:`~context.Context.is_quiet` for the entity,
+    nothing is rendered or logged and the method is called all but
+    directly.
+
+    Coroutine methods are described in the same way, with the return value
+    logged once the coroutine has finished::
+
+        >>> class Api(Entity):
+        ...     @describe
+        ...     async def get(self, path: str) -> dict:
+        ...         async with self.interaction():
+        ...             ...
     """
+    if inspect.iscoroutinefunction(fcn):
+        return describe_async(fcn)
 
     @functools.wraps(fcn)
     def inner(self: "Entity", *args, **kwds) -> Any:
         assert isinstance(self, Entity), "received invalid 'self' value type"
 
-        arg_toks = [repr(a) for a in args] + [f"{k}={repr(v)}" for k, v in kwds.items()]
-        arg_str = ", ".join(arg_toks)
-        if len(arg_str) > 100:
-            arg_str = arg_str[:97] + "..."
-        with self.context.subcontext(f"{fcn.__qualname__}({arg_str}):") as sctx:
-            ret = fcn(self, *args, **kwds)
-            ret_str = repr(ret)
-            if len(ret_str) > 100:
-                ret_str = ret_str[:97] + "..."
-            sctx.log(f"Return: {ret_str}")
+        if self.is_quiet():
+            with self.context.quiet_subcontext:
+                return fcn(self, *args, **kwds)
+
+        arg_str = render_call(args, kwds)
+        stats = self.context.call_stats
+        with self.context.subcontext(
+            f"{fcn.__qualname__}({arg_str}):",
+            kind="interaction",
+            entity=self.name,
+            name=fcn.__qualname__,
+        ) as sctx:
+            if stats is None:
+                ret = fcn(self, *args, **kwds)
+            else:
+                with stats.call(fcn.__qualname__):
+                    ret = fcn(self, *args, **kwds)
+            sctx.log(lambda: f"Return: {render(ret)}", kind="result", entity=self.name)
             return ret
 
     return inner
 
 
+def describe_async(fcn: D) -> D:
+    """
+    Version of :func:`describe` for coroutine methods; :func:`describe`
+    calls this itself when given one.
+    """
+
+    @functools.wraps(fcn)
+    async def inner(self: "Entity", *args, **kwds) -> Any:
+        assert isinstance(self, Entity), "received invalid 'self' value type"
+
+        if self.is_quiet():
+            async with self.context.quiet_subcontext:
+                return await fcn(self, *args, **kwds)
+
+        arg_str = render_call(args, kwds)
+        stats = self.context.call_stats
+        async with self.context.subcontext(
+            f"{fcn.__qualname__}({arg_str}):",
+            kind="interaction",
+            entity=self.name,
+            name=fcn.__qualname__,
+        ) as sctx:
+            if stats is None:
+                ret = await fcn(self, *args, **kwds)
+            else:
+                with stats.call(fcn.__qualname__):
+                    ret = await fcn(self, *args, **kwds)
+            sctx.log(lambda: f"Return: {render(ret)}", kind="result", entity=self.name)
+            return ret
+
+    return inner  # type: ignore
+
+
 class SubInteraction(object):
     """
     Context manager that surrounds a sub-interaction of an entity. This
     class shouldn't be instantiated on its own but should instead be
     returned by calling :meth:`Entity.request` or :meth:`Entity.result`.
+    The *message* may be deferred along with its *args* as described by
+    :meth:`context.Context.log`. It can be used with ``async with`` as
+    well.
 
     .. automethod:: log
     """
@@ -55,16 +122,25 @@ class SubInteraction(object):
         context: Context,
         entity: "Entity",
         delimeter: str,
-        message: Optional[str] = None,
+        message: Optional[Message] = None,
+        kind: LogKind = "log",
+        args: Tuple[Any, ...] = (),
     ):
         self.context = context
         self.entity = entity
 
-        text = delimeter
-        if message:
-            text += f" {message}"
+        text: Message = delimeter
+        if isinstance(message, str):
+            if message:
+                text = f"{delimeter} {message}"
 
-        self.subcontext = self.context.subcontext(text)
+        elif message is not None:
+            deferred = message
+            text = lambda: f"{delimeter} {render_message(deferred)}"
+
+        self.subcontext = self.context.subcontext(
+            text, *args, kind=kind, entity=entity.name
+        )
 
     def __enter__(self) -> "SubInteraction":
         self.subcontext.__enter__()
@@ -73,11 +149,18 @@ class SubInteraction(object):
     def __exit__(self, *args, **kwds) -> None:
         self.subcontext.__exit__(*args, **kwds)
 
-    def log(self, msg: str) -> None:
+    async def __aenter__(self) -> "SubInteraction":
+        return self.__enter__()
+
+    async def __aexit__(self, *args, **kwds) -> None:
+        self.__exit__(*args, **kwds)
+
+    def log(self, msg: Message, *args: Any) -> None:
         """
-        log given *msg* as a result of an interaction with an entity
+        log given *msg* as a result of an interaction with an entity; see
+        :meth:`context.Context.log` for deferring the message
         """
-        self.subcontext.log(msg)
+        self.subcontext.log(msg, *args, entity=self.entity.name)
 
 
 class Entity(object):
@@ -93,10 +176,12 @@ class Entity(object):
     .. autoattribute:: context
     .. autoattribute:: name
 
+    .. automethod:: is_quiet
     .. automethod:: interaction
     .. automethod:: request
     .. automethod:: result
     .. automethod:: sleep
+    .. automethod:: async_sleep
     """
 
     #: object representing the relevant context for this entity
@@ -105,35 +190,95 @@ class Entity(object):
     #: name of the entity
     name: str
 
+    _quiet: Optional[Tuple[Context, int, bool]] = None
+
     def __init__(self, context: Context, name: str):
         self.context = context
         self.name = name
 
-    def interaction(self) -> "Subcontext":
+    def is_quiet(self) -> bool:
         """
-        log an interaction with the entity; can be used as a context manager
-        or not
+        Return whether the context :meth:`~context.Context.is_quiet` for
+        this entity. The answer is cached until the context's
+        :attr:`~context.Context.log_generation` changes.
         """
-        return self.context.subcontext(f"{self.name}:")
+        context = self.context
+        generation = context.log_generation
+        quiet = self._quiet
+        if quiet is None or quiet[0] is not context or quiet[1] != generation:
+            quiet = self._quiet = (context, generation, context.is_quiet(self.name))
+        return quiet[2]
 
-    def request(self, msg: Optional[str] = None) -> "SubInteraction":
+    def interaction(
+        self, name: Optional[str] = None
+    ) -> Union[Subcontext, QuietSubcontext]:
+        """
+        log an interaction with the entity; can be used as a context manager,
+        including with ``async with``, or not. If timing is enabled on the
+        context, the interaction is timed under the given *name*, which
+        defaults to the class and method that started the interaction, such
+        as ``WebBrowser.get_element``. The default isn't used when it's the
+        name of the span the interaction is timed within, as it is for an
+        interaction started by a method wrapped by :func:`describe`, so that
+        the method isn't counted twice.
+        """
+        if self.is_quiet():
+            return self.context.quiet_subcontext
+
+        # The name is only used for timing, so it's not worked out otherwise.
+        context = self.context
+        if name is None and context.timing is not None:
+            name = f"{type(self).__name__}.{sys._getframe(1).f_code.co_name}"
+            if name == context.current_span_name:
+                name = None
+
+        return self.context.subcontext(
+            f"{self.name}:", kind="interaction", entity=self.name, name=name
+        )
+
+    def request(
+        self, msg: Optional[Message] = None, *args: Any
+    ) -> Union["SubInteraction", QuietSubcontext]:
         """
         log an interaction request; use as a context manager to
         return a :class:`SubInteraction` instance
         """
-        return SubInteraction(self.context, self, "<<<", message=msg)
+        if self.is_quiet():
+            return self.context.quiet_subcontext
+
+        return SubInteraction(
+            self.context, self, "<<<", message=msg, kind="request", args=args
+        )
 
-    def result(self, msg: Optional[str] = None) -> "SubInteraction":
+    def result(
+        self, msg: Optional[Message] = None, *args: Any
+    ) -> Union["SubInteraction", QuietSubcontext]:
         """
         log the result of an interaction; use as a context manager to
         return a :class:`SubInteraction` instance
         """
-        return SubInteraction(self.context, self, ">>>", message=msg)
+        if self.is_quiet():
+            return self.context.quiet_subcontext
+
+        return SubInteraction(
+            self.context, self, ">>>", message=msg, kind="result", args=args
+        )
 
     def sleep(self, sleep_time: float) -> None:
         """
-        Sleep for the given *sleep_time* amount of seconds.
+        Sleep for the given *sleep_time* amount of seconds through the
+        context's :attr:`~context.Context.scheduler`, which raises
+        :class:`scheduler.SleepCancelled` if the sleep is cancelled.
         """
         with self.interaction():
             self.request(f"sleep {sleep_time}")
-            time.sleep(sleep_time)
+            self.context.sleep(sleep_time)
+
+    async def async_sleep(self, sleep_time: float) -> None:
+        """
+        Sleep for the given *sleep_time* amount of seconds like
+        :meth:`sleep` does, but without blocking the event loop.
+        """
+        async with self.interaction():
+            self.request(f"sleep {sleep_time}")
+            await self.context.async_sleep(sleep_time)
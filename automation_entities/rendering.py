@@ -0,0 +1,340 @@
+"""
+The :mod:`automation_entities.rendering` module contains the logic for
+rendering the arguments and return values logged by
+:func:`entities.describe` within a fixed budget of characters. Rendering
+stops as soon as the budget is spent, so a large list costs no more to log
+than a short one::
+
+    >>> render(list(range(1000000)))
+    '[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26...'
+
+Built-in containers and scalars are rendered piece by piece. Any other
+value is rendered with :func:`repr` unless a cheaper renderer has been
+registered for its type with :func:`register_renderer`::
+
+    >>> register_renderer(Element, lambda element, buf: buf.write(element.name))
+
+A renderer registered for a type is used for its subclasses too. The
+built-in renderers are only used for the exact built-in types, so
+subclasses such as :class:`utils.SecretString` keep their own
+:func:`repr`.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .utils import SECRET_STRING_DISPLAY, SecretString
+
+#: function that renders the given value into the given buffer
+RenderFunction = Callable[[Any, "RenderBuffer"], None]
+
+
+class BudgetSpent(Exception):
+    """
+    raised by :meth:`RenderBuffer.write` once the budget is spent in order
+    to stop rendering
+    """
+
+
+class RenderBuffer:
+    """
+    Buffer that values are rendered into by :class:`RenderFunction`
+    functions, which call :meth:`write` with their text and :meth:`render`
+    with any values they contain.
+
+    .. autoattribute:: remaining
+
+    .. automethod:: write
+    .. automethod:: render
+    """
+
+    __slots__ = ("renderer", "parts", "remaining", "depth")
+
+    renderer: "Renderer"
+    parts: List[str]
+
+    #: number of characters that can still be written
+    remaining: int
+
+    depth: int
+
+    def __init__(self, renderer: "Renderer") -> None:
+        self.renderer = renderer
+        self.parts = []
+
+        # One more character than fits is written so that it's known
+        # whether the text has to be truncated.
+        self.remaining = renderer.max_length + 1
+        self.depth = 0
+
+    def write(self, text: str) -> None:
+        """
+        Write the given *text*, raising :class:`BudgetSpent` if the budget
+        is spent.
+        """
+        self.parts.append(text)
+        self.remaining -= len(text)
+        if self.remaining <= 0:
+            raise BudgetSpent()
+
+    def render(self, value: Any) -> None:
+        """
+        Render the given *value* nested within the value being rendered.
+        """
+        if self.depth >= self.renderer.max_depth and type(value) in CONTAINERS:
+            self.write(CONTAINERS[type(value)])
+            return
+
+        fcn = find_renderer(type(value))
+        if fcn is None:
+            self.write(repr(value))
+            return
+
+        self.depth += 1
+        try:
+            fcn(value, self)
+        finally:
+            self.depth -= 1
+
+    def getvalue(self) -> str:
+        """
+        Return the rendered text, truncated to the budget.
+        """
+        text = "".join(self.parts)
+        max_length = self.renderer.max_length
+        if len(text) > max_length:
+            text = text[: max_length - 3] + "..."
+        return text
+
+
+class Renderer:
+    """
+    Renders values in at most *max_length* characters, like :func:`repr`
+    does before its result is truncated. Containers nested deeper than
+    *max_depth* are rendered as ``[...]`` and friends, and only the first
+    *max_items* items of each container are rendered.
+
+    :param int max_length: maximum number of characters to render
+    :param int max_depth: maximum depth of containers to render
+    :param int max_items: maximum number of items to render per container
+
+    .. automethod:: render
+    .. automethod:: render_call
+    """
+
+    max_length: int
+    max_depth: int
+    max_items: int
+
+    def __init__(
+        self, max_length: int = 100, max_depth: int = 6, max_items: int = 50
+    ) -> None:
+        assert max_length > 3, "max_length must leave room for the ellipsis"
+
+        self.max_length = max_length
+        self.max_depth = max_depth
+        self.max_items = max_items
+
+    def render(self, value: Any) -> str:
+        """
+        Render the given *value*.
+        """
+        buf = RenderBuffer(self)
+        try:
+            buf.render(value)
+
+        except BudgetSpent:
+            pass
+
+        return buf.getvalue()
+
+    def render_call(self, args: Tuple[Any, ...], kwds: Dict[str, Any]) -> str:
+        """
+        Render the given arguments of a function call as they'd be written
+        in the call, without the parentheses.
+        """
+        buf = RenderBuffer(self)
+        try:
+            sep = ""
+            for a in args:
+                buf.write(sep)
+                buf.render(a)
+                sep = ", "
+
+            for k, v in kwds.items():
+                buf.write(f"{sep}{k}=")
+                buf.render(v)
+                sep = ", "
+
+        except BudgetSpent:
+            pass
+
+        return buf.getvalue()
+
+
+#: renderer used by :func:`render` and :func:`render_call`
+DEFAULT_RENDERER: Renderer = Renderer()
+
+
+def render(value: Any) -> str:
+    """
+    Render the given *value* with the :data:`DEFAULT_RENDERER`.
+    """
+    return DEFAULT_RENDERER.render(value)
+
+
+def render_call(args: Tuple[Any, ...], kwds: Dict[str, Any]) -> str:
+    """
+    Render the given arguments of a function call with the
+    :data:`DEFAULT_RENDERER`.
+    """
+    return DEFAULT_RENDERER.render_call(args, kwds)
+
+
+#: renderers registered with :func:`register_renderer`
+RENDERERS: Dict[type, RenderFunction] = {}
+
+# Renderers for the built-in types, which are only used for those exact
+# types, and the renderer found for every type seen so far.
+BUILTIN_RENDERERS: Dict[type, RenderFunction] = {}
+resolved: Dict[type, Optional[RenderFunction]] = {}
+
+
+def register_renderer(tp: type, fcn: RenderFunction) -> None:
+    """
+    Render values of the given type *tp* and its subclasses with the given
+    *fcn*, which is called with the value and the :class:`RenderBuffer` to
+    render it into.
+    """
+    RENDERERS[tp] = fcn
+    resolved.clear()
+
+
+def find_renderer(tp: type) -> Optional[RenderFunction]:
+    """
+    Return the renderer for values of the given type *tp*, or ``None`` if
+    they're rendered with :func:`repr`.
+    """
+    try:
+        return resolved[tp]
+
+    except KeyError:
+        pass
+
+    fcn = BUILTIN_RENDERERS.get(tp)
+    if fcn is None:
+        for base in tp.__mro__:
+            fcn = RENDERERS.get(base)
+            if fcn is not None:
+                break
+
+    resolved[tp] = fcn
+    return fcn
+
+
+def render_repr(value: Any, buf: RenderBuffer) -> None:
+    buf.write(repr(value))
+
+
+def render_int(value: int, buf: RenderBuffer) -> None:
+    # Huge integers are expensive to turn into decimal, and repr() refuses
+    # to go past a few thousand digits anyway.
+    bits = value.bit_length()
+    if bits > 4 * buf.renderer.max_length:
+        buf.write(f"<{bits}-bit int>")
+    else:
+        buf.write(repr(value))
+
+
+def render_str(value: str, buf: RenderBuffer) -> None:
+    # The repr of a string is never shorter than the string, so only as
+    # much of it as could be shown is rendered.
+    buf.write(repr(value[: buf.remaining]))
+
+
+def render_bytes(value: bytes, buf: RenderBuffer) -> None:
+    buf.write(repr(value[: buf.remaining]))
+
+
+def render_items(
+    items: Any, buf: RenderBuffer, start: str, end: str, single: Optional[str] = None
+) -> None:
+    buf.write(start)
+    count = 0
+    for item in items:
+        if count:
+            buf.write(", ")
+        if count == buf.renderer.max_items:
+            buf.write("...")
+            break
+        buf.render(item)
+        count += 1
+
+    buf.write(single if single is not None and count == 1 else end)
+
+
+def render_list(value: list, buf: RenderBuffer) -> None:
+    render_items(value, buf, "[", "]")
+
+
+def render_tuple(value: tuple, buf: RenderBuffer) -> None:
+    render_items(value, buf, "(", ")", single=",)")
+
+
+def render_set(value: set, buf: RenderBuffer) -> None:
+    if not value:
+        buf.write("set()")
+    else:
+        render_items(value, buf, "{", "}")
+
+
+def render_frozenset(value: frozenset, buf: RenderBuffer) -> None:
+    if not value:
+        buf.write("frozenset()")
+    else:
+        render_items(value, buf, "frozenset({", "})")
+
+
+def render_dict(value: dict, buf: RenderBuffer) -> None:
+    buf.write("{")
+    count = 0
+    for k, v in value.items():
+        if count:
+            buf.write(", ")
+        if count == buf.renderer.max_items:
+            buf.write("...")
+            break
+        buf.render(k)
+        buf.write(": ")
+        buf.render(v)
+        count += 1
+
+    buf.write("}")
+
+
+def render_secret_string(value: SecretString, buf: RenderBuffer) -> None:
+    buf.write(SECRET_STRING_DISPLAY)
+
+
+#: what containers nested too deeply are rendered as
+CONTAINERS: Dict[type, str] = {
+    list: "[...]",
+    tuple: "(...)",
+    set: "{...}",
+    frozenset: "frozenset({...})",
+    dict: "{...}",
+}
+
+BUILTIN_RENDERERS[type(None)] = render_repr
+BUILTIN_RENDERERS[bool] = render_repr
+BUILTIN_RENDERERS[float] = render_repr
+BUILTIN_RENDERERS[complex] = render_repr
+BUILTIN_RENDERERS[int] = render_int
+BUILTIN_RENDERERS[str] = render_str
+BUILTIN_RENDERERS[bytes] = render_bytes
+BUILTIN_RENDERERS[list] = render_list
+BUILTIN_RENDERERS[tuple] = render_tuple
+BUILTIN_RENDERERS[set] = render_set
+BUILTIN_RENDERERS[frozenset] = render_frozenset
+BUILTIN_RENDERERS[dict] = render_dict
+
+register_renderer(SecretString, render_secret_string)
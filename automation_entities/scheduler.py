@@ -0,0 +1,118 @@
+"""
+The :mod:`automation_entities.scheduler` module contains the logic for
+sleeping in a way that can be cancelled. Each :class:`context.Context` has
+a :class:`Scheduler` that :meth:`entities.Entity.sleep` and
+:meth:`entities.Entity.async_sleep` go through, so that every sleeping
+entity can be woken up at once on shutdown::
+
+    >>> ctx.scheduler.cancel()
+
+Blocking sleeps wait on a :class:`threading.Event`, and asynchronous sleeps
+are timers on the running event loop, so a sleeping coroutine doesn't tie
+up a thread.
+"""
+
+import asyncio
+import threading
+from typing import Set, Tuple
+
+
+class SleepCancelled(Exception):
+    pass
+
+
+class Scheduler:
+    """
+    Sleeps on behalf of the entities of a context until either the time is
+    up or :meth:`cancel` is called. Once cancelled, every sleep, including
+    those that haven't started yet, raises :class:`SleepCancelled` until
+    :meth:`reset` is called.
+
+    .. automethod:: sleep
+    .. automethod:: async_sleep
+    .. automethod:: cancel
+    .. automethod:: reset
+    .. automethod:: is_cancelled
+    """
+
+    cancelled: threading.Event
+    waiters: Set[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]]
+    lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.cancelled = threading.Event()
+        self.waiters = set()
+        self.lock = threading.Lock()
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Block the calling thread for the given number of *seconds*.
+
+        :raises SleepCancelled: if the scheduler is cancelled
+        """
+        if self.cancelled.wait(seconds):
+            raise SleepCancelled("sleep cancelled")
+
+    async def async_sleep(self, seconds: float) -> None:
+        """
+        Sleep for the given number of *seconds* without blocking the event
+        loop.
+
+        :raises SleepCancelled: if the scheduler is cancelled
+        """
+        loop = asyncio.get_running_loop()
+        waiter: "asyncio.Future[None]" = loop.create_future()
+        key = (loop, waiter)
+        with self.lock:
+            if self.cancelled.is_set():
+                raise SleepCancelled("sleep cancelled")
+            self.waiters.add(key)
+
+        handle = loop.call_later(seconds, _wake, waiter)
+        try:
+            await waiter
+
+        finally:
+            handle.cancel()
+            with self.lock:
+                self.waiters.discard(key)
+
+    def cancel(self) -> None:
+        """
+        Wake every sleeping entity with :class:`SleepCancelled`, from any
+        thread, and make any later sleeps raise it straight away.
+        """
+        with self.lock:
+            self.cancelled.set()
+            waiters = list(self.waiters)
+
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_cancel, waiter)
+
+            except RuntimeError:
+                # The loop has been closed, so nothing is waiting on it.
+                pass
+
+    def reset(self) -> None:
+        """
+        Allow entities to sleep again after :meth:`cancel`.
+        """
+        self.cancelled.clear()
+
+    def is_cancelled(self) -> bool:
+        """
+        Return whether :meth:`cancel` has been called since the scheduler
+        was created or last :meth:`reset`.
+        """
+        return self.cancelled.is_set()
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _cancel(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_exception(SleepCancelled("sleep cancelled"))
@@ -0,0 +1,981 @@
+"""
+The :mod:`automation_entities.sinks` module contains the destinations that a
+:class:`context.Context` can send its log records to. By default, a context
+prints every record to stdout as an indented line as soon as it's logged,
+but any of the sinks below can be given to the context instead::
+
+    >>> from automation_entities.context import Context
+    >>> from automation_entities.sinks import BufferedSink, FileSink
+    >>> ctx = Context(sink=BufferedSink(FileSink("routine.log")))
+"""
+
+import asyncio
+import atexit
+import collections
+import contextvars
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Literal, Optional, TextIO, Tuple, Union
+
+#: the kind of event that a :class:`LogRecord` describes
+LogKind = Literal["interaction", "request", "result", "log"]
+
+
+#: a message to log; either a string or a function returning one
+Message = Union[str, Callable[[], str]]
+
+
+def render_message(message: Message, args: Tuple[Any, ...] = ()) -> str:
+    """
+    Render the given deferred *message*. If *message* is callable, it's
+    called to get the string. If any *args* are given, the string is then
+    %-formatted with them.
+    """
+    text = message if isinstance(message, str) else message()
+    if args:
+        text = text % args
+    return text
+
+
+class LogRecord:
+    """
+    A single message logged to a :class:`context.Context` along with the
+    structure surrounding it. The message itself may be deferred as described
+    by :func:`render_message`, in which case it's only rendered the first
+    time :attr:`message` is accessed.
+
+    .. autoattribute:: depth
+    .. autoattribute:: indent
+    .. autoattribute:: timestamp
+    .. autoattribute:: kind
+    .. autoattribute:: entity
+    .. autoattribute:: worker
+    .. autoattribute:: message
+    .. autoattribute:: text
+
+    .. automethod:: render
+    .. automethod:: as_dict
+    """
+
+    __slots__ = (
+        "depth",
+        "indent",
+        "timestamp",
+        "kind",
+        "entity",
+        "worker",
+        "_message",
+        "_args",
+    )
+
+    #: the log position of the context when the message was logged
+    depth: int
+
+    #: the number of spaces to indent the message with in text form
+    indent: int
+
+    #: monotonic timestamp at which the message was logged
+    timestamp: float
+
+    #: the kind of event that the message describes
+    kind: LogKind
+
+    #: the name of the entity that logged the message, if any
+    entity: Optional[str]
+
+    #: identifier of the worker that logged the message, if tagged by a
+    #: :class:`MultiplexSink`
+    worker: Optional[str]
+
+    _message: Message
+    _args: Tuple[Any, ...]
+
+    def __init__(
+        self,
+        depth: int,
+        indent: int,
+        timestamp: float,
+        kind: LogKind,
+        message: Message,
+        entity: Optional[str] = None,
+        args: Tuple[Any, ...] = (),
+        worker: Optional[str] = None,
+    ) -> None:
+        self.depth = depth
+        self.indent = indent
+        self.timestamp = timestamp
+        self.kind = kind
+        self.entity = entity
+        self.worker = worker
+        self._message = message
+        self._args = args
+
+    @property
+    def message(self) -> str:
+        """
+        the logged message
+        """
+        message = self._message
+        if self._args or not isinstance(message, str):
+            message = self._message = render_message(message, self._args)
+            self._args = ()
+        return message
+
+    def render(self) -> "LogRecord":
+        """
+        Render the message now rather than when it's first accessed and
+        return this record. Sinks that hold on to records do this so that
+        deferred messages describe the state at the time they were logged.
+        """
+        _ = self.message
+        return self
+
+    @property
+    def text(self) -> str:
+        """
+        the familiar indented text form of this record, prefixed with the
+        :attr:`worker` in brackets if there is one
+        """
+        text = " " * self.indent + self.message
+        if self.worker is not None:
+            text = f"[{self.worker}] {text}"
+        return text
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Represent this record as a ``dict``. The ``"worker"`` key is only
+        present if the record has a :attr:`worker`.
+        """
+        ret = {
+            "depth": self.depth,
+            "timestamp": self.timestamp,
+            "kind": self.kind,
+            "entity": self.entity,
+            "message": self.message,
+        }
+        if self.worker is not None:
+            ret["worker"] = self.worker
+        return ret
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        """
+        Represent this record as a ``tuple`` of its fields.
+        """
+        return (
+            self.depth,
+            self.indent,
+            self.timestamp,
+            self.kind,
+            self.message,
+            self.entity,
+            self.worker,
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, LogRecord):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __repr__(self) -> str:
+        return "LogRecord(%s)" % ", ".join(repr(f) for f in self.as_tuple())
+
+
+class LogSink:
+    """
+    Base class for any destination of log records. Subclasses need only
+    implement :meth:`emit`, but sinks that can handle several records more
+    cheaply than one at a time should also implement :meth:`emit_records`.
+
+    .. autoattribute:: enabled
+
+    .. automethod:: emit
+    .. automethod:: emit_records
+    .. automethod:: flush
+    .. automethod:: dump
+    .. automethod:: close
+    """
+
+    #: whether the sink does anything with the records sent to it; a
+    #: :class:`context.Context` doesn't log anything at all to a sink that
+    #: doesn't
+    enabled: bool = True
+
+    def emit(self, record: LogRecord) -> None:
+        """
+        Send the given *record* to the sink.
+        """
+        raise NotImplementedError
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        """
+        Send all of the given *records* to the sink.
+        """
+        for record in records:
+            self.emit(record)
+
+    def flush(self) -> None:
+        """
+        Flush any records that the sink is holding on to.
+        """
+
+    def dump(self) -> None:
+        """
+        Write out any records that the sink is holding on to only in case of
+        failure; a :class:`context.Context` calls this whenever an exception
+        propagates through one of its subcontexts.
+        """
+
+    def close(self) -> None:
+        """
+        Flush and release any resources held by the sink.
+        """
+        self.flush()
+
+
+class NullSink(LogSink):
+    """
+    sink that discards everything sent to it
+    """
+
+    enabled = False
+
+    def emit(self, record: LogRecord) -> None:
+        pass
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        pass
+
+
+class MemorySink(LogSink):
+    """
+    sink that keeps every record sent to it in memory
+
+    .. autoattribute:: records
+    .. autoattribute:: lines
+    """
+
+    #: records sent to this sink
+    records: List[LogRecord]
+
+    def __init__(self) -> None:
+        self.records = []
+
+    def emit(self, record: LogRecord) -> None:
+        self.records.append(record.render())
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        self.records.extend(r.render() for r in records)
+
+    @property
+    def lines(self) -> List[str]:
+        """
+        text form of the records sent to this sink
+        """
+        return [r.text for r in self.records]
+
+
+class TextSink(LogSink):
+    """
+    Base class for sinks that write each record as a line of text.
+    Subclasses implement :meth:`write` and, optionally, :meth:`write_lines`
+    and may override :meth:`format` to change how records are written.
+
+    .. automethod:: format
+    .. automethod:: write
+    .. automethod:: write_lines
+    """
+
+    def format(self, record: LogRecord) -> str:
+        """
+        Format the given *record* as a line of text.
+        """
+        return record.text
+
+    def emit(self, record: LogRecord) -> None:
+        self.write(self.format(record))
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        self.write_lines([self.format(r) for r in records])
+
+    def write(self, line: str) -> None:
+        """
+        Write the given *line* to the sink.
+        """
+        raise NotImplementedError
+
+    def write_lines(self, lines: List[str]) -> None:
+        """
+        Write all of the given *lines* to the sink.
+        """
+        for line in lines:
+            self.write(line)
+
+
+class StdoutSink(TextSink):
+    """
+    sink that prints each record to stdout; this is the default sink of a
+    :class:`context.Context`
+    """
+
+    def write(self, line: str) -> None:
+        print(line)
+
+    def write_lines(self, lines: List[str]) -> None:
+        if lines:
+            print("\n".join(lines))
+
+    def flush(self) -> None:
+        sys.stdout.flush()
+
+
+class FileSink(TextSink):
+    """
+    sink that writes records to the file at the given *filepath*
+
+    :param str filepath: path of the file to write to
+    :param str mode: mode with which to open the file
+
+    .. autoattribute:: filepath
+    """
+
+    #: path of the file being written to
+    filepath: str
+
+    fobj: TextIO
+
+    def __init__(self, filepath: str, mode: str = "a") -> None:
+        self.filepath = filepath
+        self.fobj = open(filepath, mode, encoding="utf-8")
+
+    def write(self, line: str) -> None:
+        self.fobj.write(line + "\n")
+
+    def write_lines(self, lines: List[str]) -> None:
+        self.fobj.write("".join(line + "\n" for line in lines))
+
+    def flush(self) -> None:
+        if not self.fobj.closed:
+            self.fobj.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.fobj.close()
+
+
+class JSONLinesSink(FileSink):
+    """
+    sink that writes each record to the file at the given *filepath* as a
+    JSON object on its own line; see :meth:`LogRecord.as_dict` for the keys
+    """
+
+    def format(self, record: LogRecord) -> str:
+        return json.dumps(record.as_dict())
+
+
+class TeeSink(LogSink):
+    """
+    sink that sends every record to all of the given *sinks*; use this to,
+    for example, write text and JSON lines logs alongside each other
+
+    .. autoattribute:: sinks
+    """
+
+    #: sinks to send records to
+    sinks: List[LogSink]
+
+    def __init__(self, *sinks: LogSink) -> None:
+        self.sinks = list(sinks)
+
+    @property  # type: ignore[override]
+    def enabled(self) -> bool:
+        return any(sink.enabled for sink in self.sinks)
+
+    def emit(self, record: LogRecord) -> None:
+        for sink in self.sinks:
+            sink.emit(record)
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        for sink in self.sinks:
+            sink.emit_records(records)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def dump(self) -> None:
+        for sink in self.sinks:
+            sink.dump()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+class BufferedSink(LogSink):
+    """
+    Sink that batches records in memory and hands them to the wrapped *sink*
+    all at once. The batch is sent once it holds *max_records* records, at
+    most *max_delay* seconds after its first record was emitted or whenever
+    :meth:`flush` is called. A :class:`context.Context` flushes its sink
+    every time its outermost :class:`context.Subcontext` exits, and anything
+    still held when the interpreter exits is flushed then.
+
+    :param LogSink sink: sink to send batches of records to
+    :param int max_records: number of records to hold before sending them
+    :param float max_delay: number of seconds to hold records before sending
+        them
+
+    .. autoattribute:: sink
+    .. autoattribute:: max_records
+    .. autoattribute:: max_delay
+    """
+
+    #: sink to send batches of records to
+    sink: LogSink
+
+    #: number of records to hold before sending them
+    max_records: int
+
+    #: number of seconds to hold records before sending them
+    max_delay: Optional[float]
+
+    buffer: List[LogRecord]
+    last_flush: float
+    timer: Optional[threading.Timer]
+    lock: threading.RLock
+
+    def __init__(
+        self,
+        sink: LogSink,
+        max_records: int = 1000,
+        max_delay: Optional[float] = 1.0,
+    ) -> None:
+        self.sink = sink
+        self.max_records = max_records
+        self.max_delay = max_delay
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.timer = None
+        self.lock = threading.RLock()
+        atexit.register(self.flush)
+
+    @property  # type: ignore[override]
+    def enabled(self) -> bool:
+        return self.sink.enabled
+
+    def emit(self, record: LogRecord) -> None:
+        record.render()
+        with self.lock:
+            self.buffer.append(record)
+            self.check_thresholds()
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        for record in records:
+            record.render()
+        with self.lock:
+            self.buffer.extend(records)
+            self.check_thresholds()
+
+    def check_thresholds(self) -> None:
+        """
+        Flush the buffer if it's gotten too big or too old.
+        """
+        if len(self.buffer) >= self.max_records:
+            self.flush()
+
+        elif (
+            self.max_delay is not None
+            and time.monotonic() - self.last_flush >= self.max_delay
+        ):
+            self.flush()
+
+        elif self.buffer and self.timer is None and self.max_delay is not None:
+            # Nothing else may be emitted for a while, so the batch is also
+            # sent in the background once it's held for long enough.
+            self.timer = threading.Timer(self.max_delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self) -> None:
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            buffer, self.buffer = self.buffer, []
+            self.last_flush = time.monotonic()
+            if buffer:
+                self.sink.emit_records(buffer)
+            self.sink.flush()
+
+    def dump(self) -> None:
+        self.flush()
+        self.sink.dump()
+
+    def close(self) -> None:
+        atexit.unregister(self.flush)
+        self.flush()
+        self.sink.close()
+
+
+class FlightRecorderSink(LogSink):
+    """
+    Sink that keeps only the most recent records in memory and writes
+    nothing in the normal course of things. The held records are sent to the
+    wrapped *sink* only when :meth:`dump` is called, which a
+    :class:`context.Context` does whenever an exception escapes its
+    outermost subcontext or when :meth:`context.Context.dump_log` is called
+    explicitly. Exceptions that are caught within the routine, such as those
+    raised in order to retry, don't dump anything.
+
+    :param LogSink sink: sink to send records to when dumped
+    :param int max_records: number of records to hold
+    :param int max_bytes: (optional) approximate number of bytes of text to
+        hold
+
+    .. autoattribute:: sink
+    .. autoattribute:: records
+    """
+
+    #: sink to send records to when dumped
+    sink: LogSink
+
+    #: records currently held, oldest first
+    records: "collections.deque[LogRecord]"
+
+    max_bytes: Optional[int]
+    size: int
+    lock: threading.Lock
+
+    def __init__(
+        self,
+        sink: LogSink,
+        max_records: int = 1000,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.sink = sink
+        self.records = collections.deque(maxlen=max_records)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @property  # type: ignore[override]
+    def enabled(self) -> bool:
+        return self.sink.enabled
+
+    def emit(self, record: LogRecord) -> None:
+        record.render()
+        if self.max_bytes is None:
+            self.records.append(record)
+            return
+
+        with self.lock:
+            if len(self.records) == self.records.maxlen:
+                self.size -= self.record_size(self.records[0])
+            self.records.append(record)
+            self.size += self.record_size(record)
+            while self.size > self.max_bytes and len(self.records) > 1:
+                self.size -= self.record_size(self.records.popleft())
+
+    @staticmethod
+    def record_size(record: LogRecord) -> int:
+        """
+        Return the approximate size of the given *record* in text form.
+        """
+        return record.indent + len(record.message) + 1
+
+    def dump(self) -> None:
+        with self.lock:
+            records = list(self.records)
+            self.records.clear()
+            self.size = 0
+        if records:
+            self.sink.emit_records(records)
+        self.sink.flush()
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+#: policy for what a :class:`QueuedSink` does when its queue is full
+BackpressurePolicy = Literal["block", "drop-oldest", "drop-newest"]
+
+
+class QueuedSink(LogSink):
+    """
+    Sink that hands records off to a dedicated writer thread through a
+    bounded queue so that the thread doing the logging never waits on the
+    wrapped *sink*. Deferred messages are rendered before they're queued so
+    that the writer thread never calls back into an entity. What happens
+    when the queue is full is determined by *policy*:
+
+        * ``"block"``: wait for the writer thread to make room
+        * ``"drop-oldest"``: discard the oldest queued records to make room
+        * ``"drop-newest"``: discard the record being sent
+
+    Discarded sends are counted in :attr:`dropped`. Only records are ever
+    discarded; requests to flush, dump or close are always queued, waiting
+    for room if need be. :meth:`flush` only asks the writer thread to flush
+    the wrapped *sink*, and :meth:`dump` likewise asks it to dump the
+    wrapped *sink* once the records queued before it have been sent; use
+    :meth:`drain` to wait until everything queued so far has been written.
+    The queue is drained and the wrapped *sink* closed when the interpreter
+    exits if :meth:`close` hasn't been called before then.
+
+    :param LogSink sink: sink for the writer thread to send records to
+    :param int maxsize: maximum number of sends to hold in the queue
+    :param str policy: what to do when the queue is full
+
+    .. autoattribute:: sink
+    .. autoattribute:: policy
+    .. autoattribute:: dropped
+
+    .. automethod:: drain
+    """
+
+    #: sink for the writer thread to send records to
+    sink: LogSink
+
+    #: what to do when the queue is full
+    policy: BackpressurePolicy
+
+    #: number of sends that have been discarded because the queue was full
+    dropped: int
+
+    pending: "queue.Queue[Any]"
+    thread: threading.Thread
+    closed: bool
+
+    _FLUSH = object()
+    _DUMP = object()
+    _STOP = object()
+
+    def __init__(
+        self,
+        sink: LogSink,
+        maxsize: int = 10000,
+        policy: BackpressurePolicy = "block",
+    ) -> None:
+        assert policy in (
+            "block",
+            "drop-oldest",
+            "drop-newest",
+        ), f"invalid backpressure policy {policy!r}"
+
+        self.sink = sink
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self.pending = queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self.run, name="QueuedSink", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    @property  # type: ignore[override]
+    def enabled(self) -> bool:
+        return self.sink.enabled
+
+    def emit(self, record: LogRecord) -> None:
+        self.put(record.render())
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        if records:
+            self.put([r.render() for r in records])
+
+    def put(self, item: Any) -> None:
+        """
+        Put the given *item* onto the queue according to the :attr:`policy`.
+        """
+        if self.closed:
+            return
+
+        if self.policy == "block" or self.is_control(item):
+            self.pending.put(item)
+            return
+
+        while True:
+            try:
+                self.pending.put_nowait(item)
+                return
+
+            except queue.Full:
+                if self.policy == "drop-newest" or not self.discard_oldest():
+                    self.dropped += 1
+                    return
+
+    def is_control(self, item: Any) -> bool:
+        """
+        Return whether the given queued *item* is a request to flush, dump or
+        close rather than records.
+        """
+        return item is self._FLUSH or item is self._DUMP or item is self._STOP
+
+    def discard_oldest(self) -> bool:
+        """
+        Discard the oldest queued records, leaving any requests to flush,
+        dump or close in place, and return whether there's room to queue
+        something now. ``False`` is returned if the queue holds nothing but
+        such requests.
+        """
+        pending = self.pending
+        with pending.mutex:
+            if not pending.queue:
+                return True
+
+            for i, item in enumerate(pending.queue):
+                if not self.is_control(item):
+                    break
+            else:
+                return False
+
+            # This mirrors what get() and task_done() do for the item.
+            del pending.queue[i]
+            self.dropped += 1
+            pending.unfinished_tasks -= 1
+            if pending.unfinished_tasks == 0:
+                pending.all_tasks_done.notify_all()
+            pending.not_full.notify()
+            return True
+
+    def flush(self) -> None:
+        self.put(self._FLUSH)
+
+    def dump(self) -> None:
+        self.put(self._DUMP)
+
+    def drain(self) -> None:
+        """
+        Wait until the writer thread has written everything queued so far.
+        """
+        self.pending.join()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        self.closed = True
+        atexit.unregister(self.close)
+        self.pending.put(self._STOP)
+        self.thread.join()
+        self.sink.close()
+
+    def run(self) -> None:
+        """
+        Send queued records to the :attr:`sink` until :meth:`close` is
+        called.
+        """
+        while True:
+            items = [self.pending.get()]
+            while True:
+                try:
+                    items.append(self.pending.get_nowait())
+
+                except queue.Empty:
+                    break
+
+            try:
+                stop = self.send_items(items)
+
+            except Exception:
+                traceback.print_exc()
+                stop = any(i is self._STOP for i in items)
+
+            for _ in items:
+                self.pending.task_done()
+
+            if stop:
+                return
+
+    def send_items(self, items: List[Any]) -> bool:
+        """
+        Send the given queued *items* to the :attr:`sink` and return whether
+        the writer thread should stop.
+        """
+        records: List[LogRecord] = []
+        for item in items:
+            if item is self._FLUSH or item is self._STOP:
+                self.sink.emit_records(records)
+                records = []
+                self.sink.flush()
+                if item is self._STOP:
+                    return True
+
+            elif item is self._DUMP:
+                self.sink.emit_records(records)
+                records = []
+                self.sink.dump()
+
+            elif isinstance(item, list):
+                records.extend(item)
+
+            else:
+                records.append(item)
+
+        self.sink.emit_records(records)
+        return False
+
+
+def default_worker_id() -> str:
+    """
+    Identify the calling worker by its process ID, thread name and, if
+    called from within one, :mod:`asyncio` task name.
+    """
+    worker = f"{os.getpid()}/{threading.current_thread().name}"
+    try:
+        task = asyncio.current_task()
+
+    except RuntimeError:
+        task = None
+
+    if task is not None:
+        worker += f"/{task.get_name()}"
+    return worker
+
+
+class MultiplexSink(LogSink):
+    """
+    Sink for a :class:`context.Context` shared by several workers, be they
+    threads or :mod:`asyncio` tasks. Each record is tagged with the
+    :attr:`LogRecord.worker` that logged it and held until that worker's
+    outermost :class:`context.Subcontext` exits, at which point the whole
+    interaction tree is sent to the wrapped *sink* in a single
+    :meth:`LogSink.emit_records` call so that trees from different workers
+    never interleave. Records logged outside of any subcontext are held
+    until the worker logs its next top-level record. Workers started from
+    within another worker's subcontext, such as tasks gathered by an
+    interaction, never get back to the top level on their own. They inherit
+    the worker they were started by from the :mod:`contextvars` context, so
+    everything they log is held until that worker's tree is sent and then
+    sent straight after it, one worker at a time.
+
+    Workers are identified by calling *worker_id*, which defaults to
+    :func:`default_worker_id`. Processes don't share a sink, so to run
+    workers in several processes give each process its own
+    :class:`FileSink`; the process ID in each record's worker tells the
+    files apart once they're merged.
+
+    :param LogSink sink: sink to send whole interaction trees to
+    :param worker_id: (optional) function returning the calling worker's
+        identifier
+
+    .. autoattribute:: sink
+    .. autoattribute:: buffers
+    .. autoattribute:: parents
+    """
+
+    #: sink to send whole interaction trees to
+    sink: LogSink
+
+    #: records held for each worker that haven't been sent yet
+    buffers: Dict[str, List[LogRecord]]
+
+    #: worker whose tree each nested worker's records are sent after
+    parents: Dict[str, str]
+
+    children: Dict[str, List[str]]
+    root: "contextvars.ContextVar[Optional[str]]"
+    worker_id: Callable[[], str]
+    lock: threading.RLock
+
+    def __init__(
+        self,
+        sink: LogSink,
+        worker_id: Optional[Callable[[], str]] = None,
+    ) -> None:
+        self.sink = sink
+        self.worker_id = worker_id or default_worker_id
+        self.buffers = {}
+        self.parents = {}
+        self.children = {}
+        self.root = contextvars.ContextVar(f"multiplex_root_{id(self)}", default=None)
+        self.lock = threading.RLock()
+
+    @property  # type: ignore[override]
+    def enabled(self) -> bool:
+        return self.sink.enabled
+
+    def emit(self, record: LogRecord) -> None:
+        self.emit_records([record])
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        worker = self.worker_id()
+        for record in records:
+            record.worker = worker
+            record.render()
+
+        # Tasks copy the context of the worker that creates them, so this is
+        # the first worker to log in the chain of tasks that led here.
+        root = self.root.get()
+        if root is None:
+            self.root.set(worker)
+
+        with self.lock:
+            parent = self.parents.get(worker)
+            for record in records:
+                buffer = self.buffers.get(worker)
+                if (
+                    parent is None
+                    and not buffer
+                    and record.depth > 0
+                    and root is not None
+                    and root != worker
+                ):
+                    # The worker was started from within a subcontext of
+                    # another, so its records belong after that tree.
+                    parent = self.parents[worker] = root
+                    self.children.setdefault(root, []).append(worker)
+
+                # A record at the depth the held tree started at starts a
+                # new tree, so anything still held for this worker was
+                # logged outside of a subcontext.
+                elif parent is None and buffer and record.depth <= buffer[0].depth:
+                    self.send(worker)
+
+                self.buffers.setdefault(worker, []).append(record)
+
+    def send(self, worker: str) -> None:
+        """
+        Send every record held for the given *worker* to the wrapped sink,
+        followed by those held for the workers nested within it.
+        """
+        with self.lock:
+            buffer = self.buffers.pop(worker, None)
+            if buffer:
+                self.sink.emit_records(buffer)
+
+            self.parents.pop(worker, None)
+            for child in self.children.pop(worker, ()):
+                self.send(child)
+
+    def send_all(self) -> None:
+        """
+        Send the records held for every worker to the wrapped sink.
+        """
+        with self.lock:
+            for worker in list(self.buffers):
+                self.send(worker)
+
+    def flush(self) -> None:
+        with self.lock:
+            self.send(self.worker_id())
+
+            # Workers that started below the top level without a parent to
+            # be sent after never get back to the top level themselves.
+            for worker, buffer in list(self.buffers.items()):
+                if worker not in self.parents and buffer and buffer[0].depth > 0:
+                    self.send(worker)
+            self.sink.flush()
+
+    def dump(self) -> None:
+        with self.lock:
+            self.send(self.worker_id())
+            self.sink.dump()
+
+    def close(self) -> None:
+        with self.lock:
+            self.send_all()
+            self.sink.close()
@@ -0,0 +1,124 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+from typing import List
+
+from ..binary_log import (
+    MAGIC,
+    BinaryLogError,
+    BinaryLogSink,
+    TruncatedLogError,
+    format_binary_log,
+    read_binary_log,
+)
+from ..sinks import LogRecord
+
+RECORDS = [
+    LogRecord(0, 0, 1.0, "interaction", "WebBrowser https://example.com:", "B"),
+    LogRecord(1, 4, 1.25, "request", "<<< get_element //div", "B"),
+    LogRecord(1, 4, 1.5, "result", ">>>", "B"),
+    LogRecord(2, 8, 1.5, "log", "x" * 300, "B"),
+    LogRecord(0, 0, 2.0, "interaction", "WebBrowser https://example.com:", "B"),
+    LogRecord(1, 4, 2.0, "request", "<<< get_element //div", "B"),
+    LogRecord(0, 0, 3.0, "log", "no entity"),
+]
+
+
+class BinaryLogTestCase(unittest.TestCase):
+    tmpdir: tempfile.TemporaryDirectory
+    filepath: str
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmpdir.name, "routine.aelog")
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def write(self, records: List[LogRecord], **kwds) -> None:
+        sink = BinaryLogSink(self.filepath, **kwds)
+        sink.emit(records[0])
+        sink.emit_records(records[1:])
+        sink.close()
+
+    def read(self, **kwds) -> List[LogRecord]:
+        with open(self.filepath, "rb") as fobj:
+            return list(read_binary_log(fobj, **kwds))
+
+
+class TestRoundtrip(BinaryLogTestCase):
+    def test_records(self) -> None:
+        self.write(RECORDS)
+        self.assertEqual(RECORDS, self.read())
+
+    def test_format(self) -> None:
+        self.write(RECORDS)
+        with open(self.filepath, "rb") as fobj:
+            self.assertEqual([r.text for r in RECORDS], list(format_binary_log(fobj)))
+
+    def test_max_strings(self) -> None:
+        self.write(RECORDS, max_strings=1)
+        self.assertEqual(RECORDS, self.read())
+
+    def test_entities_bounded(self) -> None:
+        records = [
+            LogRecord(0, 0, 1.0, "log", "found", f"<element {i}>") for i in range(10)
+        ]
+        sink = BinaryLogSink(self.filepath, max_strings=4)
+        sink.emit_records(records)
+        sink.close()
+
+        self.assertEqual(4, len(sink.strings))
+        self.assertEqual(records, self.read())
+
+    def test_long_entity(self) -> None:
+        records = [LogRecord(0, 0, 1.0, "log", "found", "e" * 300)]
+        self.write(records)
+        self.assertEqual(records, self.read())
+
+    def test_chunks(self) -> None:
+        self.write(RECORDS)
+        for chunk_size in (1, 2, 7, 64):
+            self.assertEqual(RECORDS, self.read(chunk_size=chunk_size))
+
+    def test_threads(self) -> None:
+        sink = BinaryLogSink(self.filepath)
+
+        def write(worker: int) -> None:
+            for i in range(500):
+                sink.emit(LogRecord(0, 0, 1.0, "log", f"{worker} {i}", str(worker)))
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sink.close()
+
+        self.assertEqual(2000, len(self.read()))
+
+    def test_interns_repeats(self) -> None:
+        records = RECORDS[:2] * 100
+        self.write(records)
+        text_size = sum(len(r.text) + 1 for r in records)
+        self.assertLess(os.path.getsize(self.filepath) * 2, text_size)
+
+
+class TestRead(unittest.TestCase):
+    def test_not_binary_log(self) -> None:
+        with self.assertRaisesRegex(BinaryLogError, "not a binary log"):
+            list(read_binary_log(io.BytesIO(b"plain text")))
+
+    def test_old_version(self) -> None:
+        with self.assertRaisesRegex(BinaryLogError, "unsupported binary log version"):
+            list(read_binary_log(io.BytesIO(b"AELOG\x01")))
+
+    def test_truncated(self) -> None:
+        with self.assertRaises(TruncatedLogError):
+            list(read_binary_log(io.BytesIO(MAGIC + b"\x00\x05abc")))
+
+    def test_unknown_tag(self) -> None:
+        with self.assertRaisesRegex(BinaryLogError, "unknown tag 9"):
+            list(read_binary_log(io.BytesIO(MAGIC + b"\x09")))
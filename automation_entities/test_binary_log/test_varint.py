@@ -0,0 +1,27 @@
+import unittest
+
+from ..binary_log import BinaryLogError, decode_varint, encode_varint, unzigzag, zigzag
+
+
+class TestVarint(unittest.TestCase):
+    def test_roundtrip(self) -> None:
+        for value in (0, 1, 127, 128, 300, 2**32, 2**63):
+            buf = bytearray()
+            encode_varint(value, buf)
+            self.assertEqual((value, len(buf)), decode_varint(bytes(buf), 0))
+
+    def test_single_byte(self) -> None:
+        buf = bytearray()
+        encode_varint(127, buf)
+        self.assertEqual(b"\x7f", bytes(buf))
+
+    def test_truncated(self) -> None:
+        with self.assertRaisesRegex(BinaryLogError, "truncated varint"):
+            decode_varint(b"\x80", 0)
+
+
+class TestZigzag(unittest.TestCase):
+    def test_roundtrip(self) -> None:
+        for value in (0, 1, -1, 2, -2, 1000, -1000):
+            self.assertGreaterEqual(zigzag(value), 0)
+            self.assertEqual(value, unzigzag(zigzag(value)))
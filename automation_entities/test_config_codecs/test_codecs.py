@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+
+from .. import config_codecs
+from ..config_codecs import (
+    BinaryCodec,
+    CodecError,
+    FastJSONCodec,
+    JSONCodec,
+    get_codec,
+)
+
+DATA: dict = {
+    "none": None,
+    "bools": [True, False],
+    "ints": [0, 1, -1, 127, 128, -129, 2**70, -(2**70)],
+    "float": 1.5,
+    "str": "välue",
+    "empty": {"dict": {}, "list": []},
+    "nested": {"list": [{"key": "val"}, [1, [2, [3]]]]},
+}
+
+
+class TestJSONCodec(unittest.TestCase):
+    def test_format(self) -> None:
+        self.assertEqual(
+            b'{\n    "a": 1,\n    "b": 2\n}', JSONCodec().dumps({"b": 2, "a": 1})
+        )
+
+    def test_round_trip(self) -> None:
+        codec = JSONCodec()
+        self.assertEqual(DATA, codec.loads(codec.dumps(DATA)))
+
+
+class TestFastJSONCodec(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        codec = FastJSONCodec()
+        self.assertEqual(DATA, codec.loads(codec.dumps(DATA)))
+
+    @patch.object(config_codecs, "orjson", None)
+    def test_fallback(self) -> None:
+        codec = FastJSONCodec()
+        self.assertEqual(b'{"a":1,"b":2}', codec.dumps({"b": 2, "a": 1}))
+        self.assertEqual({"a": 1}, codec.loads(b'{"a":1}'))
+
+
+class TestBinaryCodec(unittest.TestCase):
+    codec: BinaryCodec
+
+    def setUp(self) -> None:
+        self.codec = BinaryCodec()
+
+    def test_round_trip(self) -> None:
+        self.assertEqual(DATA, self.codec.loads(self.codec.dumps(DATA)))
+
+    def test_compact(self) -> None:
+        data = {"cookies": [{"name": f"cookie{i}", "value": i} for i in range(100)]}
+        self.assertLess(len(self.codec.dumps(data)), len(FastJSONCodec().dumps(data)))
+
+    def test_deep(self) -> None:
+        data: dict = {}
+        d = data
+        for _ in range(5000):
+            d["sub"] = {}
+            d = d["sub"]
+
+        loaded = self.codec.loads(self.codec.dumps(data))
+        for _ in range(5000):
+            loaded = loaded["sub"]
+        self.assertEqual({}, loaded)
+
+    def test_unserializable(self) -> None:
+        with self.assertRaises(TypeError):
+            self.codec.dumps({"key": object()})
+
+        with self.assertRaises(TypeError):
+            self.codec.dumps({1: "val"})
+
+    def test_not_binary(self) -> None:
+        with self.assertRaisesRegex(CodecError, "not a binary config"):
+            self.codec.loads(b"{}")
+
+    def test_truncated(self) -> None:
+        encoded = self.codec.dumps(DATA)
+        for length in (len(BinaryCodec.MAGIC), len(encoded) // 2, len(encoded) - 1):
+            with self.assertRaises(ValueError):
+                self.codec.loads(encoded[:length])
+
+    def test_trailing(self) -> None:
+        with self.assertRaisesRegex(CodecError, "trailing data"):
+            self.codec.loads(self.codec.dumps({}) + b"\0")
+
+
+class TestGetCodec(unittest.TestCase):
+    def test_by_name(self) -> None:
+        self.assertIsInstance(get_codec("binary"), BinaryCodec)
+        self.assertIsInstance(get_codec("fast-json", "config.aecfg"), FastJSONCodec)
+
+    def test_instance(self) -> None:
+        codec = BinaryCodec()
+        self.assertIs(codec, get_codec(codec))
+
+    def test_by_extension(self) -> None:
+        self.assertIsInstance(get_codec(None, "config.JSON"), JSONCodec)
+        self.assertIsInstance(get_codec(None, "state.aecfg"), JSONCodec)
+        self.assertIsInstance(get_codec(None, "config"), JSONCodec)
+        self.assertIsInstance(get_codec(None), JSONCodec)
+
+    def test_unknown(self) -> None:
+        with self.assertRaisesRegex(ValueError, "unknown config codec 'yaml'"):
+            get_codec("yaml")
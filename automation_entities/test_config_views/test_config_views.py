@@ -0,0 +1,243 @@
+import dataclasses
+import gc
+import unittest
+from typing import Any, Dict, List, Literal, Optional, TypedDict
+
+from ..config_views import (
+    ConfigValidationError,
+    ConfigView,
+    bind_view,
+    schema_fields,
+    unbind_view,
+    validate_value,
+    view_class,
+)
+from ..context import Config, LayeredConfig
+
+
+@dataclasses.dataclass
+class Timeouts:
+    page: float
+    script: float = 30.0
+
+
+@dataclasses.dataclass
+class Browser:
+    name: str
+    timeouts: Timeouts
+    args: List[str] = dataclasses.field(default_factory=list)
+    mode: Literal["headless", "headed"] = "headless"
+    proxy: Optional[str] = None
+
+
+class Account(TypedDict, total=False):
+    user: str
+    retries: int
+
+
+def make_config() -> Config:
+    return Config(
+        defaults={
+            "browser": {
+                "name": "chrome",
+                "timeouts": {"page": 10},
+                "args": ["--no-sandbox"],
+            },
+            "account": {"user": "me"},
+        }
+    )
+
+
+class TestSchemaFields(unittest.TestCase):
+    def test_dataclass(self) -> None:
+        fields = schema_fields(Browser)
+
+        self.assertEqual(["name", "timeouts", "args", "mode", "proxy"], list(fields))
+        self.assertTrue(fields["name"].required)
+        self.assertFalse(fields["args"].required)
+        self.assertEqual([], fields["args"].default())
+        self.assertEqual("headless", fields["mode"].default())
+
+    def test_typed_dict(self) -> None:
+        fields = schema_fields(Account)
+
+        self.assertFalse(fields["user"].required)
+        self.assertIsNone(fields["retries"].default())
+
+    def test_not_schema(self) -> None:
+        with self.assertRaises(TypeError):
+            schema_fields(int)
+
+
+class TestValidateValue(unittest.TestCase):
+    def test_valid(self) -> None:
+        self.assertEqual(1, validate_value(1, int, "a"))
+        self.assertEqual(1.0, validate_value(1, float, "a"))
+        self.assertIsInstance(validate_value(1, float, "a"), float)
+        self.assertEqual(["a"], validate_value(["a"], List[str], "a"))
+        self.assertEqual({"b": 1}, validate_value({"b": 1}, Dict[str, int], "a"))
+        self.assertIsNone(validate_value(None, Optional[int], "a"))
+        self.assertEqual([1], validate_value([1], Any, "a"))
+
+    def test_bool_is_not_int(self) -> None:
+        with self.assertRaises(ConfigValidationError):
+            validate_value(True, int, "a")
+
+    def test_error_path(self) -> None:
+        with self.assertRaisesRegex(
+            ConfigValidationError, r"^a\.b\[0\]\[1\]: expected str"
+        ):
+            validate_value([["x", 1]], List[List[str]], "a.b")
+
+    def test_literal(self) -> None:
+        with self.assertRaisesRegex(ConfigValidationError, "expected one of"):
+            validate_value("other", Literal["headless", "headed"], "mode")
+
+
+class TestBindView(unittest.TestCase):
+    def test_reads_fields(self) -> None:
+        view = bind_view(make_config(), Browser, "browser")
+
+        self.assertEqual("chrome", view.name)
+        self.assertEqual(10.0, view.timeouts.page)
+        self.assertEqual(30.0, view.timeouts.script)
+        self.assertEqual(["--no-sandbox"], view.args)
+        self.assertEqual("headless", view.mode)
+        self.assertIsNone(view.proxy)
+
+    def test_slots(self) -> None:
+        view = bind_view(make_config(), Browser, "browser")
+
+        self.assertIsInstance(view, ConfigView)
+        self.assertIs(view_class(Browser), type(view))
+        self.assertFalse(hasattr(view, "__dict__"))
+
+    def test_read_only(self) -> None:
+        view = bind_view(make_config(), Browser, "browser")
+
+        with self.assertRaises(AttributeError):
+            view.name = "firefox"
+
+    def test_typed_dict(self) -> None:
+        view = bind_view(make_config(), Account, "account")
+
+        self.assertEqual("me", view.user)
+        self.assertIsNone(view.retries)
+
+    def test_root(self) -> None:
+        @dataclasses.dataclass
+        class Root:
+            account: Account
+
+        view = bind_view(make_config(), Root)
+        self.assertEqual("me", view.account.user)
+
+    def test_invalid(self) -> None:
+        config = make_config()
+        config["browser"]["timeouts"]["page"] = "slow"
+
+        with self.assertRaisesRegex(
+            ConfigValidationError, r"^browser\.timeouts\.page: expected float"
+        ):
+            bind_view(config, Browser, "browser")
+
+    def test_missing(self) -> None:
+        with self.assertRaisesRegex(ConfigValidationError, "^nope: missing"):
+            bind_view(make_config(), Browser, "nope")
+
+        config = make_config()
+        del config["browser"]["name"]
+        with self.assertRaisesRegex(ConfigValidationError, "^browser.name: missing"):
+            bind_view(config, Browser, "browser")
+
+
+class TestUpdates(unittest.TestCase):
+    config: Config
+    view: Any
+
+    def setUp(self) -> None:
+        self.config = make_config()
+        self.view = bind_view(self.config, Browser, "browser")
+
+    def test_set_path(self) -> None:
+        timeouts = self.view.timeouts
+        self.config.set_path("browser.timeouts.page", 5)
+
+        self.assertEqual(5.0, self.view.timeouts.page)
+        self.assertIs(timeouts, self.view.timeouts)
+
+    def test_replaces_subtree(self) -> None:
+        self.config["browser"] = {
+            "name": "firefox",
+            "timeouts": {"page": 1, "script": 2},
+        }
+
+        self.assertEqual("firefox", self.view.name)
+        self.assertEqual(2.0, self.view.timeouts.script)
+        self.assertEqual([], self.view.args)
+
+    def test_only_changed_fields(self) -> None:
+        self.config.patch({"browser": {"name": "firefox"}})
+
+        self.assertEqual("firefox", self.view.name)
+        self.assertEqual(["--no-sandbox"], self.view.args)
+
+    def test_unrelated_change(self) -> None:
+        self.config.patch({"account": {"user": 1}})
+
+        self.assertEqual("chrome", self.view.name)
+
+    def test_invalid_keeps_values(self) -> None:
+        with self.assertWarnsRegex(UserWarning, r"browser\.timeouts\.page"):
+            self.config.patch(
+                {"browser": {"name": "firefox", "timeouts": {"page": "slow"}}}
+            )
+
+        self.assertEqual("chrome", self.view.name)
+        self.assertEqual(10.0, self.view.timeouts.page)
+        self.assertEqual("slow", self.config.get_path("browser.timeouts.page"))
+
+    def test_on_error(self) -> None:
+        errors: List[ConfigValidationError] = []
+        view = bind_view(self.config, Browser, "browser", on_error=errors.append)
+        later: List[Any] = []
+        self.config.add_listener(later.append)
+
+        with self.assertWarns(UserWarning):
+            self.config.set_path("browser.timeouts.page", "oops")
+
+        self.assertEqual(1, len(errors))
+        self.assertEqual(10.0, view.timeouts.page)
+        self.assertEqual([[("browser", "timeouts", "page")]], later)
+
+    def test_mark_dirty(self) -> None:
+        self.config._data["browser"]["name"] = "firefox"
+        self.config.mark_dirty()
+
+        self.assertEqual("firefox", self.view.name)
+
+    def test_layered_override(self) -> None:
+        config = LayeredConfig(
+            defaults={"browser": {"name": "chrome", "timeouts": {"page": 10}}}
+        )
+        view = bind_view(config, Browser, "browser")
+        config.override({"browser": {"timeouts": {"page": 3}}})
+
+        self.assertEqual(3.0, view.timeouts.page)
+
+        config.clear_overrides()
+        self.assertEqual(10.0, view.timeouts.page)
+
+    def test_unbind(self) -> None:
+        unbind_view(self.view)
+        self.config.patch({"browser": {"name": "firefox"}})
+
+        self.assertEqual("chrome", self.view.name)
+        self.assertEqual([], self.config.listeners)
+
+    def test_collected(self) -> None:
+        del self.view
+        gc.collect()
+        self.config.patch({"browser": {"name": "firefox"}})
+
+        self.assertEqual([], self.config.listeners)
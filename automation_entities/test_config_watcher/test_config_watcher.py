@@ -0,0 +1,175 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from typing import List
+from unittest.mock import MagicMock
+
+from ..config_watcher import ConfigWatcher, inotify_watch
+from ..context import Config, ConfigChange
+
+
+class ConfigWatcherTestCase(unittest.TestCase):
+    tmpdir: tempfile.TemporaryDirectory
+    filepath: str
+    config: Config
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "config.json")
+        self.write_file({"timeout": 10})
+        self.config = Config()
+        self.config.set_filepath(self.filepath)
+
+    def write_file(self, data: dict) -> None:
+        # Write the file the way an editor would, replacing the original.
+        tmp_filepath = self.filepath + ".tmp"
+        with open(tmp_filepath, "w") as fobj:
+            fobj.write(json.dumps(data))
+        os.replace(tmp_filepath, self.filepath)
+
+
+class TestCheck(ConfigWatcherTestCase):
+    def test_no_filepath(self) -> None:
+        with self.assertRaisesRegex(
+            AssertionError, "config must have a filepath to watch"
+        ):
+            ConfigWatcher(Config())
+
+    def test_unchanged(self) -> None:
+        watcher = ConfigWatcher(self.config)
+        callback = MagicMock()
+        watcher.add_callback(callback)
+
+        self.assertEqual([], watcher.check())
+        callback.assert_not_called()
+
+    def test_changed(self) -> None:
+        watcher = ConfigWatcher(self.config)
+        callback = MagicMock()
+        watcher.add_callback(callback)
+        self.write_file({"timeout": 20})
+
+        changes = [ConfigChange(("timeout",), 10, 20)]
+        self.assertEqual(changes, watcher.check())
+        callback.assert_called_once_with(changes)
+        self.assertEqual(20, self.config["timeout"])
+        self.assertEqual([], watcher.check())
+
+    def test_own_persist(self) -> None:
+        watcher = ConfigWatcher(self.config)
+        callback = MagicMock()
+        watcher.add_callback(callback)
+        self.config["timeout"] = 30
+        self.config.persist()
+
+        self.assertEqual([], watcher.check())
+        callback.assert_not_called()
+
+    def test_partial_file(self) -> None:
+        watcher = ConfigWatcher(self.config)
+        with open(self.filepath, "w") as fobj:
+            fobj.write('{"timeout": ')
+
+        self.assertEqual([], watcher.check())
+        self.assertEqual(10, self.config["timeout"])
+
+        self.write_file({"timeout": 20})
+        self.assertEqual([ConfigChange(("timeout",), 10, 20)], watcher.check())
+
+    def test_reload_error(self) -> None:
+        on_error = MagicMock()
+        watcher = ConfigWatcher(self.config, on_error=on_error)
+        error = PermissionError("denied")
+        self.config.reload = MagicMock(side_effect=error)  # type: ignore
+        self.write_file({"timeout": 20})
+
+        self.assertEqual([], watcher.check())
+        on_error.assert_called_once_with(error)
+
+    def test_callback_error(self) -> None:
+        on_error = MagicMock()
+        watcher = ConfigWatcher(self.config, on_error=on_error)
+        error = RuntimeError("failed")
+        callback = MagicMock()
+        watcher.add_callback(MagicMock(side_effect=error))
+        watcher.add_callback(callback)
+        self.write_file({"timeout": 20})
+
+        changes = [ConfigChange(("timeout",), 10, 20)]
+        self.assertEqual(changes, watcher.check())
+        on_error.assert_called_once_with(error)
+        callback.assert_called_once_with(changes)
+
+    def test_warns(self) -> None:
+        watcher = ConfigWatcher(self.config)
+        watcher.add_callback(MagicMock(side_effect=RuntimeError("failed")))
+        self.write_file({"timeout": 20})
+
+        with self.assertWarnsRegex(UserWarning, "config watcher: RuntimeError"):
+            watcher.check()
+
+
+class TestThread(ConfigWatcherTestCase):
+    def watch(self, use_inotify: bool) -> None:
+        received: List[List[ConfigChange]] = []
+        changed = threading.Event()
+
+        def callback(changes: List[ConfigChange]) -> None:
+            received.append(changes)
+            changed.set()
+
+        with ConfigWatcher(
+            self.config, interval=0.05, use_inotify=use_inotify
+        ) as watcher:
+            watcher.add_callback(callback)
+            self.write_file({"timeout": 20})
+            self.assertTrue(changed.wait(5))
+
+        self.assertIsNone(watcher.thread)
+        self.assertEqual([[ConfigChange(("timeout",), 10, 20)]], received)
+        self.assertEqual(20, self.config["timeout"])
+
+    def test_polling(self) -> None:
+        self.watch(use_inotify=False)
+
+    def test_callback_error(self) -> None:
+        errors: List[Exception] = []
+        received: List[List[ConfigChange]] = []
+        changed = threading.Event()
+
+        def callback(changes: List[ConfigChange]) -> None:
+            received.append(changes)
+            changed.set()
+            if len(received) == 1:
+                raise RuntimeError("failed")
+
+        with ConfigWatcher(
+            self.config, interval=0.05, use_inotify=False, on_error=errors.append
+        ) as watcher:
+            watcher.add_callback(callback)
+            self.write_file({"timeout": 20})
+            self.assertTrue(changed.wait(5))
+            changed.clear()
+
+            self.write_file({"timeout": 30})
+            self.assertTrue(changed.wait(5))
+
+        self.assertEqual(
+            [
+                [ConfigChange(("timeout",), 10, 20)],
+                [ConfigChange(("timeout",), 20, 30)],
+            ],
+            received,
+        )
+        self.assertEqual(["failed"], [str(e) for e in errors])
+
+    def test_inotify(self) -> None:
+        fd = inotify_watch(self.tmpdir.name)
+        if fd is None:
+            self.skipTest("inotify isn't available")
+        os.close(fd)
+
+        self.watch(use_inotify=True)
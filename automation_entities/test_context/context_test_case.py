@@ -2,6 +2,7 @@ from typing import Any, Dict, Iterator, List, NamedTuple, Optional
 from unittest.mock import MagicMock, call, create_autospec
 
 from ..context import Context
+from ..sinks import render_message
 from ..test_utils import UtilsTestCase
 
 
@@ -21,6 +22,7 @@ class ContextTestCase(UtilsTestCase):
 
     def setUp(self) -> None:
         self.context = create_autospec(Context)
+        self.context.is_quiet.return_value = False
 
     def assert_subcontexts(self, shb: List[Dict]) -> None:
         """
@@ -100,41 +102,38 @@ class SubcontextComparison(NamedTuple):
         """
         Check and return if the given call *c* is a call to __enter__.
         """
-        return f"{c}" == "call().__enter__()"
+        return c[0] == "().__enter__"
 
     @staticmethod
     def is_exit_call(c: Any) -> bool:
         """
         Check and return if the given call *c* is a call to __exit__.
         """
-        return f"{c}".startswith("call().__exit__(")
+        return c[0] == "().__exit__"
 
     @staticmethod
     def is_log_call(c: Any) -> bool:
         """
         Check and return if the given call *c* is a call to log.
         """
-        repr_val = f"{c}"
-        return repr_val.startswith("call().log(") or repr_val.startswith(
-            "call().__enter__().log("
-        )
+        return c[0] in ("().log", "().__enter__().log")
 
     @staticmethod
     def is_subcontext_call(c: Any) -> bool:
         """
         Check and return if the given call *c* is a subcontext call.
         """
-        repr_val = f"{c}"
-        return repr_val.startswith("call('") or repr_val.startswith('call("')
+        return c[0] == "" and len(c.args) > 0
 
     @staticmethod
     def get_log_message(c: Any) -> str:
         """
-        Return a given call's *c* log message.
+        Return a given call's *c* log message, rendering it if it was
+        deferred.
         """
-        if len(c.args) != 1:
-            raise AssertionError(f"call {c} has more than one argument")
-        return c.args[0]
+        if len(c.args) == 0:
+            raise AssertionError(f"call {c} has no message")
+        return render_message(c.args[0], tuple(c.args[1:]))
 
     def as_dict(self) -> Dict[str, Any]:
         """
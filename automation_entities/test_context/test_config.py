@@ -1,7 +1,21 @@
+import json
+import multiprocessing
+import os
+import tempfile
 import unittest
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, patch
 
-from ..context import Config
+from ..config_codecs import BinaryCodec, FastJSONCodec
+from ..context import MISSING, Config, ConfigChange, Context, LayeredConfig
+from ..sinks import NullSink
+
+
+def set_and_persist(filepath: str, key: str) -> None:
+    config = Config()
+    config.set_filepath(filepath)
+    for i in range(5):
+        config[key] = list(range(i + 1))
+        config.persist()
 
 
 class TestInitialize(unittest.TestCase):
@@ -32,107 +46,406 @@ class TestPatch(ConfigTestCase):
         self.config.patch({"key2": "val2"})
         self.assertEqual({"key": "val", "key2": "val2"}, self.config._data)
 
+    def test_defaults_not_shared(self) -> None:
+        defaults = {"sub": {"key": "val"}}
+        config = Config(defaults=defaults)
+        config.patch({"sub": {"key": "new-val"}})
+        defaults["sub"]["other"] = "val"
+
+        self.assertEqual({"sub": {"key": "val", "other": "val"}}, defaults)
+        self.assertEqual({"sub": {"key": "new-val"}}, config._data)
+
+
+class FileConfigTestCase(ConfigTestCase):
+    tmpdir: tempfile.TemporaryDirectory
+    filepath: str
 
-class TestSetFilepath(ConfigTestCase):
-    @patch("builtins.open")
-    @patch("os.path")
-    def test_set_filepath(self, mock_path: MagicMock, mock_open: MagicMock) -> None:
-        mock_path.is_file.return_value = True
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "filepath.json")
+
+    def write_file(self, data: dict) -> None:
+        with open(self.filepath, "w") as fobj:
+            fobj.write(json.dumps(data, sort_keys=True, indent=4))
+
+    def read_file(self) -> dict:
+        with open(self.filepath) as fobj:
+            return json.load(fobj)
 
-        mock_fobj = MagicMock()
-        mock_open.return_value = mock_fobj
-        mock_fobj.__enter__.return_value = mock_fobj
-        mock_fobj.read.return_value = '{"new-key":"new-val"}'
 
-        self.config.set_filepath("config/filepath.json")
+class TestListeners(ConfigTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.listener = MagicMock()
+        self.config.add_listener(self.listener)
+
+    def test_patch(self) -> None:
+        self.config.patch({"key": "val", "sub": {"key1": "val1"}})
+        self.listener.assert_called_once_with([("sub",)])
+
+    def test_unchanged(self) -> None:
+        self.config.patch({"key": "val"})
+        self.listener.assert_not_called()
+
+    def test_setitem(self) -> None:
+        self.config["key"] = "new-val"
+        self.listener.assert_called_once_with([("key",)])
+
+    def test_mark_dirty(self) -> None:
+        self.config.mark_dirty()
+        self.listener.assert_called_once_with([()])
+
+    def test_remove(self) -> None:
+        self.config.remove_listener(self.listener)
+        self.config["key"] = "new-val"
+        self.listener.assert_not_called()
+
+
+class TestSetFilepath(FileConfigTestCase):
+    def test_set_filepath(self) -> None:
+        self.write_file({"new-key": "new-val"})
+
+        self.config.set_filepath(self.filepath)
+        self.assertEqual(self.filepath, self.config.filepath)
         self.assertEqual({"key": "val", "new-key": "new-val"}, self.config._data)
 
 
-class TestPersist(ConfigTestCase):
+class TestDirty(ConfigTestCase):
+    def test_defaults(self) -> None:
+        self.assertTrue(self.config.dirty)
+        self.assertFalse(Config().dirty)
+
+    def test_set(self) -> None:
+        self.config.dirty = False
+        self.config["new-key"] = "new-val"
+        self.assertTrue(self.config.dirty)
+
+    def test_del(self) -> None:
+        self.config.dirty = False
+        del self.config["key"]
+        self.assertTrue(self.config.dirty)
+
+    def test_patch_nested(self) -> None:
+        self.config["nested"] = {"a": 1}
+        self.config.dirty = False
+        self.config.patch({"nested": {"b": 2}})
+        self.assertTrue(self.config.dirty)
+
+    def test_patch_unchanged(self) -> None:
+        self.config["nested"] = {"a": 1}
+        self.config.dirty = False
+        self.config.patch({"key": "val", "nested": {"a": 1}})
+        self.assertFalse(self.config.dirty)
+
+
+class TestPersist(FileConfigTestCase):
     def test_no_filepath(self) -> None:
         with self.assertRaisesRegex(
             AssertionError, "filepath must be set before calling persist"
         ):
             self.config.persist()
 
-    @patch("builtins.open")
-    @patch("json.dump")
-    def test_persist(self, mock_json_dump: MagicMock, mock_open: MagicMock) -> None:
-        mock_fobj = MagicMock()
-        mock_open.return_value = mock_fobj
-        mock_fobj.__enter__.return_value = mock_fobj
+    def test_persist(self) -> None:
+        self.config.filepath = self.filepath
+        self.config.persist()
+
+        with open(self.filepath) as fobj:
+            self.assertEqual(json.dumps(self.DEFAULTS, indent=4), fobj.read())
+        self.assertFalse(self.config.dirty)
+        self.assertEqual(["filepath.json"], os.listdir(self.tmpdir.name))
+
+    @patch.object(Config, "_write")
+    def test_clean(self, mock_write: MagicMock) -> None:
+        self.config.filepath = self.filepath
+        self.config.dirty = False
+        self.config.persist()
+
+        mock_write.assert_not_called()
+        self.assertFalse(os.path.exists(self.filepath))
+
+    def test_force(self) -> None:
+        self.config.filepath = self.filepath
+        self.config.dirty = False
+        self.config.persist(force=True)
+
+        self.assertEqual(self.DEFAULTS, self.read_file())
+
+    def test_failure(self) -> None:
+        self.write_file({"old-key": "old-val"})
+        self.config.filepath = self.filepath
+        self.config["bad"] = object()
+
+        with self.assertRaises(TypeError):
+            self.config.persist()
+
+        self.assertEqual({"old-key": "old-val"}, self.read_file())
+        self.assertEqual(["filepath.json"], os.listdir(self.tmpdir.name))
+        self.assertTrue(self.config.dirty)
 
-        self.config.filepath = "config/filepath.json"
+
+class TestMergeOnWrite(FileConfigTestCase):
+    other: Config
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.config.set_filepath(self.filepath)
+        self.other = Config(defaults=self.DEFAULTS)
+        self.other.set_filepath(self.filepath)
+
+    def test_keeps_other_changes(self) -> None:
+        self.config["key1"] = "val1"
+        self.other["key2"] = "val2"
         self.config.persist()
+        self.other.persist()
 
-        mock_open.assert_called_once_with("config/filepath.json", "w")
-        mock_json_dump.assert_called_once_with(
-            self.DEFAULTS, mock_fobj, sort_keys=True, indent=4
+        self.assertEqual(
+            {"key": "val", "key1": "val1", "key2": "val2"}, self.read_file()
         )
+        self.assertEqual("val1", self.other["key1"])
+        self.assertNotIn("key2", self.config)
 
+    def test_nested(self) -> None:
+        self.config.set_path("sub.key1", "val1")
+        self.config.persist()
+        self.other.set_path("sub.key2", "val2")
+        self.other.persist()
 
-class TestLoad(ConfigTestCase):
+        self.assertEqual({"key1": "val1", "key2": "val2"}, self.read_file()["sub"])
+
+    def test_delete(self) -> None:
+        self.other["key2"] = "val2"
+        self.other.persist()
+        del self.config["key"]
+        self.config.persist()
+
+        self.assertEqual({"key2": "val2"}, self.read_file())
+        self.assertEqual({"key2": "val2"}, self.config._data)
+
+    def test_same_key(self) -> None:
+        self.config["key"] = "val1"
+        self.other["key"] = "val2"
+        self.config.persist()
+        self.other.persist()
+
+        self.assertEqual("val2", self.read_file()["key"])
+
+    def test_processes(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=set_and_persist, args=(self.filepath, f"key{i}"))
+            for i in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(0, process.exitcode)
+
+        data = self.read_file()
+        for i in range(4):
+            self.assertEqual(list(range(5)), data[f"key{i}"])
+
+
+class TestCodec(FileConfigTestCase):
+    def test_binary(self) -> None:
+        filepath = os.path.join(self.tmpdir.name, "state.aecfg")
+        self.config.set_filepath(filepath, codec="binary")
+        self.config["cookies"] = [{"name": "session", "value": "abc"}]
+        self.config.persist()
+
+        with open(filepath, "rb") as fobj:
+            self.assertTrue(fobj.read().startswith(BinaryCodec.MAGIC))
+
+        config = Config()
+        config.set_filepath(filepath, codec="binary")
+        self.assertEqual(self.config._data, config._data)
+
+    def test_by_name(self) -> None:
+        self.config.set_filepath(self.filepath, codec="fast-json")
+        self.assertIsInstance(self.config.get_codec(), FastJSONCodec)
+        self.assertEqual(self.DEFAULTS, self.read_file())
+
+    def test_context(self) -> None:
+        context = Context(sink=NullSink())
+        context.set_config_file(self.filepath, codec="binary")
+        self.assertIsInstance(context.config.get_codec(), BinaryCodec)
+
+
+class TestLoad(FileConfigTestCase):
     def test_no_filepath(self) -> None:
         with self.assertRaisesRegex(
             AssertionError, "filepath must be set before calling load"
         ):
             self.config.load()
 
-    @patch("builtins.open")
-    @patch("os.path")
-    @patch("json.dump")
-    def test_no_file(
-        self, mock_json_dump: MagicMock, mock_path: MagicMock, mock_open: MagicMock
-    ) -> None:
-        mock_path.isfile.return_value = False
+    def test_no_file(self) -> None:
+        self.config.filepath = self.filepath
+        self.config.load()
+
+        self.assertEqual(self.DEFAULTS, self.read_file())
+        self.assertFalse(self.config.dirty)
 
-        mock_fobj = MagicMock()
-        mock_open.return_value = mock_fobj
-        mock_fobj.__enter__.return_value = mock_fobj
+    def test_file_exists(self) -> None:
+        self.write_file({"new-key": "new-val"})
 
-        self.config.filepath = "config/filepath.json"
+        self.config.filepath = self.filepath
         self.config.load()
 
-        mock_open.assert_called_once_with("config/filepath.json", "w")
-        mock_json_dump.assert_called_once_with(
-            self.DEFAULTS, mock_fobj, sort_keys=True, indent=4
+        self.assertEqual(
+            dict(self.DEFAULTS, **{"new-key": "new-val"}), self.read_file()
         )
+        self.assertFalse(self.config.dirty)
 
-    @patch("builtins.open")
-    @patch("os.path")
-    @patch("json.dump")
-    @patch("json.load")
-    def test_file_exists(
-        self,
-        mock_json_load: MagicMock,
-        mock_json_dump: MagicMock,
-        mock_path: MagicMock,
-        mock_open: MagicMock,
-    ) -> None:
-        mock_path.isfile.return_value = True
-
-        mock_fobj = MagicMock()
-        mock_open.return_value = mock_fobj
-        mock_fobj.__enter__.return_value = mock_fobj
-
-        mock_json_load.return_value = {"new-key": "new-val"}
-
-        self.config.filepath = "config/filepath.json"
+    @patch.object(Config, "_write")
+    def test_file_unchanged(self, mock_write: MagicMock) -> None:
+        self.write_file({"key": "val", "new-key": "new-val"})
+
+        self.config.filepath = self.filepath
         self.config.load()
 
-        mock_open.assert_any_call("config/filepath.json")
-        mock_open.assert_any_call("config/filepath.json", "w")
-        mock_json_dump.assert_called_once_with(
-            dict(
-                self.DEFAULTS,
-                **{
-                    "new-key": "new-val",
-                }
-            ),
-            mock_fobj,
-            sort_keys=True,
-            indent=4,
+        mock_write.assert_not_called()
+        self.assertFalse(self.config.dirty)
+        self.assertEqual({"key": "val", "new-key": "new-val"}, self.config._data)
+
+
+class TestReload(FileConfigTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.write_file({"key": "file-val", "sub": {"key1": "val1", "key2": "val2"}})
+        self.config.set_filepath(self.filepath)
+
+    def test_no_filepath(self) -> None:
+        with self.assertRaisesRegex(
+            AssertionError, "filepath must be set before calling reload"
+        ):
+            Config().reload()
+
+    def test_unchanged(self) -> None:
+        self.assertEqual([], self.config.reload())
+
+    def test_changes(self) -> None:
+        self.write_file({"key": "file-val", "sub": {"key1": "new-val1"}, "new": 1})
+
+        changes = self.config.reload()
+        self.assertCountEqual(
+            [
+                ConfigChange(("sub", "key1"), "val1", "new-val1"),
+                ConfigChange(("sub", "key2"), "val2", MISSING),
+                ConfigChange(("new",), MISSING, 1),
+            ],
+            changes,
+        )
+        self.assertEqual(
+            {"key": "file-val", "sub": {"key1": "new-val1"}, "new": 1},
+            self.config._data,
         )
+        self.assertFalse(self.config.dirty)
+
+    def test_keeps_local_changes(self) -> None:
+        self.config["local"] = "val"
+        self.config.set_path("sub.key2", "local-val2")
+        self.write_file({"key": "new-val", "sub": {"key1": "val1", "key2": "val2"}})
+
+        self.config.reload()
+        self.assertEqual(
+            {
+                "key": "new-val",
+                "local": "val",
+                "sub": {"key1": "val1", "key2": "local-val2"},
+            },
+            self.config._data,
+        )
+        self.assertTrue(self.config.dirty)
+
+    def test_after_persist(self) -> None:
+        self.config["local"] = "val"
+        self.config.persist()
+        self.assertEqual([], self.config.reload())
+
+    def test_updates_index(self) -> None:
+        self.assertEqual("val1", self.config.get_path("sub.key1"))
+        self.write_file({"key": "file-val", "sub": "val"})
+
+        self.config.reload()
+        self.assertEqual("val", self.config.get_path("sub"))
+        self.assertIsNone(self.config.get_path("sub.key1", None))
+
+    def test_layered(self) -> None:
+        config = LayeredConfig(defaults={"key": "default", "other": "default"})
+        config.set_filepath(self.filepath)
+        self.assertEqual("file-val", config["key"])
+        self.write_file({"other": "file-val"})
+
+        config.reload()
+        self.assertEqual("default", config["key"])
+        self.assertEqual("file-val", config["other"])
+
+
+class TestAutoPersist(FileConfigTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.config.set_filepath(self.filepath)
+
+    def tearDown(self) -> None:
+        self.config.flush()
+
+    def test_disabled(self) -> None:
+        self.config["new-key"] = "new-val"
+        self.config.flush()
+
+        self.assertIsNone(self.config.timer)
+        self.assertEqual(self.DEFAULTS, self.read_file())
+
+    @patch("threading.Timer")
+    def test_coalesces(self, mock_timer: MagicMock) -> None:
+        self.config.enable_auto_persist(delay=0.5)
+        self.config["key1"] = "val1"
+        self.config["key2"] = "val2"
+
+        mock_timer.assert_called_once_with(0.5, self.config.flush)
+        mock_timer.return_value.start.assert_called_once_with()
+        self.assertEqual(self.DEFAULTS, self.read_file())
+
+    @patch("threading.Timer")
+    def test_flush(self, mock_timer: MagicMock) -> None:
+        self.config.enable_auto_persist()
+        self.config["key1"] = "val1"
+        self.config.flush()
+
+        mock_timer.return_value.cancel.assert_called_once_with()
+        self.assertIsNone(self.config.timer)
+        self.assertFalse(self.config.dirty)
+        self.assertEqual(dict(self.DEFAULTS, key1="val1"), self.read_file())
+
+    def test_timer(self) -> None:
+        self.config.enable_auto_persist(delay=0.01)
+        self.config["key1"] = "val1"
+        timer = self.config.timer
+        assert timer is not None
+        timer.join()
+
+        self.assertFalse(self.config.dirty)
+        self.assertEqual(dict(self.DEFAULTS, key1="val1"), self.read_file())
+
+    @patch("threading.Timer")
+    def test_context_manager(self, mock_timer: MagicMock) -> None:
+        self.config.enable_auto_persist()
+        with self.config as config:
+            config["key1"] = "val1"
+
+        self.assertEqual(dict(self.DEFAULTS, key1="val1"), self.read_file())
+
+    @patch("threading.Timer")
+    def test_context_flush(self, mock_timer: MagicMock) -> None:
+        context = Context(sink=NullSink())
+        context.config = self.config
+        self.config.enable_auto_persist()
+        with context.subcontext("outer"):
+            self.config["key1"] = "val1"
+
+        self.assertEqual(dict(self.DEFAULTS, key1="val1"), self.read_file())
 
 
 class TestMutableMapping(ConfigTestCase):
@@ -0,0 +1,113 @@
+import copy
+import unittest
+
+from ..context import Config, LayeredConfig
+
+
+class ConfigPathTestCase(unittest.TestCase):
+    DEFAULTS: dict = {
+        "browsers": {"chrome": {"timeouts": {"page": 30, "script": 10}}},
+        "key": "val",
+    }
+    config: Config
+
+    def setUp(self) -> None:
+        self.config = Config(defaults=copy.deepcopy(self.DEFAULTS))
+
+
+class TestGetPath(ConfigPathTestCase):
+    def test_nested(self) -> None:
+        self.assertEqual(30, self.config.get_path("browsers.chrome.timeouts.page"))
+        self.assertEqual(
+            {"page": 30, "script": 10}, self.config.get_path("browsers.chrome.timeouts")
+        )
+        self.assertEqual("val", self.config.get_path("key"))
+
+    def test_missing(self) -> None:
+        with self.assertRaises(KeyError):
+            self.config.get_path("browsers.firefox")
+
+        self.assertIsNone(self.config.get_path("browsers.firefox", None))
+        self.assertEqual(5, self.config.get_path("key.sub", 5))
+
+    def test_unindexable_keys(self) -> None:
+        self.config["dotted.key"] = {"sub": "val"}
+        self.config[1] = "val"
+        self.assertIsNone(self.config.get_path("dotted.key", None))
+        self.assertIsNone(self.config.get_path("dotted.key.sub", None))
+        self.assertIsNone(self.config.get_path("1", None))
+
+
+class TestIndexMaintained(ConfigPathTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.config.get_path("key")
+        assert self.config._index is not None
+
+    def test_set(self) -> None:
+        self.config["browsers"] = {"firefox": {"headless": True}}
+        self.assertIsNotNone(self.config._index)
+        self.assertTrue(self.config.get_path("browsers.firefox.headless"))
+        self.assertIsNone(self.config.get_path("browsers.chrome", None))
+        self.assertIsNone(self.config.get_path("browsers.chrome.timeouts.page", None))
+
+    def test_del(self) -> None:
+        del self.config["browsers"]
+        self.assertIsNone(self.config.get_path("browsers", None))
+        self.assertIsNone(self.config.get_path("browsers.chrome.timeouts", None))
+        self.assertEqual("val", self.config.get_path("key"))
+
+    def test_patch(self) -> None:
+        self.config.patch(
+            {"browsers": {"chrome": {"timeouts": {"page": 60}, "headless": True}}}
+        )
+        self.assertIsNotNone(self.config._index)
+        self.assertEqual(60, self.config.get_path("browsers.chrome.timeouts.page"))
+        self.assertEqual(10, self.config.get_path("browsers.chrome.timeouts.script"))
+        self.assertTrue(self.config.get_path("browsers.chrome.headless"))
+
+    def test_patch_replaces_subtree(self) -> None:
+        self.config.patch({"browsers": {"chrome": "disabled"}})
+        self.assertEqual("disabled", self.config.get_path("browsers.chrome"))
+        self.assertIsNone(self.config.get_path("browsers.chrome.timeouts", None))
+
+    def test_mark_dirty(self) -> None:
+        self.config["browsers"]["chrome"]["timeouts"]["page"] = 45
+        self.config.mark_dirty()
+        self.assertIsNone(self.config._index)
+        self.assertEqual(45, self.config.get_path("browsers.chrome.timeouts.page"))
+
+    def test_matches_traversal(self) -> None:
+        self.config.patch({"browsers": {"chrome": {"timeouts": {"implicit": 1}}}})
+        self.config["other"] = {"a": {"b": 2}}
+        del self.config["key"]
+
+        index = self.config._index
+        self.config.mark_dirty()
+        self.assertEqual(index, self.config._build_index())
+
+
+class TestSetPath(ConfigPathTestCase):
+    def test_existing(self) -> None:
+        self.config.set_path("browsers.chrome.timeouts.page", 45)
+        self.assertEqual(45, self.config["browsers"]["chrome"]["timeouts"]["page"])
+        self.assertEqual(10, self.config["browsers"]["chrome"]["timeouts"]["script"])
+
+    def test_new(self) -> None:
+        self.config.set_path("browsers.firefox.headless", True)
+        self.assertEqual({"headless": True}, self.config["browsers"]["firefox"])
+        self.assertTrue(self.config.get_path("browsers.firefox.headless"))
+        self.assertTrue(self.config.dirty)
+
+
+class TestLayeredConfigPath(unittest.TestCase):
+    def test_layers(self) -> None:
+        config = LayeredConfig(defaults=copy.deepcopy(ConfigPathTestCase.DEFAULTS))
+        self.assertEqual(30, config.get_path("browsers.chrome.timeouts.page"))
+
+        config.set_path("browsers.chrome.timeouts.page", 45)
+        self.assertEqual(45, config.get_path("browsers.chrome.timeouts.page"))
+        self.assertEqual(10, config.get_path("browsers.chrome.timeouts.script"))
+
+        config.override({"key": "override"})
+        self.assertEqual("override", config.get_path("key"))
@@ -0,0 +1,143 @@
+import threading
+import unittest
+
+from ..context import Config, FrozenMap, LayeredConfig, freeze, thaw
+
+
+class TestFreeze(unittest.TestCase):
+    def test_nested(self) -> None:
+        frozen = freeze({"a": {"b": [1, {"c": 2}]}})
+
+        self.assertIsInstance(frozen, FrozenMap)
+        self.assertIsInstance(frozen["a"], FrozenMap)
+        self.assertEqual((1, FrozenMap({"c": 2})), frozen["a"]["b"])
+
+    def test_scalar(self) -> None:
+        self.assertEqual(1, freeze(1))
+
+    def test_shares_frozen(self) -> None:
+        inner = freeze({"b": 1})
+        self.assertIs(inner, freeze({"a": inner})["a"])
+
+    def test_thaw(self) -> None:
+        data = {"a": {"b": [1, {"c": [2]}]}, "d": "e"}
+        thawed = thaw(freeze(data))
+
+        self.assertEqual(data, thawed)
+        self.assertIsInstance(thawed["a"]["b"], list)
+        self.assertIsInstance(thawed["a"]["b"][1], dict)
+
+    def test_deep(self) -> None:
+        data: dict = {}
+        node = data
+        for _ in range(5000):
+            node["k"] = {}
+            node = node["k"]
+
+        node = thaw(freeze(data))
+        depth = 0
+        while node:
+            node = node["k"]
+            depth += 1
+        self.assertEqual(5000, depth)
+
+
+class TestFrozenMap(unittest.TestCase):
+    def test_immutable(self) -> None:
+        frozen = FrozenMap({"a": 1})
+
+        with self.assertRaises(TypeError):
+            frozen["a"] = 2  # type: ignore
+        with self.assertRaises(AttributeError):
+            frozen.update({"a": 2})  # type: ignore
+
+    def test_equality(self) -> None:
+        self.assertEqual(FrozenMap({"a": [1]}), {"a": (1,)})
+        self.assertEqual(FrozenMap({"a": 1}), FrozenMap({"a": 1}))
+        self.assertEqual(hash(FrozenMap({"a": 1})), hash(FrozenMap({"a": 1})))
+
+
+class TestSnapshot(unittest.TestCase):
+    config: Config
+
+    def setUp(self) -> None:
+        self.config = Config(
+            defaults={"a": {"b": 1, "c": [1, 2]}, "d": {"e": {"f": 1}}}
+        )
+
+    def test_snapshot(self) -> None:
+        snapshot = self.config.snapshot()
+
+        self.assertEqual(self.config._data, thaw(snapshot))
+        self.assertIsInstance(snapshot["a"], FrozenMap)
+
+    def test_cached(self) -> None:
+        self.assertIs(self.config.snapshot(), self.config.snapshot())
+
+    def test_unaffected_by_changes(self) -> None:
+        snapshot = self.config.snapshot()
+        self.config.set_path("a.b", 2)
+        self.config["g"] = 3
+        del self.config["d"]
+
+        self.assertEqual(1, snapshot["a"]["b"])
+        self.assertNotIn("g", snapshot)
+        self.assertIn("d", snapshot)
+
+        new = self.config.snapshot()
+        self.assertEqual(2, new["a"]["b"])
+        self.assertEqual(3, new["g"])
+        self.assertNotIn("d", new)
+
+    def test_structural_sharing(self) -> None:
+        old = self.config.snapshot()
+        self.config.set_path("a.b", 2)
+        new = self.config.snapshot()
+
+        self.assertIsNot(old, new)
+        self.assertIsNot(old["a"], new["a"])
+        self.assertIs(old["a"]["c"], new["a"]["c"])
+        self.assertIs(old["d"], new["d"])
+
+    def test_mark_dirty(self) -> None:
+        self.config.snapshot()
+        self.config._data["d"]["e"]["f"] = 2
+        self.config.mark_dirty()
+
+        self.assertEqual(2, self.config.snapshot()["d"]["e"]["f"])
+
+    def test_layered(self) -> None:
+        config = LayeredConfig(defaults={"a": {"b": 1}, "c": {"d": 1}})
+        old = config.snapshot()
+        config.override({"a": {"b": 2}})
+        new = config.snapshot()
+
+        self.assertEqual(1, old["a"]["b"])
+        self.assertEqual(2, new["a"]["b"])
+
+        config.patch({"c": {"d": 2}})
+        self.assertEqual(2, config.snapshot()["c"]["d"])
+        self.assertEqual(2, config.snapshot()["a"]["b"])
+
+    def test_concurrent_readers(self) -> None:
+        self.config.patch({"counter": {"a": 0, "b": 0}})
+        stop = threading.Event()
+        torn = []
+
+        def read() -> None:
+            while not stop.is_set():
+                counter = self.config.snapshot()["counter"]
+                if counter["a"] != counter["b"]:
+                    torn.append(counter)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(1, 500):
+            self.config.patch({"counter": {"a": i, "b": i}})
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+        self.assertEqual([], torn)
+        self.assertEqual(499, self.config.snapshot()["counter"]["b"])
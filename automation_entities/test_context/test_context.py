@@ -1,7 +1,10 @@
+import asyncio
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
-from ..context import Context
+from ..context import Context, Verbosity
+from ..sinks import LogRecord, MemorySink
 
 
 class InitializeTest(unittest.TestCase):
@@ -37,6 +40,128 @@ class LogTest(ContextTestCase):
         mock_print.assert_called_with("    log message")
 
 
+class SinkTest(ContextTestCase):
+    def test_log_to_sink(self) -> None:
+        sink = MemorySink()
+        context = Context(sink=sink)
+        context.log("log message")
+        with context.subcontext("sub context"):
+            context.log("subcontext message")
+
+        self.assertEqual(
+            ["log message", "sub context", "    subcontext message"], sink.lines
+        )
+
+    @patch("time.monotonic")
+    def test_log_record(self, mock_monotonic: MagicMock) -> None:
+        mock_monotonic.return_value = 12.5
+        sink = MemorySink()
+        context = Context(sink=sink)
+        context.log_position = 2
+        context.log("log message", kind="request", entity="MyEntity")
+
+        self.assertEqual(
+            [
+                LogRecord(
+                    depth=2,
+                    indent=8,
+                    timestamp=12.5,
+                    kind="request",
+                    message="log message",
+                    entity="MyEntity",
+                )
+            ],
+            sink.records,
+        )
+
+    def test_set_sink(self) -> None:
+        old_sink = MagicMock()
+        new_sink = MemorySink()
+        context = Context(sink=old_sink)
+        context.set_sink(new_sink)
+
+        old_sink.flush.assert_called_once_with()
+        self.assertEqual(new_sink, context.sink)
+
+    def test_flush_outermost(self) -> None:
+        sink = MagicMock()
+        context = Context(sink=sink)
+        with context.subcontext("outer"):
+            with context.subcontext("inner"):
+                pass
+            sink.flush.assert_not_called()
+
+        sink.flush.assert_called_once_with()
+
+
+class VerbosityTest(ContextTestCase):
+    def test_default(self) -> None:
+        self.assertEqual(Verbosity.DETAIL, self.context.verbosity)
+        self.assertTrue(self.context.is_enabled("log"))
+
+    def test_levels(self) -> None:
+        self.context.set_verbosity(Verbosity.REQUEST)
+        self.assertTrue(self.context.is_enabled("interaction"))
+        self.assertTrue(self.context.is_enabled("request"))
+        self.assertFalse(self.context.is_enabled("result"))
+        self.assertFalse(self.context.is_enabled("log"))
+
+    def test_silent(self) -> None:
+        context = Context(verbosity=Verbosity.SILENT)
+        self.assertFalse(context.is_enabled("interaction"))
+
+    def test_entity(self) -> None:
+        self.context.set_verbosity(Verbosity.INTERACTION, entity="WebBrowser *")
+        self.assertTrue(self.context.is_enabled("log", "RestEntity"))
+        self.assertTrue(self.context.is_enabled("interaction", "WebBrowser a"))
+        self.assertFalse(self.context.is_enabled("request", "WebBrowser a"))
+
+    def test_last_entity_pattern_wins(self) -> None:
+        self.context.set_verbosity(Verbosity.INTERACTION, entity="Web*")
+        self.context.set_verbosity(Verbosity.RESULT, entity="WebBrowser *")
+        self.assertTrue(self.context.is_enabled("result", "WebBrowser a"))
+        self.assertFalse(self.context.is_enabled("result", "WebClient"))
+
+        self.context.set_verbosity(Verbosity.INTERACTION, entity="Web*")
+        self.assertFalse(self.context.is_enabled("result", "WebBrowser a"))
+
+    def test_filters_records(self) -> None:
+        sink = MemorySink()
+        fcn = MagicMock()
+        context = Context(sink=sink, verbosity=Verbosity.RESULT)
+        context.log("interaction", kind="interaction")
+        context.log(fcn)
+        with context.subcontext("filtered"):
+            context.log("result", kind="result")
+
+        self.assertEqual(["interaction", "    result"], sink.lines)
+        fcn.assert_not_called()
+
+    def test_assign(self) -> None:
+        sink = MemorySink()
+        context = Context(sink=sink)
+        context.log("logged")
+        context.verbosity = Verbosity.SILENT
+        context.log("filtered")
+
+        self.assertEqual(Verbosity.SILENT, context.verbosity)
+        self.assertEqual(["logged"], sink.lines)
+
+    def test_assign_entity_verbosity(self) -> None:
+        self.assertTrue(self.context.is_enabled("log", "WebBrowser a"))
+        self.context.entity_verbosity = {"WebBrowser *": Verbosity.INTERACTION}
+        self.assertFalse(self.context.is_enabled("log", "WebBrowser a"))
+
+        with self.assertRaises(TypeError):
+            self.context.entity_verbosity["Web*"] = Verbosity.DETAIL  # type: ignore
+
+    def test_cache_size(self) -> None:
+        self.context.ENABLED_CACHE_SIZE = 2
+        for i in range(3):
+            self.context.is_enabled("log", f"Entity {i}")
+        self.assertEqual(1, len(self.context._enabled))
+
+
 class SubcontextTest(ContextTestCase):
     @patch("builtins.print")
     def test_subcontext(self, mock_print: MagicMock) -> None:
@@ -46,6 +171,64 @@ class SubcontextTest(ContextTestCase):
         self.assertEqual(self.context, cmp_subcontext.context)
 
 
+class ConcurrencyTest(ContextTestCase):
+    def test_threads(self) -> None:
+        sink = MemorySink()
+        context = Context(sink=sink)
+        barrier = threading.Barrier(2)
+
+        def worker(name: str) -> None:
+            with context.subcontext(f"{name} outer"):
+                barrier.wait()
+                with context.subcontext(f"{name} inner"):
+                    barrier.wait()
+                    context.log(f"{name} message")
+                barrier.wait()
+
+        with context.subcontext("main"):
+            threads = [threading.Thread(target=worker, args=(name,)) for name in "ab"]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(1, context.log_position)
+
+        self.assertEqual(0, context.log_position)
+        for name in "ab":
+            self.assertIn(f"{name} outer", sink.lines)
+            self.assertIn(f"    {name} inner", sink.lines)
+            self.assertIn(f"        {name} message", sink.lines)
+
+    def test_tasks(self) -> None:
+        sink = MemorySink()
+        context = Context(sink=sink)
+
+        async def worker(name: str) -> None:
+            with context.subcontext(f"{name} outer"):
+                await asyncio.sleep(0)
+                with context.subcontext(f"{name} inner"):
+                    await asyncio.sleep(0)
+                    context.log(f"{name} message")
+
+        async def main() -> None:
+            with context.subcontext("main"):
+                await asyncio.gather(worker("a"), worker("b"))
+                self.assertEqual(1, context.log_position)
+
+        asyncio.run(main())
+        self.assertEqual(0, context.log_position)
+        for name in "ab":
+            self.assertIn(f"    {name} outer", sink.lines)
+            self.assertIn(f"        {name} inner", sink.lines)
+            self.assertIn(f"            {name} message", sink.lines)
+
+    def test_separate_contexts(self) -> None:
+        other = Context()
+        self.context.log_position = 3
+        self.assertEqual(0, other.log_position)
+
+
 class SetConfigFileTest(ContextTestCase):
     @patch("builtins.open")
     @patch("os.path")
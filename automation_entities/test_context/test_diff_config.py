@@ -0,0 +1,29 @@
+import unittest
+
+from ..context import MISSING, ConfigChange, diff_config
+
+
+class TestDiffConfig(unittest.TestCase):
+    def test_same(self) -> None:
+        self.assertEqual(
+            [], diff_config({"sub": {"key": "val"}}, {"sub": {"key": "val"}})
+        )
+
+    def test_changes(self) -> None:
+        old = {"same": 1, "changed": 1, "removed": 1, "sub": {"key": "val"}}
+        new = {"same": 1, "changed": 2, "added": 1, "sub": {"key": "new-val"}}
+        self.assertCountEqual(
+            [
+                ConfigChange(("changed",), 1, 2),
+                ConfigChange(("added",), MISSING, 1),
+                ConfigChange(("removed",), 1, MISSING),
+                ConfigChange(("sub", "key"), "val", "new-val"),
+            ],
+            diff_config(old, new),
+        )
+
+    def test_dict_replaced(self) -> None:
+        self.assertEqual(
+            [ConfigChange(("sub",), {"key": "val"}, "val")],
+            diff_config({"sub": {"key": "val"}}, {"sub": "val"}),
+        )
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import unittest
+
+from ..context import Context, LayeredConfig
+
+
+class LayeredConfigTestCase(unittest.TestCase):
+    DEFAULTS: dict = {"key": "val", "sub": {"key1": "val1", "key2": "val2"}}
+    config: LayeredConfig
+
+    def setUp(self) -> None:
+        self.config = LayeredConfig(defaults=self.DEFAULTS)
+
+
+class TestInitialize(LayeredConfigTestCase):
+    def test_defaults_shared(self) -> None:
+        self.assertEqual({}, self.config._data)
+        self.assertIs(self.DEFAULTS, self.config.merged)
+        self.assertFalse(self.config.dirty)
+
+    def test_context(self) -> None:
+        context = Context(config_defaults=self.DEFAULTS, config_class=LayeredConfig)
+        self.assertIsInstance(context.config, LayeredConfig)
+        self.assertEqual("val", context.config["key"])
+
+
+class TestLayers(LayeredConfigTestCase):
+    def test_set(self) -> None:
+        self.config["key"] = "new-val"
+        self.assertEqual("new-val", self.config["key"])
+        self.assertEqual({"key": "new-val"}, self.config._data)
+        self.assertEqual("val", self.DEFAULTS["key"])
+        self.assertTrue(self.config.dirty)
+
+    def test_patch(self) -> None:
+        self.config.patch({"sub": {"key2": "new-val2"}})
+        self.assertEqual({"key1": "val1", "key2": "new-val2"}, self.config["sub"])
+        self.assertEqual({"sub": {"key2": "new-val2"}}, self.config._data)
+
+    def test_del(self) -> None:
+        self.config["key"] = "new-val"
+        del self.config["key"]
+        self.assertEqual("val", self.config["key"])
+
+        with self.assertRaises(KeyError):
+            del self.config["key"]
+
+    def test_override(self) -> None:
+        self.config.override({"sub": {"key1": "override"}})
+        self.config["sub"] = {"key1": "file"}
+        self.assertEqual({"key1": "override", "key2": "val2"}, self.config["sub"])
+        self.assertFalse("override" in json.dumps(self.config._data))
+
+        self.config.clear_overrides()
+        self.assertEqual({"key1": "file", "key2": "val2"}, self.config["sub"])
+
+    def test_environ(self) -> None:
+        config = LayeredConfig(defaults=self.DEFAULTS, env_prefix="AE_")
+        config.load_environ(
+            {
+                "AE_SUB__KEY1": "env",
+                "AE_NUMBER": "5",
+                "OTHER": "val",
+            }
+        )
+        config.override({"number": 6})
+
+        self.assertEqual({"key1": "env", "key2": "val2"}, config["sub"])
+        self.assertEqual(6, config["number"])
+        self.assertNotIn("other", config)
+
+    def test_environ_no_prefix(self) -> None:
+        with self.assertRaisesRegex(
+            AssertionError, "env_prefix must be set before calling load_environ"
+        ):
+            self.config.load_environ({})
+
+    def test_merged_cached(self) -> None:
+        self.config.override({"key": "override"})
+        merged = self.config.merged
+        self.assertIs(merged, self.config.merged)
+
+        self.config["other"] = "val"
+        self.assertIsNot(merged, self.config.merged)
+
+    def test_mapping(self) -> None:
+        self.config["other"] = "val"
+        self.assertEqual(["key", "sub", "other"], list(self.config))
+        self.assertEqual(3, len(self.config))
+
+
+class TestPersist(LayeredConfigTestCase):
+    def test_file_layer_only(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "config.json")
+            with open(filepath, "w") as fobj:
+                fobj.write('{"sub": {"key2": "file"}}')
+
+            self.config.set_filepath(filepath)
+            self.assertFalse(self.config.dirty)
+            self.assertEqual({"key1": "val1", "key2": "file"}, self.config["sub"])
+
+            self.config.override({"key": "override"})
+            self.config["new-key"] = "new-val"
+            self.config.persist()
+
+            with open(filepath) as fobj:
+                self.assertEqual(
+                    {"new-key": "new-val", "sub": {"key2": "file"}}, json.load(fobj)
+                )
@@ -0,0 +1,61 @@
+import unittest
+
+from ..context import merge_dicts
+
+
+class TestMergeDicts(unittest.TestCase):
+    def test_empty(self) -> None:
+        self.assertEqual({}, merge_dicts([]))
+        self.assertEqual({}, merge_dicts([{}, {}]))
+
+    def test_single_layer_shared(self) -> None:
+        layer = {"key": "val"}
+        self.assertIs(layer, merge_dicts([{}, layer, {}]))
+
+    def test_override_key(self) -> None:
+        self.assertEqual(
+            {"key1": "val2", "key2": "val3"},
+            merge_dicts([{"key1": "val1"}, {"key1": "val2", "key2": "val3"}]),
+        )
+
+    def test_merge_subdicts(self) -> None:
+        lower = {"sub": {"key1": "val1", "key2": "val2"}}
+        upper = {"sub": {"key2": "new-val2"}}
+        self.assertEqual(
+            {"sub": {"key1": "val1", "key2": "new-val2"}},
+            merge_dicts([lower, upper]),
+        )
+        self.assertEqual({"sub": {"key1": "val1", "key2": "val2"}}, lower)
+        self.assertEqual({"sub": {"key2": "new-val2"}}, upper)
+
+    def test_shares_unmerged_subdicts(self) -> None:
+        lower = {"sub": {"key": "val"}}
+        merged = merge_dicts([lower, {"other": "val"}])
+        self.assertIs(lower["sub"], merged["sub"])
+
+    def test_dict_over_value(self) -> None:
+        self.assertEqual(
+            {"sub": {"key": "val"}},
+            merge_dicts(
+                [{"sub": {"old": "val"}}, {"sub": "val"}, {"sub": {"key": "val"}}]
+            ),
+        )
+
+    def test_value_over_dict(self) -> None:
+        self.assertEqual(
+            {"sub": "val"}, merge_dicts([{"sub": {"key": "val"}}, {"sub": "val"}])
+        )
+
+    def test_deep(self) -> None:
+        lower: dict = {}
+        upper: dict = {}
+        d1, d2 = lower, upper
+        for _ in range(5000):
+            d1["sub"] = {"lower": "val"}
+            d2["sub"] = {"upper": "val"}
+            d1, d2 = d1["sub"], d2["sub"]
+
+        d = merge_dicts([lower, upper])
+        for _ in range(5000):
+            d = d["sub"]
+        self.assertEqual({"lower": "val", "upper": "val"}, d)
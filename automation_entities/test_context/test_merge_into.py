@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock, call
+
+from ..context import copy_tree, extend_lists, merge_into
+
+
+class TestMergeInto(unittest.TestCase):
+    def test_merge(self) -> None:
+        original = {"key": "val", "sub": {"key1": "val1", "key2": "val2"}}
+        changed = merge_into(original, {"sub": {"key2": "new-val2"}, "new": 1})
+        self.assertTrue(changed)
+        self.assertEqual(
+            {"key": "val", "sub": {"key1": "val1", "key2": "new-val2"}, "new": 1},
+            original,
+        )
+
+    def test_unchanged(self) -> None:
+        original = {"key": "val", "sub": {"key": [1, 2]}}
+        self.assertFalse(merge_into(original, {"sub": {"key": [1, 2]}}))
+
+    def test_dict_over_value(self) -> None:
+        original = {"sub": "val"}
+        merge_into(original, {"sub": {"key": "val"}})
+        self.assertEqual({"sub": {"key": "val"}}, original)
+
+    def test_deep(self) -> None:
+        original: dict = {}
+        patch: dict = {}
+        d = patch
+        for _ in range(5000):
+            d["sub"] = {}
+            d = d["sub"]
+        d["key"] = "val"
+
+        merge_into(original, patch, ownership="take")
+        merge_into(original, patch)
+
+        d = original
+        for _ in range(5000):
+            d = d["sub"]
+        self.assertEqual({"key": "val"}, d)
+
+
+class TestOwnership(unittest.TestCase):
+    patch: dict
+
+    def setUp(self) -> None:
+        self.patch = {"sub": {"list": [1]}}
+
+    def test_copy(self) -> None:
+        original: dict = {}
+        merge_into(original, self.patch)
+        original["sub"]["list"].append(2)
+        original["sub"]["key"] = "val"
+        self.assertEqual({"sub": {"list": [1]}}, self.patch)
+
+    def test_take(self) -> None:
+        original: dict = {}
+        merge_into(original, self.patch, ownership="take")
+        self.assertIs(self.patch["sub"], original["sub"])
+
+    def test_share(self) -> None:
+        original: dict = {}
+        merge_into(original, self.patch, ownership="share")
+        self.assertIs(self.patch["sub"], original["sub"])
+
+
+class TestHooks(unittest.TestCase):
+    def test_on_conflict(self) -> None:
+        original = {"sub": {"list": [1], "key": "val"}}
+        on_conflict = MagicMock(side_effect=lambda path, old, new: new)
+        merge_into(
+            original, {"sub": {"list": [2], "new": "val"}}, on_conflict=on_conflict
+        )
+        on_conflict.assert_called_once_with(("sub", "list"), [1], [2])
+
+    def test_extend_lists(self) -> None:
+        original = {"list": [1], "key": "val"}
+        merge_into(original, {"list": [2], "key": "new"}, on_conflict=extend_lists)
+        self.assertEqual({"list": [1, 2], "key": "new"}, original)
+
+    def test_on_set(self) -> None:
+        original = {"sub": {"key": "val"}}
+        on_set = MagicMock()
+        merge_into(original, {"sub": {"key": "new"}}, on_set=on_set, path=("root",))
+        on_set.assert_has_calls([call(("root", "sub", "key"), original["sub"], "new")])
+
+
+class TestCopyTree(unittest.TestCase):
+    def test_copy(self) -> None:
+        leaf = object()
+        value = {"sub": [{"key": leaf}]}
+        copy = copy_tree(value)
+        self.assertEqual(value, copy)
+        self.assertIsNot(value["sub"], copy["sub"])
+        self.assertIsNot(value["sub"][0], copy["sub"][0])
+        self.assertIs(leaf, copy["sub"][0]["key"])
+
+    def test_scalar(self) -> None:
+        self.assertEqual("val", copy_tree("val"))
@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import MagicMock, call
 
 from ..context import patch_dict
 
@@ -63,3 +64,27 @@ class TestPatchDict(unittest.TestCase):
             },
             self.original,
         )
+
+    def test_changed(self) -> None:
+        self.original["key"] = "val"
+        self.original["recurse"] = {"recurse-key": "recurse-val"}
+        self.assertFalse(
+            patch_dict(self.original, {"recurse": {"recurse-key": "recurse-val"}})
+        )
+        self.assertTrue(patch_dict(self.original, {"recurse": {"new-key": "val"}}))
+
+    def test_on_set(self) -> None:
+        self.original["recurse"] = {"recurse-key": "recurse-val"}
+        on_set = MagicMock()
+        patch_dict(
+            self.original,
+            {"key": "val", "recurse": {"recurse-key": "new-val"}},
+            on_set,
+        )
+        self.assertEqual(
+            [
+                call(("key",), self.original, "val"),
+                call(("recurse", "recurse-key"), self.original["recurse"], "new-val"),
+            ],
+            on_set.call_args_list,
+        )
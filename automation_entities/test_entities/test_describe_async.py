@@ -0,0 +1,92 @@
+import asyncio
+import inspect
+import unittest
+
+from ..context import Context
+from ..entities import Entity, describe
+from ..sinks import MemorySink, NullSink
+
+
+class MyEntity(Entity):
+    @describe
+    async def fetch(self, value: int) -> int:
+        async with self.interaction():
+            async with self.request(f"fetch {value}"):
+                await asyncio.sleep(0)
+            async with self.result() as result:
+                result.log(f"got {value}")
+        return value * 2
+
+    @describe
+    async def fetch_all(self, *values: int) -> list:
+        return list(await asyncio.gather(*(self.fetch(v) for v in values)))
+
+    @describe
+    async def fail(self) -> None:
+        await asyncio.sleep(0)
+        raise ValueError("failed")
+
+
+class DescribeAsyncTestCase(unittest.TestCase):
+    sink: MemorySink
+    context: Context
+    entity: MyEntity
+
+    def setUp(self) -> None:
+        self.sink = MemorySink()
+        self.context = Context(sink=self.sink)
+        self.entity = MyEntity(self.context, "MyEntity")
+
+
+class TestDescribeAsync(DescribeAsyncTestCase):
+    def test_is_coroutine_function(self) -> None:
+        self.assertTrue(inspect.iscoroutinefunction(MyEntity.fetch))
+        self.assertEqual("fetch", MyEntity.fetch.__name__)
+
+    def test_simple(self) -> None:
+        self.assertEqual(2, asyncio.run(self.entity.fetch(1)))
+
+        self.assertEqual(
+            [
+                "MyEntity.fetch(1):",
+                "    MyEntity:",
+                "        <<< fetch 1",
+                "        >>>",
+                "            got 1",
+                "    Return: 2",
+            ],
+            self.sink.lines,
+        )
+        self.assertEqual(0, self.context.log_position)
+
+    def test_gathered(self) -> None:
+        self.assertEqual([2, 4], asyncio.run(self.entity.fetch_all(1, 2)))
+
+        depths = {}
+        for record in self.sink.records:
+            depths.setdefault(record.message, set()).add(record.depth)
+        self.assertEqual({1}, depths["MyEntity.fetch(1):"])
+        self.assertEqual({1}, depths["MyEntity.fetch(2):"])
+        self.assertEqual({3}, depths["<<< fetch 2"])
+        self.assertEqual({0}, depths["MyEntity.fetch_all(1, 2):"])
+        self.assertEqual("Return: [2, 4]", self.sink.records[-1].message)
+        self.assertEqual(0, self.context.log_position)
+
+    def test_error(self) -> None:
+        with self.assertRaisesRegex(ValueError, "failed"):
+            asyncio.run(self.entity.fail())
+
+        self.assertEqual(["MyEntity.fail():"], self.sink.lines)
+        self.assertEqual(0, self.context.log_position)
+
+    def test_call_stats(self) -> None:
+        recorder = self.context.enable_call_stats()
+        asyncio.run(self.entity.fetch_all(1, 2))
+
+        self.assertEqual(2, recorder.stats["MyEntity.fetch"].count)
+        self.assertEqual(1, recorder.stats["MyEntity.fetch_all"].count)
+
+    def test_quiet(self) -> None:
+        self.context.set_sink(NullSink())
+        self.assertEqual([2, 4], asyncio.run(self.entity.fetch_all(1, 2)))
+        self.assertEqual(0, self.context.log_position)
@@ -1,6 +1,8 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
+from ..context import Context
 from ..entities import Entity
+from ..sinks import MemorySink, NullSink
 from ..test_context import ContextTestCase
 
 
@@ -53,6 +55,35 @@ class TestRequest(BaseTestCase):
             ]
         )
 
+    def test_with_args(self) -> None:
+        self.entity.request("request %s %s", "a", 1)
+
+        self.assert_subcontexts(
+            [
+                {
+                    "message": "<<< request a 1",
+                }
+            ]
+        )
+
+    def test_deferred(self) -> None:
+        fcn = MagicMock(return_value="request message")
+        sink = MemorySink()
+        entity = Entity(Context(sink=sink), "MyEntity")
+        entity.request(fcn)
+
+        self.assertEqual(["<<< request message"], sink.lines)
+        fcn.assert_called_once_with()
+
+    def test_deferred_not_rendered(self) -> None:
+        fcn = MagicMock()
+        entity = Entity(Context(sink=NullSink()), "MyEntity")
+        entity.request(fcn)
+        with entity.result() as result:
+            result.log(fcn)
+
+        fcn.assert_not_called()
+
 
 class TestResult(BaseTestCase):
     def test_no_message(self) -> None:
@@ -83,8 +114,7 @@ class TestResult(BaseTestCase):
 
 
 class TestSleep(BaseTestCase):
-    @patch("time.sleep")
-    def test_sleep(self, mock_sleep: MagicMock) -> None:
+    def test_sleep(self) -> None:
         self.entity.sleep(5.3)
 
         self.assert_subcontexts(
@@ -100,4 +130,25 @@ class TestSleep(BaseTestCase):
             ]
         )
 
-        mock_sleep.assert_called_once_with(5.3)
+        self.context.sleep.assert_called_once_with(5.3)
+
+
+class TestRecords(BaseTestCase):
+    def test_kinds(self) -> None:
+        sink = MemorySink()
+        entity = Entity(Context(sink=sink), "MyEntity")
+        with entity.interaction():
+            entity.request("request message")
+            with entity.result() as result:
+                result.log("result message")
+
+        self.assertEqual(
+            [
+                ("interaction", 0, "MyEntity:"),
+                ("request", 1, "<<< request message"),
+                ("result", 1, ">>>"),
+                ("log", 2, "result message"),
+            ],
+            [(r.kind, r.depth, r.message) for r in sink.records],
+        )
+        self.assertEqual({"MyEntity"}, {r.entity for r in sink.records})
@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ..context import Context, QuietSubcontext, Verbosity
+from ..entities import Entity, describe
+from ..sinks import (
+    BufferedSink,
+    MemorySink,
+    MultiplexSink,
+    NullSink,
+    TeeSink,
+)
+
+
+class MyEntity(Entity):
+    @describe
+    def outer(self, value: int) -> int:
+        with self.interaction():
+            with self.request("request") as request:
+                request.log("detail")
+            with self.result():
+                pass
+        return value + 1
+
+    @describe
+    def fail(self) -> None:
+        raise ValueError("failed")
+
+
+class TestSinkEnabled(unittest.TestCase):
+    def test_enabled(self) -> None:
+        self.assertTrue(MemorySink().enabled)
+        self.assertFalse(NullSink().enabled)
+
+    def test_wrapped(self) -> None:
+        self.assertFalse(BufferedSink(NullSink()).enabled)
+        self.assertFalse(MultiplexSink(NullSink()).enabled)
+        self.assertTrue(BufferedSink(MemorySink()).enabled)
+
+    def test_tee(self) -> None:
+        self.assertFalse(TeeSink(NullSink(), NullSink()).enabled)
+        self.assertTrue(TeeSink(NullSink(), MemorySink()).enabled)
+
+
+class TestIsQuiet(unittest.TestCase):
+    def test_null_sink(self) -> None:
+        context = Context(sink=NullSink())
+        self.assertTrue(context.is_quiet())
+        self.assertFalse(context.is_enabled("interaction"))
+
+    def test_silent(self) -> None:
+        context = Context(sink=MemorySink(), verbosity=Verbosity.SILENT)
+        self.assertTrue(context.is_quiet("entity"))
+
+        context.set_verbosity(Verbosity.INTERACTION, entity="ent*")
+        self.assertFalse(context.is_quiet("entity"))
+        self.assertTrue(context.is_quiet("other"))
+
+    def test_timing(self) -> None:
+        context = Context(sink=NullSink())
+        context.enable_timing()
+        self.assertFalse(context.is_quiet())
+
+    def test_call_stats(self) -> None:
+        context = Context(sink=NullSink())
+        context.enable_call_stats()
+        self.assertFalse(context.is_quiet())
+
+    def test_generation(self) -> None:
+        context = Context(sink=NullSink())
+        generation = context.log_generation
+
+        context.set_sink(MemorySink())
+        self.assertGreater(context.log_generation, generation)
+        self.assertFalse(context.is_quiet())
+
+
+class TestQuietEntity(unittest.TestCase):
+    context: Context
+    entity: MyEntity
+
+    def setUp(self) -> None:
+        self.context = Context(sink=NullSink())
+        self.entity = MyEntity(self.context, "MyEntity")
+
+    def test_helpers(self) -> None:
+        self.assertIsInstance(self.entity.interaction(), QuietSubcontext)
+        self.assertIsInstance(self.entity.request("request"), QuietSubcontext)
+        self.assertIsInstance(self.entity.result(), QuietSubcontext)
+
+    @patch("automation_entities.entities.render_call")
+    def test_describe(self, mock_render_call: MagicMock) -> None:
+        self.assertEqual(2, self.entity.outer(1))
+        mock_render_call.assert_not_called()
+        self.assertEqual(0, self.context.log_position)
+
+    def test_cached(self) -> None:
+        with patch.object(
+            self.context, "is_quiet", wraps=self.context.is_quiet
+        ) as mock_is_quiet:
+            self.entity.outer(1)
+            self.entity.outer(1)
+
+            mock_is_quiet.assert_called_once_with("MyEntity")
+
+    def test_becomes_loud(self) -> None:
+        self.entity.outer(1)
+        sink = MemorySink()
+        self.context.set_sink(sink)
+        self.entity.outer(1)
+
+        self.assertEqual(
+            [
+                "MyEntity.outer(1):",
+                "    MyEntity:",
+                "        <<< request",
+                "            detail",
+                "        >>>",
+                "    Return: 2",
+            ],
+            sink.lines,
+        )
+
+    def test_dumps_on_error(self) -> None:
+        with patch.object(self.context, "dump_log") as mock_dump_log:
+            with self.assertRaises(ValueError):
+                self.entity.fail()
+
+        mock_dump_log.assert_called_once_with()
+
+    def test_flushes_at_top_level(self) -> None:
+        with patch.object(self.context, "flush") as mock_flush:
+            self.entity.outer(1)
+
+        mock_flush.assert_called_once_with()
+
+
+class TestFilteredReturn(unittest.TestCase):
+    @patch("automation_entities.entities.render")
+    def test_not_rendered(self, mock_render: MagicMock) -> None:
+        sink = MemorySink()
+        context = Context(sink=sink, verbosity=Verbosity.REQUEST)
+        self.assertEqual(2, MyEntity(context, "MyEntity").outer(1))
+
+        mock_render.assert_not_called()
+        self.assertEqual(["MyEntity.outer(1):"], sink.lines[:1])
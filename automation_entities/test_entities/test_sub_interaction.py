@@ -13,6 +13,7 @@ class BaseTestCase(ContextTestCase):
         super().setUp()
 
         self.entity = create_autospec(Entity)
+        self.entity.name = "MyEntity"
 
 
 class TestInitialize(BaseTestCase):
@@ -0,0 +1,98 @@
+import collections
+import unittest
+
+from ..rendering import (
+    RENDERERS,
+    RenderBuffer,
+    Renderer,
+    find_renderer,
+    register_renderer,
+    render,
+    render_call,
+    resolved,
+)
+from ..utils import SecretString
+
+
+class Custom:
+    def __repr__(self) -> str:
+        raise AssertionError("repr shouldn't be called")
+
+
+class SubCustom(Custom):
+    pass
+
+
+class TestRender(unittest.TestCase):
+    def test_matches_repr(self) -> None:
+        for value in [
+            None,
+            True,
+            1.5,
+            -3,
+            "it's",
+            b"bytes",
+            [1, [2, "3"]],
+            (1,),
+            (),
+            {"a": {"b": (1, 2)}},
+            {1},
+            set(),
+            frozenset(),
+            frozenset({1}),
+        ]:
+            self.assertEqual(repr(value), render(value))
+
+    def test_truncates(self) -> None:
+        value = list(range(100))
+        self.assertEqual(repr(value)[:97] + "...", render(value))
+
+    def test_stops_early(self) -> None:
+        value = ["a" * 200, Custom()]
+        self.assertEqual("['" + "a" * 95 + "...", render(value))
+
+    def test_max_depth(self) -> None:
+        self.assertEqual("[[[...]]]", Renderer(max_depth=2).render([[[[1]]]]))
+
+    def test_max_items(self) -> None:
+        renderer = Renderer(max_items=2)
+        self.assertEqual("[1, 2, ...]", renderer.render([1, 2, 3]))
+        self.assertEqual("{1: 2, 3: 4, ...}", renderer.render({1: 2, 3: 4, 5: 6}))
+
+    def test_huge_int(self) -> None:
+        self.assertEqual("<10001-bit int>", render(2**10000))
+
+    def test_secret_string(self) -> None:
+        self.assertEqual("['**********']", render([SecretString("secret")]))
+
+    def test_builtin_subclass(self) -> None:
+        value = collections.OrderedDict(a=1)
+        self.assertEqual(repr(value), render(value))
+
+
+class TestRenderCall(unittest.TestCase):
+    def test_args(self) -> None:
+        self.assertEqual("1, 'a', k=None", render_call((1, "a"), {"k": None}))
+
+    def test_truncates(self) -> None:
+        self.assertEqual(
+            "'" + "a" * 96 + "...", render_call(("a" * 200,), {"k": Custom()})
+        )
+
+
+class TestRegisterRenderer(unittest.TestCase):
+    def tearDown(self) -> None:
+        RENDERERS.pop(Custom, None)
+        resolved.clear()
+
+    def test_custom(self) -> None:
+        def render_custom(value: Custom, buf: RenderBuffer) -> None:
+            buf.write("<custom>")
+
+        register_renderer(Custom, render_custom)
+
+        self.assertIs(render_custom, find_renderer(SubCustom))
+        self.assertEqual("[<custom>, <custom>]", render([Custom(), SubCustom()]))
+
+    def test_unregistered(self) -> None:
+        self.assertIsNone(find_renderer(Custom))
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from ..context import Context
+from ..entities import Entity
+from ..scheduler import Scheduler, SleepCancelled
+from ..sinks import MemorySink
+
+
+class TestSleep(unittest.TestCase):
+    def test_sleeps(self) -> None:
+        start = time.monotonic()
+        Scheduler().sleep(0.01)
+        self.assertGreaterEqual(time.monotonic() - start, 0.01)
+
+    def test_cancel(self) -> None:
+        scheduler = Scheduler()
+        timer = threading.Timer(0.01, scheduler.cancel)
+        timer.start()
+
+        start = time.monotonic()
+        with self.assertRaises(SleepCancelled):
+            scheduler.sleep(10)
+        self.assertLess(time.monotonic() - start, 5)
+        timer.join()
+
+    def test_cancelled_before(self) -> None:
+        scheduler = Scheduler()
+        scheduler.cancel()
+
+        self.assertTrue(scheduler.is_cancelled())
+        with self.assertRaises(SleepCancelled):
+            scheduler.sleep(10)
+
+    def test_reset(self) -> None:
+        scheduler = Scheduler()
+        scheduler.cancel()
+        scheduler.reset()
+
+        self.assertFalse(scheduler.is_cancelled())
+        scheduler.sleep(0)
+
+
+class TestAsyncSleep(unittest.TestCase):
+    def test_sleeps(self) -> None:
+        scheduler = Scheduler()
+        start = time.monotonic()
+        asyncio.run(scheduler.async_sleep(0.01))
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.01)
+        self.assertEqual(set(), scheduler.waiters)
+
+    def test_overlaps(self) -> None:
+        scheduler = Scheduler()
+
+        async def main() -> None:
+            await asyncio.gather(*(scheduler.async_sleep(0.05) for _ in range(10)))
+
+        start = time.monotonic()
+        asyncio.run(main())
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_cancel(self) -> None:
+        scheduler = Scheduler()
+
+        async def main() -> None:
+            asyncio.get_running_loop().call_later(0.01, scheduler.cancel)
+            await scheduler.async_sleep(10)
+
+        with self.assertRaises(SleepCancelled):
+            asyncio.run(main())
+        self.assertEqual(set(), scheduler.waiters)
+
+    def test_cancel_from_thread(self) -> None:
+        scheduler = Scheduler()
+        timer = threading.Timer(0.01, scheduler.cancel)
+
+        async def main() -> None:
+            timer.start()
+            await scheduler.async_sleep(10)
+
+        with self.assertRaises(SleepCancelled):
+            asyncio.run(main())
+        timer.join()
+
+    def test_cancelled_before(self) -> None:
+        scheduler = Scheduler()
+        scheduler.cancel()
+
+        with self.assertRaises(SleepCancelled):
+            asyncio.run(scheduler.async_sleep(10))
+
+    def test_task_cancelled(self) -> None:
+        scheduler = Scheduler()
+
+        async def main() -> None:
+            task = asyncio.ensure_future(scheduler.async_sleep(10))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        self.assertEqual(set(), scheduler.waiters)
+
+
+class TestEntitySleep(unittest.TestCase):
+    sink: MemorySink
+    context: Context
+    entity: Entity
+
+    def setUp(self) -> None:
+        self.sink = MemorySink()
+        self.context = Context(sink=self.sink)
+        self.entity = Entity(self.context, "MyEntity")
+
+    def test_sleep(self) -> None:
+        self.entity.sleep(0)
+        self.assertEqual(["MyEntity:", "    <<< sleep 0"], self.sink.lines)
+
+    def test_async_sleep(self) -> None:
+        asyncio.run(self.entity.async_sleep(0))
+        self.assertEqual(["MyEntity:", "    <<< sleep 0"], self.sink.lines)
+
+    def test_cancelled(self) -> None:
+        self.context.scheduler.cancel()
+
+        with self.assertRaises(SleepCancelled):
+            self.entity.sleep(10)
+        with self.assertRaises(SleepCancelled):
+            asyncio.run(self.entity.async_sleep(10))
+        self.assertEqual(0, self.context.log_position)
@@ -0,0 +1,17 @@
+from ..sinks import LogKind, LogRecord
+
+
+def make_record(
+    message: str, depth: int = 0, kind: LogKind = "log", timestamp: float = 0.0
+) -> LogRecord:
+    """
+    Create a :class:`LogRecord` with the given *message* at the given *depth*
+    as it would be created by a default context.
+    """
+    return LogRecord(
+        depth=depth,
+        indent=depth * 4,
+        timestamp=timestamp,
+        kind=kind,
+        message=message,
+    )
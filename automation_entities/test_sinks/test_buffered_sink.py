@@ -0,0 +1,77 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ..sinks import BufferedSink, MemorySink
+from .common import make_record
+
+
+class BufferedSinkTestCase(unittest.TestCase):
+    memory: MemorySink
+    sink: BufferedSink
+
+    def setUp(self) -> None:
+        self.memory = MemorySink()
+        self.sink = BufferedSink(self.memory, max_records=3, max_delay=None)
+
+
+class TestEmit(BufferedSinkTestCase):
+    def test_holds_records(self) -> None:
+        self.sink.emit(make_record("line 1"))
+        self.sink.emit(make_record("line 2"))
+        self.assertEqual([], self.memory.records)
+        self.assertEqual(
+            [make_record("line 1"), make_record("line 2")], self.sink.buffer
+        )
+
+    def test_max_records(self) -> None:
+        self.sink.emit_records([make_record("line 1"), make_record("line 2")])
+        self.sink.emit(make_record("line 3"))
+        self.assertEqual(["line 1", "line 2", "line 3"], self.memory.lines)
+        self.assertEqual([], self.sink.buffer)
+
+    @patch("time.monotonic")
+    def test_max_delay(self, mock_monotonic: MagicMock) -> None:
+        mock_monotonic.side_effect = [0.0, 0.5, 1.5, 1.5]
+        sink = BufferedSink(self.memory, max_delay=1.0)
+
+        sink.emit(make_record("line 1"))
+        self.assertEqual([], self.memory.lines)
+
+        sink.emit(make_record("line 2"))
+        self.assertEqual(["line 1", "line 2"], self.memory.lines)
+
+    def test_max_delay_timer(self) -> None:
+        flushed = threading.Event()
+        self.memory.flush = flushed.set  # type: ignore[method-assign]
+        sink = BufferedSink(self.memory, max_delay=0.01)
+
+        sink.emit(make_record("line 1"))
+        self.assertTrue(flushed.wait(5))
+        self.assertEqual(["line 1"], self.memory.lines)
+        self.assertIsNone(sink.timer)
+
+
+class TestFlush(BufferedSinkTestCase):
+    def test_flush(self) -> None:
+        self.sink.emit(make_record("line 1"))
+        self.sink.flush()
+        self.assertEqual(["line 1"], self.memory.lines)
+
+    def test_flush_empty(self) -> None:
+        self.sink.flush()
+        self.assertEqual([], self.memory.lines)
+
+    def test_close(self) -> None:
+        inner = MagicMock()
+        sink = BufferedSink(inner)
+        sink.emit(make_record("line 1"))
+        sink.close()
+
+        inner.emit_records.assert_called_once_with([make_record("line 1")])
+        inner.close.assert_called_once_with()
+
+    @patch("atexit.register")
+    def test_atexit(self, mock_register: MagicMock) -> None:
+        sink = BufferedSink(self.memory)
+        mock_register.assert_called_once_with(sink.flush)
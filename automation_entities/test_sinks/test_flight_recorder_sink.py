@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import MagicMock
+
+from ..context import Context
+from ..sinks import FlightRecorderSink, MemorySink
+from .common import make_record
+
+
+class FlightRecorderTestCase(unittest.TestCase):
+    memory: MemorySink
+    sink: FlightRecorderSink
+
+    def setUp(self) -> None:
+        self.memory = MemorySink()
+        self.sink = FlightRecorderSink(self.memory, max_records=3)
+
+
+class TestEmit(FlightRecorderTestCase):
+    def test_holds_records(self) -> None:
+        self.sink.emit(make_record("line 1"))
+        self.sink.flush()
+        self.assertEqual([], self.memory.records)
+        self.assertEqual([make_record("line 1")], list(self.sink.records))
+
+    def test_max_records(self) -> None:
+        self.sink.emit_records([make_record(f"line {i}") for i in range(5)])
+        self.assertEqual(
+            ["line 2", "line 3", "line 4"], [r.message for r in self.sink.records]
+        )
+
+    def test_max_bytes(self) -> None:
+        sink = FlightRecorderSink(self.memory, max_records=10, max_bytes=16)
+        sink.emit(make_record("line 1"))
+        sink.emit(make_record("line 2", depth=1))
+        sink.emit(make_record("line 3"))
+        self.assertEqual(["line 3"], [r.message for r in sink.records])
+        self.assertEqual(7, sink.size)
+
+
+class TestDump(FlightRecorderTestCase):
+    def test_dump(self) -> None:
+        self.sink.emit(make_record("line 1"))
+        self.sink.dump()
+        self.assertEqual(["line 1"], self.memory.lines)
+        self.assertEqual(0, len(self.sink.records))
+
+    def test_close(self) -> None:
+        inner = MagicMock()
+        sink = FlightRecorderSink(inner)
+        sink.emit(make_record("line 1"))
+        sink.close()
+
+        inner.emit_records.assert_not_called()
+        inner.close.assert_called_once_with()
+
+
+class TestContext(FlightRecorderTestCase):
+    def test_success(self) -> None:
+        context = Context(sink=self.sink)
+        with context.subcontext("sub context"):
+            context.log("subcontext message")
+
+        self.assertEqual([], self.memory.records)
+
+    def test_failure(self) -> None:
+        context = Context(sink=self.sink)
+        with self.assertRaises(ValueError):
+            with context.subcontext("sub context"):
+                context.log("subcontext message")
+                raise ValueError
+
+        self.assertEqual(["sub context", "    subcontext message"], self.memory.lines)
+
+    def test_handled_failure(self) -> None:
+        context = Context(sink=self.sink)
+        with context.subcontext("routine"):
+            for attempt in range(3):
+                try:
+                    with context.subcontext("attempt %d", attempt):
+                        if attempt < 2:
+                            raise ValueError
+
+                except ValueError:
+                    pass
+
+        self.assertEqual([], self.memory.records)
+
+    def test_nested_failure(self) -> None:
+        context = Context(sink=self.sink)
+        with self.assertRaises(ValueError):
+            with context.subcontext("routine"):
+                with context.subcontext("attempt"):
+                    raise ValueError
+
+        self.assertEqual(["routine", "    attempt"], self.memory.lines)
+
+    def test_dump_log(self) -> None:
+        context = Context(sink=self.sink)
+        context.log("message")
+        context.dump_log()
+
+        self.assertEqual(["message"], self.memory.lines)
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from ..context import Context
+from ..sinks import MemorySink, MultiplexSink, default_worker_id
+from .common import make_record
+
+
+class MultiplexSinkTestCase(unittest.TestCase):
+    memory: MemorySink
+    sink: MultiplexSink
+    worker: str
+
+    def setUp(self) -> None:
+        self.memory = MemorySink()
+        self.worker = "a"
+        self.sink = MultiplexSink(self.memory, worker_id=lambda: self.worker)
+
+
+class TestEmit(MultiplexSinkTestCase):
+    def test_tags_records(self) -> None:
+        self.sink.emit(make_record("line 1"))
+        self.sink.flush()
+
+        self.assertEqual("a", self.memory.records[0].worker)
+        self.assertEqual(["[a] line 1"], self.memory.lines)
+
+    def test_holds_tree(self) -> None:
+        self.sink.emit(make_record("outer"))
+        self.sink.emit(make_record("inner", depth=1))
+
+        self.assertEqual([], self.memory.records)
+        self.assertEqual(
+            ["outer", "inner"], [r.message for r in self.sink.buffers["a"]]
+        )
+
+    def test_new_tree(self) -> None:
+        self.sink.emit(make_record("line 1"))
+        self.sink.emit(make_record("line 2"))
+
+        self.assertEqual(["[a] line 1"], self.memory.lines)
+
+    def test_keeps_trees_contiguous(self) -> None:
+        self.sink.emit(make_record("a outer"))
+        self.worker = "b"
+        self.sink.emit(make_record("b outer"))
+        self.worker = "a"
+        self.sink.emit(make_record("a inner", depth=1))
+        self.worker = "b"
+        self.sink.emit(make_record("b inner", depth=1))
+        self.sink.flush()
+        self.worker = "a"
+        self.sink.flush()
+
+        self.assertEqual(
+            ["[b] b outer", "[b]     b inner", "[a] a outer", "[a]     a inner"],
+            self.memory.lines,
+        )
+
+
+class TestFlush(MultiplexSinkTestCase):
+    def test_nested_workers(self) -> None:
+        self.sink.emit(make_record("outer"))
+        self.worker = "b"
+        self.sink.emit(make_record("task", depth=1))
+        self.worker = "a"
+        self.sink.flush()
+
+        self.assertEqual(["[a] outer", "[b]     task"], self.memory.lines)
+        self.assertEqual({}, self.sink.buffers)
+
+    def test_flushes_inner(self) -> None:
+        inner = MagicMock()
+        sink = MultiplexSink(inner)
+        sink.flush()
+        inner.flush.assert_called_once_with()
+
+
+class TestDump(MultiplexSinkTestCase):
+    def test_dump(self) -> None:
+        inner = MagicMock()
+        sink = MultiplexSink(inner, worker_id=lambda: "a")
+        record = make_record("line 1")
+        sink.emit(record)
+        sink.dump()
+
+        inner.emit_records.assert_called_once_with([record])
+        inner.dump.assert_called_once_with()
+
+
+class TestClose(MultiplexSinkTestCase):
+    def test_sends_everything(self) -> None:
+        self.sink.emit(make_record("a outer"))
+        self.worker = "b"
+        self.sink.emit(make_record("b outer"))
+        self.sink.close()
+
+        self.assertEqual(["[a] a outer", "[b] b outer"], self.memory.lines)
+
+
+class TestContext(unittest.TestCase):
+    def test_threads(self) -> None:
+        memory = MemorySink()
+        context = Context(sink=MultiplexSink(memory))
+        barrier = threading.Barrier(2)
+
+        def worker() -> None:
+            with context.subcontext("outer"):
+                barrier.wait()
+                with context.subcontext("inner"):
+                    barrier.wait()
+                    context.log("message")
+
+        threads = [threading.Thread(target=worker, name=f"w{i}") for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        workers = [r.worker for r in memory.records]
+        self.assertEqual(6, len(workers))
+        self.assertEqual(workers[0], workers[1])
+        self.assertEqual(workers[0], workers[2])
+        self.assertEqual(workers[3], workers[4])
+        self.assertEqual(workers[3], workers[5])
+        self.assertNotEqual(workers[0], workers[3])
+        self.assertEqual(
+            ["outer", "inner", "message"] * 2, [r.message for r in memory.records]
+        )
+
+    def test_tasks(self) -> None:
+        memory = MemorySink()
+        context = Context(sink=MultiplexSink(memory))
+
+        async def worker(name: str) -> None:
+            with context.subcontext(f"{name} outer"):
+                await asyncio.sleep(0)
+                context.log(f"{name} message")
+
+        async def main() -> None:
+            with context.subcontext("main"):
+                await asyncio.gather(worker("a"), worker("b"))
+
+        asyncio.run(main())
+
+        messages = [r.message for r in memory.records]
+        self.assertEqual("main", messages[0])
+        self.assertIn(
+            messages[1:],
+            (
+                ["a outer", "a message", "b outer", "b message"],
+                ["b outer", "b message", "a outer", "a message"],
+            ),
+        )
+
+    def test_gathered_steps(self) -> None:
+        memory = MemorySink()
+        context = Context(sink=MultiplexSink(memory))
+
+        async def worker(name: str) -> None:
+            context.log(f"{name} step 0")
+            await asyncio.sleep(0)
+            context.log(f"{name} step 1")
+
+        async def main() -> None:
+            with context.subcontext("main outer"):
+                await asyncio.gather(worker("a"), worker("b"))
+                context.log("main done")
+
+        asyncio.run(main())
+
+        self.assertEqual(
+            ["main outer", "main done", "a step 0", "a step 1", "b step 0", "b step 1"],
+            [r.message for r in memory.records],
+        )
+
+
+class TestDefaultWorkerId(unittest.TestCase):
+    def test_thread(self) -> None:
+        self.assertTrue(default_worker_id().endswith("/MainThread"))
+
+    def test_task(self) -> None:
+        async def named() -> str:
+            return default_worker_id()
+
+        async def main() -> str:
+            return await asyncio.create_task(named(), name="my-task")
+
+        self.assertTrue(asyncio.run(main()).endswith("/MainThread/my-task"))
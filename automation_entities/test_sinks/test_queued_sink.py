@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from typing import List
+from unittest.mock import MagicMock
+
+from ..sinks import FlightRecorderSink, LogRecord, MemorySink, QueuedSink
+from .common import make_record
+
+
+class BlockingSink(MemorySink):
+    """
+    sink that doesn't write anything until :attr:`release` is set
+    """
+
+    release: threading.Event
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def emit_records(self, records: List[LogRecord]) -> None:
+        self.release.wait()
+        super().emit_records(records)
+
+
+class TestQueuedSink(unittest.TestCase):
+    def test_emit(self) -> None:
+        memory = MemorySink()
+        sink = QueuedSink(memory)
+        sink.emit(make_record("line 1"))
+        sink.emit_records([make_record("line 2"), make_record("line 3")])
+        sink.drain()
+        self.assertEqual(["line 1", "line 2", "line 3"], memory.lines)
+        sink.close()
+
+    def test_close(self) -> None:
+        memory = MemorySink()
+        sink = QueuedSink(memory)
+        sink.emit(make_record("line 1"))
+        sink.close()
+
+        self.assertEqual(["line 1"], memory.lines)
+        self.assertFalse(sink.thread.is_alive())
+
+        sink.emit(make_record("line 2"))
+        self.assertEqual(["line 1"], memory.lines)
+
+    def test_invalid_policy(self) -> None:
+        with self.assertRaisesRegex(AssertionError, "invalid backpressure policy"):
+            QueuedSink(MemorySink(), policy="invalid")  # type: ignore
+
+    def fill(self, policy: str) -> BlockingSink:
+        blocking = BlockingSink()
+        sink = QueuedSink(blocking, maxsize=2, policy=policy)  # type: ignore
+
+        # Wait for the writer thread to pick up the first line so that the
+        # queue is empty before filling it up.
+        sink.emit(make_record("line 1"))
+        while not sink.pending.empty():
+            time.sleep(0.001)
+
+        for i in range(2, 6):
+            sink.emit(make_record(f"line {i}"))
+
+        blocking.release.set()
+        sink.close()
+        self.assertEqual(2, sink.dropped)
+        return blocking
+
+    def test_drop_newest(self) -> None:
+        blocking = self.fill("drop-newest")
+        self.assertEqual(["line 1", "line 2", "line 3"], blocking.lines)
+
+    def test_drop_oldest(self) -> None:
+        blocking = self.fill("drop-oldest")
+        self.assertEqual(["line 1", "line 4", "line 5"], blocking.lines)
+
+    def test_dump(self) -> None:
+        memory = MemorySink()
+        sink = QueuedSink(FlightRecorderSink(memory))
+        sink.emit(make_record("line 1"))
+        sink.drain()
+        self.assertEqual([], memory.lines)
+
+        sink.dump()
+        sink.drain()
+        self.assertEqual(["line 1"], memory.lines)
+        sink.close()
+
+    def test_control_under_backpressure(self) -> None:
+        for policy, lines in [
+            ("drop-oldest", ["line 1", "line 5"]),
+            ("drop-newest", ["line 1", "line 2"]),
+        ]:
+            with self.subTest(policy=policy):
+                blocking = BlockingSink()
+                blocking.flush = MagicMock()  # type: ignore[method-assign]
+                blocking.dump = MagicMock()  # type: ignore[method-assign]
+                sink = QueuedSink(blocking, maxsize=3, policy=policy)  # type: ignore
+
+                sink.emit(make_record("line 1"))
+                while not sink.pending.empty():
+                    time.sleep(0.001)
+
+                sink.emit(make_record("line 2"))
+                sink.flush()
+                sink.dump()
+                for i in range(3, 6):
+                    sink.emit(make_record(f"line {i}"))
+
+                blocking.release.set()
+                sink.close()
+                self.assertEqual(3, sink.dropped)
+                self.assertEqual(lines, blocking.lines)
+                self.assertGreaterEqual(blocking.flush.call_count, 2)
+                blocking.dump.assert_called_once_with()
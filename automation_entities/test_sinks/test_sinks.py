@@ -0,0 +1,144 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ..sinks import (
+    FileSink,
+    JSONLinesSink,
+    LogRecord,
+    MemorySink,
+    NullSink,
+    StdoutSink,
+    TeeSink,
+    render_message,
+)
+from .common import make_record
+
+
+class TestLogRecord(unittest.TestCase):
+    def test_text(self) -> None:
+        self.assertEqual("    message", make_record("message", depth=1).text)
+
+    def test_as_dict(self) -> None:
+        record = make_record("message", depth=2, kind="request", timestamp=1.5)
+        self.assertEqual(
+            {
+                "depth": 2,
+                "timestamp": 1.5,
+                "kind": "request",
+                "entity": None,
+                "message": "message",
+            },
+            record.as_dict(),
+        )
+
+    def test_deferred(self) -> None:
+        fcn = MagicMock(return_value="message %s")
+        record = LogRecord(0, 0, 0.0, "log", fcn, args=("arg",))
+        fcn.assert_not_called()
+
+        self.assertEqual("message arg", record.message)
+        self.assertEqual("message arg", record.message)
+        fcn.assert_called_once_with()
+
+    def test_render(self) -> None:
+        fcn = MagicMock(return_value="message")
+        record = LogRecord(0, 0, 0.0, "log", fcn)
+        self.assertEqual(record, record.render())
+        fcn.assert_called_once_with()
+
+
+class TestRenderMessage(unittest.TestCase):
+    def test_string(self) -> None:
+        self.assertEqual("100%", render_message("100%"))
+
+    def test_args(self) -> None:
+        self.assertEqual("a 1 b", render_message("a %s %s", (1, "b")))
+
+    def test_callable(self) -> None:
+        self.assertEqual("message", render_message(lambda: "message"))
+
+
+class TestNullSink(unittest.TestCase):
+    def test_emit(self) -> None:
+        sink = NullSink()
+        sink.emit(make_record("line"))
+        sink.emit_records([make_record("line")])
+        sink.close()
+
+    def test_does_not_render(self) -> None:
+        fcn = MagicMock()
+        NullSink().emit(LogRecord(0, 0, 0.0, "log", fcn))
+        fcn.assert_not_called()
+
+
+class TestMemorySink(unittest.TestCase):
+    def test_emit(self) -> None:
+        sink = MemorySink()
+        sink.emit(make_record("line 1"))
+        sink.emit_records([make_record("line 2", depth=1), make_record("line 3")])
+        self.assertEqual(["line 1", "    line 2", "line 3"], sink.lines)
+
+
+class TestStdoutSink(unittest.TestCase):
+    @patch("builtins.print")
+    def test_emit(self, mock_print: MagicMock) -> None:
+        StdoutSink().emit(make_record("line", depth=1))
+        mock_print.assert_called_once_with("    line")
+
+    @patch("builtins.print")
+    def test_emit_records(self, mock_print: MagicMock) -> None:
+        StdoutSink().emit_records([make_record("line 1"), make_record("line 2")])
+        mock_print.assert_called_once_with("line 1\nline 2")
+
+    @patch("builtins.print")
+    def test_emit_no_records(self, mock_print: MagicMock) -> None:
+        StdoutSink().emit_records([])
+        mock_print.assert_not_called()
+
+
+class TestFileSink(unittest.TestCase):
+    def test_emit(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "routine.log")
+            sink = FileSink(filepath)
+            sink.emit(make_record("line 1"))
+            sink.emit_records([make_record("line 2", depth=1), make_record("line 3")])
+            sink.close()
+
+            with open(filepath) as fobj:
+                self.assertEqual("line 1\n    line 2\nline 3\n", fobj.read())
+
+
+class TestJSONLinesSink(unittest.TestCase):
+    def test_emit(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "routine.jsonl")
+            sink = JSONLinesSink(filepath)
+            records = [make_record("line 1"), make_record("line 2", depth=1)]
+            sink.emit(records[0])
+            sink.emit_records(records[1:])
+            sink.close()
+
+            with open(filepath) as fobj:
+                self.assertEqual(
+                    [r.as_dict() for r in records],
+                    [json.loads(line) for line in fobj],
+                )
+
+
+class TestTeeSink(unittest.TestCase):
+    def test_emit(self) -> None:
+        sinks = [MagicMock(), MagicMock()]
+        tee = TeeSink(*sinks)
+        record = make_record("line")
+        tee.emit(record)
+        tee.emit_records([record])
+        tee.close()
+
+        for sink in sinks:
+            sink.emit.assert_called_once_with(record)
+            sink.emit_records.assert_called_once_with([record])
+            sink.close.assert_called_once_with()
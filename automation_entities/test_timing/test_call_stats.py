@@ -0,0 +1,185 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ..context import Context
+from ..entities import Entity, describe
+from ..sinks import NullSink
+from ..timing import HISTOGRAM_BOUNDS, CallStatsRecorder
+
+
+class MyEntity(Entity):
+    @describe
+    def outer(self) -> None:
+        self.inner()
+
+    @describe
+    def inner(self) -> None:
+        pass
+
+    @describe
+    def fail(self) -> None:
+        raise ValueError("failed")
+
+    @describe
+    async def parent(self) -> None:
+        await self.child()
+        await asyncio.gather(*(self.child() for _ in range(3)))
+
+    @describe
+    async def child(self) -> None:
+        await asyncio.sleep(0.05)
+
+
+class TestRecord(unittest.TestCase):
+    def test_aggregates(self) -> None:
+        recorder = CallStatsRecorder()
+        recorder.record("fcn", 0.5, 0.25)
+        recorder.record("fcn", 2.0, 2.0, failed=True)
+
+        (stats,) = recorder.report()
+        self.assertEqual("fcn", stats.name)
+        self.assertEqual(2, stats.count)
+        self.assertEqual(1, stats.errors)
+        self.assertEqual(2.5, stats.total)
+        self.assertEqual(2.25, stats.exclusive)
+        self.assertEqual(1.25, stats.mean)
+        self.assertEqual(2.0, stats.max)
+
+    def test_histogram(self) -> None:
+        recorder = CallStatsRecorder()
+        recorder.record("fcn", 0.000001, 0.0)
+        recorder.record("fcn", 0.5, 0.0)
+        recorder.record("fcn", 1000.0, 0.0)
+
+        histogram = recorder.stats["fcn"].histogram
+        self.assertEqual(len(HISTOGRAM_BOUNDS) + 1, len(histogram))
+        self.assertEqual(1, histogram[0])
+        self.assertEqual(1, histogram[HISTOGRAM_BOUNDS.index(1.0)])
+        self.assertEqual(1, histogram[-1])
+        self.assertEqual(3, sum(histogram))
+
+    def test_report_order(self) -> None:
+        recorder = CallStatsRecorder()
+        recorder.record("fast", 1.0, 0.1)
+        recorder.record("slow", 0.5, 0.5)
+
+        self.assertEqual(["slow", "fast"], [s.name for s in recorder.report()])
+
+    def test_reset(self) -> None:
+        recorder = CallStatsRecorder()
+        recorder.record("fcn", 1.0, 1.0)
+        recorder.reset()
+
+        self.assertEqual([], recorder.report())
+
+
+class TestCall(unittest.TestCase):
+    @patch("time.perf_counter")
+    def test_exclusive(self, mock_perf_counter: MagicMock) -> None:
+        mock_perf_counter.side_effect = [0.0, 1.0, 3.0, 10.0]
+        recorder = CallStatsRecorder()
+
+        with recorder.call("outer"):
+            with recorder.call("inner"):
+                pass
+
+        self.assertEqual(2.0, recorder.stats["inner"].exclusive)
+        self.assertEqual(10.0, recorder.stats["outer"].total)
+        self.assertEqual(8.0, recorder.stats["outer"].exclusive)
+        self.assertIsNone(recorder.current.get())
+
+    def test_error(self) -> None:
+        recorder = CallStatsRecorder()
+        with self.assertRaises(ValueError):
+            with recorder.call("fcn"):
+                raise ValueError()
+
+        self.assertEqual(1, recorder.stats["fcn"].errors)
+
+
+class TestFormatReport(unittest.TestCase):
+    def test_format(self) -> None:
+        recorder = CallStatsRecorder()
+        recorder.record("fcn", 1.0, 0.5)
+
+        self.assertEqual(
+            [
+                "name     count  errors     total exclusive      mean       max",
+                "fcn          1       0     1.000     0.500     1.000     1.000",
+            ],
+            recorder.format_report().split("\n"),
+        )
+
+
+class TestDump(unittest.TestCase):
+    def test_dump(self) -> None:
+        recorder = CallStatsRecorder()
+        recorder.record("fcn", 1.0, 0.5)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "stats.json")
+            recorder.dump(filepath)
+            with open(filepath) as fobj:
+                data = json.load(fobj)
+
+        self.assertEqual(list(HISTOGRAM_BOUNDS), data["histogram_bounds"])
+        self.assertEqual("fcn", data["calls"][0]["name"])
+        self.assertEqual(1, data["calls"][0]["count"])
+
+
+class TestContext(unittest.TestCase):
+    context: Context
+
+    def setUp(self) -> None:
+        self.context = Context(sink=NullSink())
+
+    def test_disabled(self) -> None:
+        self.assertIsNone(self.context.call_stats)
+        MyEntity(self.context, "MyEntity").outer()
+
+        with self.assertRaisesRegex(AssertionError, "call stats must be enabled"):
+            self.context.call_stats_report()
+
+    def test_enable(self) -> None:
+        recorder = self.context.enable_call_stats()
+        self.assertIs(recorder, self.context.call_stats)
+        self.assertIs(recorder, self.context.enable_call_stats())
+
+    @patch("atexit.register")
+    def test_dump_path(self, mock_register: MagicMock) -> None:
+        recorder = self.context.enable_call_stats(dump_path="stats.json")
+        mock_register.assert_called_once_with(recorder.dump, "stats.json")
+
+    def test_describe(self) -> None:
+        recorder = self.context.enable_call_stats()
+        entity = MyEntity(self.context, "MyEntity")
+        entity.outer()
+        entity.outer()
+        with self.assertRaises(ValueError):
+            entity.fail()
+
+        self.assertEqual(2, recorder.stats["MyEntity.outer"].count)
+        self.assertEqual(2, recorder.stats["MyEntity.inner"].count)
+        self.assertEqual(1, recorder.stats["MyEntity.fail"].errors)
+        self.assertLessEqual(
+            recorder.stats["MyEntity.outer"].exclusive,
+            recorder.stats["MyEntity.outer"].total,
+        )
+        self.assertIn("MyEntity.outer", self.context.call_stats_report())
+
+    def test_gather(self) -> None:
+        recorder = self.context.enable_call_stats()
+        asyncio.run(MyEntity(self.context, "MyEntity").parent())
+
+        parent = recorder.stats["MyEntity.parent"]
+        child = recorder.stats["MyEntity.child"]
+        self.assertEqual(4, child.count)
+
+        # Only the child awaited directly counts against the parent, while
+        # the gathered children overlap the time the parent spends waiting.
+        self.assertGreaterEqual(parent.exclusive, 0.04)
+        self.assertLess(parent.exclusive, parent.total - 0.04)
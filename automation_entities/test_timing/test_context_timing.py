@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ..context import Context
+from ..entities import Entity, describe
+from ..sinks import MemorySink, NullSink
+
+
+class MyEntity(Entity):
+    @describe
+    def outer(self) -> None:
+        self.inner()
+
+    def inner(self) -> None:
+        with self.interaction():
+            with self.result():
+                pass
+
+    @describe
+    def get(self) -> None:
+        with self.interaction():
+            pass
+
+
+class ContextTimingTestCase(unittest.TestCase):
+    context: Context
+
+    def setUp(self) -> None:
+        self.context = Context(sink=NullSink())
+
+
+class TestEnableTiming(ContextTimingTestCase):
+    def test_disabled(self) -> None:
+        self.assertIsNone(self.context.timing)
+        with self.context.subcontext("sub context") as sctx:
+            pass
+        self.assertIsNone(sctx.span_id)
+
+    def test_enable(self) -> None:
+        recorder = self.context.enable_timing()
+        self.assertEqual(recorder, self.context.timing)
+        self.assertEqual(recorder, self.context.enable_timing())
+
+    @patch("sys._getframe")
+    def test_disabled_name(self, mock_getframe: MagicMock) -> None:
+        MyEntity(Context(sink=MemorySink()), "MyEntity").inner()
+        mock_getframe.assert_not_called()
+
+    def test_latency_report_disabled(self) -> None:
+        with self.assertRaisesRegex(AssertionError, "timing must be enabled"):
+            self.context.latency_report()
+
+
+class TestSpans(ContextTimingTestCase):
+    @patch("time.monotonic")
+    def test_nested(self, mock_monotonic: MagicMock) -> None:
+        mock_monotonic.side_effect = [float(i) for i in range(20)]
+        recorder = self.context.enable_timing()
+
+        MyEntity(self.context, "MyEntity").outer()
+
+        self.assertEqual(
+            [
+                ("result", 2, 3),
+                ("MyEntity.inner", 1, 2),
+                ("MyEntity.outer", 0, 1),
+            ],
+            [(s.name, s.depth, s.id) for s in recorder.spans],
+        )
+        self.assertEqual([2, 1, None], [s.parent for s in recorder.spans])
+        self.assertIsNone(self.context.current_span)
+
+    def test_described_interaction(self) -> None:
+        recorder = self.context.enable_timing()
+        entity = MyEntity(self.context, "MyEntity")
+        for _ in range(3):
+            entity.get()
+
+        self.assertEqual(
+            {"MyEntity.get": 3, "interaction": 3},
+            {s.name: s.count for s in recorder.report()},
+        )
+        self.assertIsNone(self.context.current_span_name)
+
+    def test_report(self) -> None:
+        self.context.enable_timing()
+        entity = MyEntity(self.context, "MyEntity")
+        entity.inner()
+        entity.inner()
+
+        report = self.context.latency_report()
+        self.assertIn("MyEntity.inner", report)
+        self.assertEqual(
+            {"MyEntity.inner": 2, "result": 2},
+            {s.name: s.count for s in self.context.timing.report()},
+        )
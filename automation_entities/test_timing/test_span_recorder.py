@@ -0,0 +1,94 @@
+import threading
+import unittest
+
+from ..timing import LatencyStats, Span, SpanRecorder, percentile
+
+
+class TestPercentile(unittest.TestCase):
+    def test_percentile(self) -> None:
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(50.0, percentile(values, 50))
+        self.assertEqual(95.0, percentile(values, 95))
+        self.assertEqual(100.0, percentile(values, 100))
+        self.assertEqual(1.0, percentile(values, 0))
+
+    def test_single(self) -> None:
+        self.assertEqual(3.0, percentile([3.0], 99))
+
+    def test_empty(self) -> None:
+        with self.assertRaisesRegex(AssertionError, "at least one value"):
+            percentile([], 50)
+
+
+class TestSpanRecorder(unittest.TestCase):
+    recorder: SpanRecorder
+
+    def setUp(self) -> None:
+        self.recorder = SpanRecorder(max_spans=2)
+
+    def record(self, name: str, duration: float) -> None:
+        self.recorder.record(
+            Span(
+                id=self.recorder.next_id(),
+                parent=None,
+                name=name,
+                depth=0,
+                start=0.0,
+                duration=duration,
+            )
+        )
+
+    def test_max_spans(self) -> None:
+        for i in range(3):
+            self.record("fast", 1.0)
+        self.assertEqual([2, 3], [s.id for s in self.recorder.spans])
+        self.assertEqual(3, self.recorder.report()[0].count)
+
+    def test_max_samples(self) -> None:
+        recorder = SpanRecorder(max_samples=10)
+        for i in range(1, 1001):
+            recorder.record(Span(i, None, "fast", 0, 0.0, float(i)))
+
+        (stats,) = recorder.report()
+        self.assertEqual(10, len(recorder.durations["fast"].samples))
+        self.assertEqual(1000, stats.count)
+        self.assertEqual(500500.0, stats.total)
+        self.assertEqual(1000.0, stats.max)
+
+    def test_threads(self) -> None:
+        recorder = SpanRecorder(max_spans=10, max_samples=10)
+
+        def record() -> None:
+            for _ in range(1000):
+                recorder.record(Span(recorder.next_id(), None, "fast", 0, 0.0, 1.0))
+                recorder.report()
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        (stats,) = recorder.report()
+        self.assertEqual(4000, stats.count)
+        self.assertEqual(4001, recorder.next_id())
+
+    def test_report(self) -> None:
+        self.record("fast", 1.0)
+        self.record("fast", 3.0)
+        self.record("slow", 5.0)
+        self.assertEqual(
+            [
+                LatencyStats("slow", 1, 5.0, 5.0, 5.0, 5.0, 5.0),
+                LatencyStats("fast", 2, 4.0, 1.0, 3.0, 3.0, 3.0),
+            ],
+            self.recorder.report(),
+        )
+
+    def test_format_report(self) -> None:
+        self.record("fast", 1.0)
+        self.assertEqual(
+            "name     count     total       p50       p95       p99\n"
+            "fast         1     1.000     1.000     1.000     1.000",
+            self.recorder.format_report(),
+        )
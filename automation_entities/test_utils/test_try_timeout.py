@@ -49,6 +49,16 @@ class TestTryTimeout(unittest.TestCase):
 
         mock_sleep.assert_called_once_with(1.0)
 
+    @patch("time.time")
+    def test_retry_custom_sleep(self, mock_time: MagicMock) -> None:
+        mock_time.side_effect = [0, 3]
+        sleep = MagicMock()
+        fcn = MagicMock(side_effect=[TryAgain, 5])
+        cmp_ret = try_timeout(fcn, timeout=5, sleep=sleep)
+        self.assertEqual(5, cmp_ret)
+
+        sleep.assert_called_once_with(1.0)
+
     @patch("time.time")
     @patch("time.sleep")
     def test_retry_with_action(
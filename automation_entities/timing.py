@@ -0,0 +1,479 @@
+"""
+The :mod:`automation_entities.timing` module contains the logic for timing
+the interactions that take place within a :class:`context.Context`. Timing
+is off by default and can be turned on with
+:meth:`context.Context.enable_timing`::
+
+    >>> ctx.enable_timing()
+    >>> browser.get_element("//h1")
+    >>> print(ctx.latency_report())
+    name                        count     total       p50       p95       p99
+    WebBrowser.get_element          1     0.052     0.052     0.052     0.052
+
+Calls to methods wrapped by :func:`entities.describe` can be counted and
+timed as well by turning on call statistics with
+:meth:`context.Context.enable_call_stats`::
+
+    >>> ctx.enable_call_stats(dump_path="call-stats.json")
+    >>> browser.get_element("//h1")
+    >>> print(ctx.call_stats_report())
+    name                        count  errors     total exclusive      mean       max
+    WebBrowser.get_element          1       0     0.052     0.052     0.052     0.052
+"""
+
+import asyncio
+import bisect
+import collections
+import contextvars
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class Span(NamedTuple):
+    """
+    the time taken by a single :class:`context.Subcontext`
+    """
+
+    #: identifier of this span, unique to its :class:`SpanRecorder`
+    id: int
+
+    #: identifier of the span this span took place within, if any
+    parent: Optional[int]
+
+    #: name of the interaction; spans with the same name are aggregated
+    name: str
+
+    #: log position of the context when the span started
+    depth: int
+
+    #: monotonic time at which the span started
+    start: float
+
+    #: number of seconds the span took
+    duration: float
+
+
+class LatencyStats(NamedTuple):
+    """
+    aggregated latency of every :class:`Span` with the same name
+    """
+
+    #: name of the spans
+    name: str
+
+    #: number of spans
+    count: int
+
+    #: total number of seconds taken by the spans
+    total: float
+
+    #: median duration
+    p50: float
+
+    #: 95th percentile duration
+    p95: float
+
+    #: 99th percentile duration
+    p99: float
+
+    #: longest duration
+    max: float
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Return the *q*-th percentile of the given sorted *values* using the
+    nearest-rank method.
+    """
+    assert values, "percentile requires at least one value"
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+class DurationSample:
+    """
+    The count, total and longest of the durations of the spans with the
+    same name, along with a uniform random sample of at most
+    *max_samples* of the durations themselves to take percentiles from.
+    """
+
+    __slots__ = ("count", "total", "max", "samples")
+
+    count: int
+    total: float
+    max: float
+    samples: List[float]
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, duration: float, max_samples: int, rand: random.Random) -> None:
+        """
+        Add the given *duration*, keeping a sample of at most *max_samples*
+        durations by reservoir sampling with *rand*.
+        """
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+        if len(self.samples) < max_samples:
+            self.samples.append(duration)
+
+        else:
+            i = rand.randrange(self.count)
+            if i < max_samples:
+                self.samples[i] = duration
+
+
+class SpanRecorder:
+    """
+    Records :class:`Span` objects and aggregates their durations by name.
+    Only the most recent *max_spans* spans are kept, but every span's
+    duration counts toward the :meth:`report`. Spans may be recorded from
+    any number of threads at once. Percentiles are exact until
+    more than *max_samples* spans with the same name have been recorded and
+    are taken from a uniform random sample of that many durations from then
+    on, so memory use stays bounded however long the routine runs.
+
+    :param int max_spans: (optional) number of spans to keep
+    :param int max_samples: number of durations to keep for each name
+
+    .. autoattribute:: spans
+
+    .. automethod:: report
+    .. automethod:: format_report
+    """
+
+    #: the most recently recorded spans
+    spans: Deque[Span]
+
+    max_samples: int
+    durations: Dict[str, DurationSample]
+    rand: random.Random
+    ids: Iterator[int]
+    lock: threading.Lock
+
+    def __init__(
+        self, max_spans: Optional[int] = 100000, max_samples: int = 10000
+    ) -> None:
+        self.spans = collections.deque(maxlen=max_spans)
+        self.max_samples = max_samples
+        self.durations = {}
+        self.rand = random.Random()
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def next_id(self) -> int:
+        """
+        Return a new span identifier.
+        """
+        with self.lock:
+            return next(self.ids)
+
+    def record(self, span: Span) -> None:
+        """
+        Record the given *span*.
+        """
+        with self.lock:
+            self.spans.append(span)
+            durations = self.durations.get(span.name)
+            if durations is None:
+                durations = self.durations[span.name] = DurationSample()
+            durations.add(span.duration, self.max_samples, self.rand)
+
+    def report(self) -> List[LatencyStats]:
+        """
+        Return the aggregated latency of the recorded spans for each name,
+        slowest total first.
+        """
+        ret = []
+        with self.lock:
+            for name, durations in self.durations.items():
+                values = sorted(durations.samples)
+                ret.append(
+                    LatencyStats(
+                        name=name,
+                        count=durations.count,
+                        total=durations.total,
+                        p50=percentile(values, 50),
+                        p95=percentile(values, 95),
+                        p99=percentile(values, 99),
+                        max=durations.max,
+                    )
+                )
+
+        ret.sort(key=lambda s: s.total, reverse=True)
+        return ret
+
+    def format_report(self) -> str:
+        """
+        Format the :meth:`report` as a table.
+        """
+        report = self.report()
+        width = max([len("name")] + [len(s.name) for s in report])
+        lines = [
+            f"{'name':<{width}} {'count':>9} {'total':>9}"
+            f" {'p50':>9} {'p95':>9} {'p99':>9}"
+        ]
+        for s in report:
+            lines.append(
+                f"{s.name:<{width}} {s.count:>9} {s.total:>9.3f} {s.p50:>9.3f}"
+                f" {s.p95:>9.3f} {s.p99:>9.3f}"
+            )
+        return "\n".join(lines)
+
+
+#: upper bounds, in seconds, of the buckets of each :attr:`CallStats.histogram`;
+#: the last bucket holds every call that took longer
+HISTOGRAM_BOUNDS: Tuple[float, ...] = (
+    0.00001,
+    0.0001,
+    0.001,
+    0.01,
+    0.1,
+    1.0,
+    10.0,
+    100.0,
+)
+
+
+class CallStats:
+    """
+    aggregated statistics of every call to a single function
+    """
+
+    __slots__ = ("name", "count", "errors", "total", "exclusive", "max", "histogram")
+
+    #: qualified name of the function
+    name: str
+
+    #: number of calls
+    count: int
+
+    #: number of calls that raised an exception
+    errors: int
+
+    #: total number of seconds taken by the calls
+    total: float
+
+    #: total number of seconds taken by the calls, not counting the calls
+    #: they made to other functions whose calls are counted
+    exclusive: float
+
+    #: longest duration
+    max: float
+
+    #: number of calls in each bucket of :data:`HISTOGRAM_BOUNDS`
+    histogram: List[int]
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.exclusive = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    @property
+    def mean(self) -> float:
+        """
+        mean duration
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Represent the statistics as a ``dict``.
+        """
+        return {
+            "name": self.name,
+            "count": self.count,
+            "errors": self.errors,
+            "total": self.total,
+            "exclusive": self.exclusive,
+            "mean": self.mean,
+            "max": self.max,
+            "histogram": list(self.histogram),
+        }
+
+
+def current_owner() -> Any:
+    """
+    Return the :mod:`asyncio` task that's running, or failing that, the
+    identifier of the calling thread.
+    """
+    try:
+        task = asyncio.current_task()
+
+    except RuntimeError:
+        task = None
+
+    return task if task is not None else threading.get_ident()
+
+
+class CallTimer:
+    """
+    Context manager that times a single call for a
+    :class:`CallStatsRecorder`; it's returned by
+    :meth:`CallStatsRecorder.call`.
+    """
+
+    __slots__ = ("recorder", "name", "start", "child", "parent", "owner", "token")
+
+    recorder: "CallStatsRecorder"
+    name: str
+    start: float
+    child: float
+    parent: Optional["CallTimer"]
+    owner: Any
+    token: Optional["contextvars.Token[Optional[CallTimer]]"]
+
+    def __init__(self, recorder: "CallStatsRecorder", name: str) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.start = 0.0
+        self.child = 0.0
+        self.parent = None
+        self.owner = None
+        self.token = None
+
+    def __enter__(self) -> "CallTimer":
+        current = self.recorder.current
+        self.parent = current.get()
+        self.owner = current_owner()
+        self.token = current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        duration = time.perf_counter() - self.start
+        assert self.token is not None, "__exit__ must follow __enter__"
+        self.recorder.current.reset(self.token)
+        # Tasks and threads started by the parent inherit it as their
+        # current call, but they run alongside it rather than within it, so
+        # only calls made by the parent's own task or thread are excluded.
+        parent = self.parent
+        if parent is not None and parent.owner == self.owner:
+            parent.child += duration
+
+        self.recorder.record(
+            self.name, duration, duration - self.child, exc_type is not None
+        )
+
+
+class CallStatsRecorder:
+    """
+    Records the number of calls to each function, how long they took, both
+    in total and excluding the calls they made to other recorded functions,
+    how many raised an exception and a histogram of their durations. Calls
+    are tracked separately for each thread and :mod:`asyncio` task, and
+    calls made in tasks or threads that a call starts don't count against
+    its exclusive time since they run alongside it.
+
+    .. automethod:: call
+    .. automethod:: record
+    .. automethod:: report
+    .. automethod:: format_report
+    .. automethod:: dump
+    .. automethod:: reset
+    """
+
+    #: statistics for each function by name
+    stats: Dict[str, CallStats]
+
+    current: "contextvars.ContextVar[Optional[CallTimer]]"
+    lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.stats = {}
+        self.current = contextvars.ContextVar(f"current_call_{id(self)}", default=None)
+        self.lock = threading.Lock()
+
+    def call(self, name: str) -> CallTimer:
+        """
+        Return a context manager that records the call to the function with
+        the given *name* that it surrounds.
+        """
+        return CallTimer(self, name)
+
+    def record(
+        self, name: str, duration: float, exclusive: float, failed: bool = False
+    ) -> None:
+        """
+        Record a call to the function with the given *name* that took
+        *duration* seconds, *exclusive* of which weren't spent in other
+        recorded calls.
+        """
+        bucket = bisect.bisect_left(HISTOGRAM_BOUNDS, duration)
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = CallStats(name)
+
+            stats.count += 1
+            stats.total += duration
+            stats.exclusive += exclusive
+            stats.histogram[bucket] += 1
+            if duration > stats.max:
+                stats.max = duration
+            if failed:
+                stats.errors += 1
+
+    def report(self) -> List[CallStats]:
+        """
+        Return the statistics of each function, slowest exclusive time
+        first.
+        """
+        with self.lock:
+            ret = list(self.stats.values())
+
+        ret.sort(key=lambda s: s.exclusive, reverse=True)
+        return ret
+
+    def format_report(self) -> str:
+        """
+        Format the :meth:`report` as a table.
+        """
+        report = self.report()
+        width = max([len("name")] + [len(s.name) for s in report])
+        lines = [
+            f"{'name':<{width}} {'count':>9} {'errors':>7} {'total':>9}"
+            f" {'exclusive':>9} {'mean':>9} {'max':>9}"
+        ]
+        for s in report:
+            lines.append(
+                f"{s.name:<{width}} {s.count:>9} {s.errors:>7} {s.total:>9.3f}"
+                f" {s.exclusive:>9.3f} {s.mean:>9.3f} {s.max:>9.3f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, filepath: str) -> None:
+        """
+        Write the :meth:`report` to the given *filepath* as JSON.
+        """
+        with open(filepath, "w") as fobj:
+            json.dump(
+                {
+                    "histogram_bounds": list(HISTOGRAM_BOUNDS),
+                    "calls": [s.as_dict() for s in self.report()],
+                },
+                fobj,
+                indent=4,
+            )
+
+    def reset(self) -> None:
+        """
+        Forget every call recorded so far.
+        """
+        with self.lock:
+            self.stats = {}
@@ -53,6 +53,7 @@ def try_timeout(
     step_exp: Optional[float] = None,
     ignore_exceptions: Optional[Tuple[Type[Exception], ...]] = None,
     retry_action: Optional[Callable[[], None]] = None,
+    sleep: Optional[Callable[[float], None]] = None,
 ) -> R:
     """
     Try running the given function until a timeout is reached.
@@ -81,11 +82,15 @@ def try_timeout(
         specified, :class:`TryAgain` needs to be appended if it's also to
         be used to indicate the action should be retried
     param retry_action: function to call before subsequent retries
+    :param sleep: function to wait between retries with, such as
+        :meth:`context.Context.sleep` to make the wait cancellable; defaults
+        to :func:`time.sleep`
     """
     timeout = timeout or DEFAULT_TIMEOUT
     step = step or DEFAULT_STEP
     step_exp = step_exp or DEFAULT_STEP_EXP
     ignore_exceptions = ignore_exceptions or (TryAgain,)
+    sleep = sleep or time.sleep
     start_time = time.time()
     while True:
         try:
@@ -99,7 +104,7 @@ def try_timeout(
             if curr_time < start_time or curr_time > start_time + timeout:
                 raise TimedOut("timeout reached")
 
-            time.sleep(min(step, (start_time + timeout) - curr_time))
+            sleep(min(step, (start_time + timeout) - curr_time))
             step *= step_exp
             if retry_action is not None:
                 retry_action()
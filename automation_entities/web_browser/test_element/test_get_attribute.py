@@ -5,6 +5,7 @@ from .common import ElementTestCase
 
 class TestGetAttribute(ElementTestCase):
     def test_no_attribute(self) -> None:
+        self.assertEqual("<common />", self.element.name)
         self.mock_element.reset_mock()
 
         cmp_val = self.element.get_attribute("attr_name")
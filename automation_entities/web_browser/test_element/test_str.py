@@ -1,3 +1,5 @@
+from ...rendering import render
+from ..web_browser import Element
 from .common import ElementTestCase
 
 
@@ -52,3 +54,25 @@ class TestStr(ElementTestCase):
             "<common name='name' placeholder='placeholder' value='value'>aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa...</common>",
             cmp_str,
         )
+
+
+class TestName(ElementTestCase):
+    def test_lazy(self) -> None:
+        self.mock_element.get_attribute.reset_mock()
+        element = Element(self.context, self.mock_element)
+        self.mock_element.get_attribute.assert_not_called()
+
+        self.assertEqual("<common />", element.name)
+        self.mock_element.text = "Element Text"
+        self.assertEqual("<common />", element.name)
+        self.assertEqual(3, self.mock_element.get_attribute.call_count)
+
+
+class TestRender(ElementTestCase):
+    def test_uses_name(self) -> None:
+        self.assertEqual("<common />", self.element.name)
+        self.mock_element.text = "Element Text"
+        self.mock_element.get_attribute.reset_mock()
+
+        self.assertEqual("<common />", render(self.element))
+        self.mock_element.get_attribute.assert_not_called()
@@ -18,6 +18,7 @@ from selenium.webdriver.remote.webelement import WebElement
 
 from ..context import Context
 from ..entities import Entity, SubInteraction, describe
+from ..rendering import RenderBuffer, register_renderer
 from ..utils import SecretString, TimedOut, Timeout, TryAgain, try_timeout
 from .driver import Browser, create_webdriver
 
@@ -149,7 +150,7 @@ class WebBrowser(Entity):
         Log page info.
         """
         with self.result() as result:
-            result.log(f"Title: {self.driver.title}")
+            result.log(lambda: f"Title: {self.driver.title}")
 
             try:
                 h1 = try_timeout(
@@ -332,7 +333,7 @@ class WebBrowser(Entity):
 
                 else:
                     for element in elements:
-                        result.log(f"{element}")
+                        result.log(element.name)
 
                 return elements
 
@@ -346,7 +347,7 @@ class WebBrowser(Entity):
 
             with self.result() as result:
                 element = Element(self.context, e)
-                result.log(f"{element}")
+                result.log(element.name)
                 return element
 
     @describe
@@ -388,7 +389,7 @@ class WebBrowser(Entity):
         Move to the given *element*.
         """
         with self.interaction():
-            self.request(f"move_to {element}")
+            self.request("move_to %s", element.name)
             ActionChains(self.driver).move_to_element(element.element).perform()
 
     def move_to_with_offset(self, element: "Element", x: int = 0, y: int = 0) -> None:
@@ -396,7 +397,7 @@ class WebBrowser(Entity):
         Move to the given *element*.
         """
         with self.interaction():
-            self.request(f"move_to_with_offset {element} x={x} y={y}")
+            self.request("move_to_with_offset %s x=%s y=%s", element.name, x, y)
             ActionChains(self.driver).move_to_element_with_offset(
                 element.element, x, y
             ).perform()
@@ -474,7 +475,7 @@ class WebBrowser(Entity):
         with self.interaction():
             self.request("alert_text")
             with self.result() as result:
-                result.log(self.driver.switch_to.alert.text)
+                result.log(lambda: self.driver.switch_to.alert.text)
                 return self.driver.switch_to.alert.text
 
     def accept_alert(self) -> None:
@@ -500,6 +501,7 @@ class Element(Entity):
     :class:`selenium.webdriver.remote.webelement.WebElement` component.
 
     .. autoattribute:: element
+    .. autoattribute:: name
 
     .. automethod:: get_elements
     .. automethod:: get_element
@@ -516,10 +518,18 @@ class Element(Entity):
     #: selenium element to wrap
     element: WebElement
 
-    def __init__(self, context, element):
+    def __init__(self, context: Context, element: WebElement):
+        # The name isn't passed on, as working it out takes several round
+        # trips to the browser and most elements are never logged.
+        self.context = context
         self.element = element
 
-        super().__init__(context, f"{self}")
+    @functools.cached_property
+    def name(self) -> str:  # type: ignore[override]
+        """
+        Name of the element, worked out the first time it is used.
+        """
+        return f"{self}"
 
     def get_elements(self, xpath: str) -> List["Element"]:
         """
@@ -539,7 +549,7 @@ class Element(Entity):
 
                 else:
                     for element in elements:
-                        result.log(f"{element}")
+                        result.log(element.name)
 
                 return elements
 
@@ -549,7 +559,7 @@ class Element(Entity):
             with self.result() as result:
                 for e in self.element.find_elements("xpath", xpath):
                     element = Element(self.context, e)
-                    result.log(f"{element}")
+                    result.log(element.name)
                     yield element
 
     def get_element(self, xpath: str) -> "Element":
@@ -563,7 +573,7 @@ class Element(Entity):
 
             with self.result() as result:
                 element = Element(self.context, e)
-                result.log(f"{element}")
+                result.log(element.name)
                 return element
 
     @describe
@@ -684,3 +694,12 @@ class Element(Entity):
 
     def __repr__(self) -> str:
         return self.__str__()
+
+
+def render_element(element: Element, buf: RenderBuffer) -> None:
+    # The element's name is only worked out once, so rendering it again
+    # doesn't take any round trips to the browser.
+    buf.write(element.name)
+
+
+register_renderer(Element, render_element)
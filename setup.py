@@ -43,6 +43,9 @@ _ = setup(
         "requests<3,>=2.31.0",
         "undetected-chromedriver<4,>=3.5.4",
     ],
+    extras_require={
+        "fast": ["orjson>=3"],
+    },
     project_urls={
         "Bug Reports": "https://github.com/SudoVim/automation-entities/issues",
         "Source": "https://github.com/SudoVim/automation-entities/",